@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""
+Offline benchmark that compares the time used to provision thousands of
+VLANs with a ConfigBDs pushed in chunks of different sizes.  No Switch is
+needed: the commit latency of the simulated Switch grows with the number
+of objects of a request, faster than linearly for large requests, and the
+requests larger than its body limit are rejected, which stops the push.
+"""
+import argparse
+import json
+import threading
+import time
+from nxtoolkit.nxtoolkit import ChunkedPush, ConfigBDs, L2BD
+
+
+class Response(object):
+    """
+    Response of the simulated Switch
+    """
+    def __init__(self, ok):
+        self.ok = ok
+
+
+class SimulatedSession(object):
+    """
+    Session of a simulated Switch sleeping for the commit latency of each
+    request
+    """
+    def __init__(self, overhead, per_object, max_body):
+        self.overhead = overhead
+        self.per_object = per_object
+        self.max_body = max_body
+        self.lock = threading.Lock()
+        self.rejected = 0
+
+    def push_to_switch(self, url, data, chunked=False):
+        if len(json.dumps(data)) > self.max_body:
+            time.sleep(self.overhead)
+            with self.lock:
+                self.rejected += 1
+            return Response(False)
+        count = len(data['bdEntity']['children'])
+        # The commit of large requests holds more state on the Switch
+        latency = (self.overhead + self.per_object * count *
+                   (1 + count / 1000.0))
+        time.sleep(latency)
+        return Response(True)
+
+
+def get_bds(count):
+    """
+    Build a ConfigBDs holding count L2BDs
+    """
+    bds = ConfigBDs()
+    for vlan in range(2, count + 2):
+        bds.add_l2bds(L2BD('vlan-%d' % vlan))
+    return bds
+
+
+def main():
+    """
+    Main execution routine
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Compare the time used '
+                                                 'to push VLANs in chunks '
+                                                 'of different sizes')
+    parser.add_argument('-c', '--count', type=int, default=3900,
+                        help='Number of VLANs')
+    parser.add_argument('-s', '--sizes', type=int, nargs='+',
+                        default=[50, 100, 250, 500, 1000, 3900],
+                        help='Numbers of VLANs per chunk')
+    parser.add_argument('-j', '--concurrency', type=int, default=2,
+                        help='Number of chunks pushed at the same time')
+    parser.add_argument('--overhead', type=float, default=0.02,
+                        help='Seconds used by the Switch per request')
+    parser.add_argument('--per-object', type=float, default=0.00005,
+                        help='Seconds used by the Switch per VLAN')
+    parser.add_argument('--max-body', type=int, default=524288,
+                        help='Largest body in bytes accepted by the Switch')
+    args = parser.parse_args()
+
+    bds = get_bds(args.count)
+    print('{0:>7} {1:>7} {2:>9} {3:>8} {4:>8} {5:>8}'.format(
+        'Chunk', 'Chunks', 'Rejected', 'p50', 'Max', 'Seconds'))
+    print('{0:>7} {1:>7} {2:>9} {3:>8} {4:>8} {5:>8}'.format(
+        '-----', '------', '--------', '---', '---', '-------'))
+    for size in args.sizes:
+        session = SimulatedSession(args.overhead, args.per_object,
+                                   args.max_body)
+        # Split by count only so that the oversized chunks reach the Switch
+        bulk = ChunkedPush(bds, max_count=size, max_size=args.max_body * 4,
+                           max_concurrency=args.concurrency)
+        chunks = len(bulk.get_chunks())
+        start = time.time()
+        results = bulk.run(session)
+        elapsed = time.time() - start
+        latencies = sorted(result.latency for result in results)
+        print('{0:>7} {1:>7} {2:>9} {3:>8.3f} {4:>8.3f} {5:>8.3f}'.format(
+            size, chunks, session.rejected,
+            latencies[len(latencies) // 2], latencies[-1], elapsed))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""
+Offline benchmark that measures the memory used by a decoded endpoint
+snapshot, such as the one read by WorkingData, with and without the
+InternTable used by the Session to decode JSON.  No Switch is needed.
+"""
+import argparse
+import json
+import sys
+import time
+from nxtoolkit.nxcache import InternTable
+
+
+def get_size(obj, seen):
+    """
+    Get the number of bytes used by the decoded JSON and everything it
+    references that was not seen before.
+
+    :param obj: object to measure
+    :param seen: set of the ids of the objects already counted
+    :return: number of bytes
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key in obj:
+            size += get_size(key, seen) + get_size(obj[key], seen)
+    elif isinstance(obj, list):
+        for item in obj:
+            size += get_size(item, seen)
+    return size
+
+
+def get_snapshot(count):
+    """
+    Build the JSON of a snapshot holding the MAC and IP endpoints of
+    many bridge domains
+
+    :param count: number of endpoints
+    :return: string containing the JSON
+    """
+    imdata = []
+    for index in range(count):
+        bd_dn = 'sys/ctx-[vxlan-%d]/bd-[vxlan-%d]/db-ep' % (
+            2097152 + index % 16, 16777 + index % 500)
+        mac = '00:50:56:%02X:%02X:%02X' % (index >> 16, (index >> 8) & 255,
+                                           index & 255)
+        if index % 2:
+            mo_class = 'epmIpEp'
+            addr = '10.%d.%d.%d' % (index >> 16, (index >> 8) & 255,
+                                    index & 255)
+            dn = bd_dn + '/ip-[%s]' % addr
+        else:
+            mo_class = 'epmMacEp'
+            addr = mac
+            dn = bd_dn + '/mac-%s' % mac
+        imdata.append({mo_class: {'attributes': {
+            'addr': addr, 'childAction': '', 'createTs': '2016-01-01T00:00:00',
+            'dn': dn, 'flags': 'local,mac' if index % 2 else 'local',
+            'ifId': 'eth1/%d' % (index % 48 + 1), 'lcC': 'learned',
+            'modTs': '2016-01-01T00:%02d:%02d.%03d' % (
+                index // 60000 % 60, index // 1000 % 60, index % 1000),
+            'name': '', 'status': '', 'vrfEncap': 'vxlan-%d' % (
+                2097152 + index % 16)}}})
+    return json.dumps({'totalCount': str(count), 'imdata': imdata})
+
+
+def measure(name, loads, text):
+    """
+    Decode the snapshot and print the memory used and the decode time.
+
+    :param name: name printed in the report
+    :param loads: function decoding the JSON
+    :param text: string containing the JSON
+    """
+    start = time.time()
+    data = loads(text)
+    elapsed = time.time() - start
+    size = get_size(data, set())
+    count = len(data['imdata'])
+    print('{0:12} {1:>10} {2:>14,} {3:>10,.1f} {4:>8.2f}'.format(
+        name, count, size, float(size) / count, elapsed))
+    return size
+
+
+def main():
+    """
+    Main execution routine
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Measure the memory used '
+                                                 'by a decoded snapshot')
+    parser.add_argument('-c', '--count', type=int, default=100000,
+                        help='Number of endpoints in the snapshot')
+    args = parser.parse_args()
+
+    text = get_snapshot(args.count)
+    print('{0:12} {1:>10} {2:>14} {3:>10} {4:>8}'.format(
+        'Decode', 'Endpoints', 'Bytes', 'Bytes/EP', 'Seconds'))
+    print('{0:12} {1:>10} {2:>14} {3:>10} {4:>8}'.format(
+        '------', '---------', '-----', '--------', '-------'))
+    plain = measure('json.loads', json.loads, text)
+    interned = measure('interned', InternTable().loads, text)
+    print('Saved {0:,} bytes ({1:.0%})'.format(plain - interned,
+                                               1 - float(interned) / plain))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""
+Offline benchmark that measures how many events per second are decoded
+into nxtoolkit objects by get_event, with and without the cache of the
+parent objects rebuilt from the dn of every event.  No Switch is needed.
+
+The toolkit classes do not parse dns deep enough to build their parent
+chain from an event, so the benchmark uses three small classes modeled
+on the BGP domain, peer and peer address family objects.
+"""
+import argparse
+import time
+from nxtoolkit.nxbaseobject import BaseNXObject
+from nxtoolkit.nxcache import LruCache
+
+
+class Domain(BaseNXObject):
+    """
+    BGP domain found at sys/bgp/inst/dom-[<name>]
+    """
+    @staticmethod
+    def _get_parent_class():
+        return None
+
+    @staticmethod
+    def _get_name_from_dn(dn):
+        return dn.split('/dom-[')[1].split(']')[0]
+
+
+class Peer(BaseNXObject):
+    """
+    BGP peer found at <domain dn>/peer-[<address>]
+    """
+    @staticmethod
+    def _get_parent_class():
+        return Domain
+
+    @staticmethod
+    def _get_parent_dn(dn):
+        return dn.split('/peer-[')[0]
+
+    @staticmethod
+    def _get_name_from_dn(dn):
+        return dn.split('/peer-[')[1].split(']')[0]
+
+
+class PeerAf(BaseNXObject):
+    """
+    BGP peer address family found at <peer dn>/af-[<type>]
+    """
+    @classmethod
+    def _get_switch_classes(cls):
+        return ['bgpPeerAf']
+
+    @staticmethod
+    def _get_parent_class():
+        return Peer
+
+    @staticmethod
+    def _get_parent_dn(dn):
+        return dn.split('/af-[')[0]
+
+    @staticmethod
+    def _get_name_from_dn(dn):
+        return dn.split('/af-[')[1].split(']')[0]
+
+    def _populate_from_attributes(self, attributes):
+        self.descr = attributes.get('descr')
+
+
+class EventSession(object):
+    """
+    Session handing out a list of events
+    """
+    def __init__(self, events, parent_cache):
+        self._events = events
+        self._index = 0
+        self.parent_cache = parent_cache
+
+    def has_events(self, url):
+        return self._index < len(self._events)
+
+    def get_event(self, url):
+        event = self._events[self._index]
+        self._index += 1
+        return event
+
+
+def get_events(count, domains, peers):
+    """
+    Build the bgpPeerAf events of the peers of several domains
+
+    :param count: number of events
+    :param domains: number of domains
+    :param peers: number of peers per domain
+    :return: list of events
+    """
+    events = []
+    for index in range(count):
+        dn = 'sys/bgp/inst/dom-[vrf%d]/peer-[10.0.%d.1]/af-[%s]' % (
+            index % domains, (index // domains) % peers,
+            ('ipv4-ucast', 'ipv6-ucast')[index % 2])
+        events.append({'imdata': [{'bgpPeerAf': {'attributes': {
+            'dn': dn, 'status': 'modified', 'descr': 'event %d' % index}}}]})
+    return events
+
+
+def measure(name, cache_size, events):
+    """
+    Decode the events and print the number of events decoded per second.
+
+    :param name: name printed in the report
+    :param cache_size: number of parents kept, 0 disables the cache
+    :param events: list of events to decode
+    """
+    session = EventSession(events, LruCache(cache_size))
+    start = time.time()
+    while PeerAf.has_events(session):
+        PeerAf.get_event(session)
+    elapsed = time.time() - start
+    print('{0:20} {1:>10} {2:>12,.0f}'.format(name, len(events),
+                                              len(events) / elapsed))
+
+
+def main():
+    """
+    Main execution routine
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Measure the number of '
+                                                 'events decoded per second')
+    parser.add_argument('-c', '--count', type=int, default=50000,
+                        help='Number of events to decode')
+    parser.add_argument('-d', '--domains', type=int, default=10,
+                        help='Number of BGP domains')
+    parser.add_argument('-p', '--peers', type=int, default=50,
+                        help='Number of peers per domain')
+    args = parser.parse_args()
+
+    events = get_events(args.count, args.domains, args.peers)
+    print('{0:20} {1:>10} {2:>12}'.format('Parents', 'Events', 'Events/s'))
+    print('{0:20} {1:>10} {2:>12}'.format('-------', '------', '--------'))
+    measure('rebuilt', 0, events)
+    measure('cached', 1024, events)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""
+Offline benchmark that compares the time used by the getters to build
+objects from the attributes of MOs through __init__ and through the
+from_mo factories.  No Switch is needed.
+"""
+import argparse
+import time
+from nxtoolkit.nxtoolkit import L2BD
+from nxtoolkit.nxphysobject import Interface
+from nxtoolkit.nxConcreteLib import ConcreteEp
+
+
+def get_l2bd_attributes(count):
+    """
+    Build the attributes of l2BD MOs
+
+    :param count: number of MOs
+    :return: list of attribute dictionaries
+    """
+    return [{'name': 'vlan-%d' % index, 'id': str(index), 'adminSt': 'active',
+             'operSt': 'up', 'fabEncap': 'vlan-%d' % index,
+             'dn': 'sys/bd/bd-[vlan-%d]' % index}
+            for index in range(count)]
+
+
+def get_interface_attributes(count):
+    """
+    Build the Interface attributes of l1PhysIf MOs
+
+    :param count: number of MOs
+    :return: list of attribute dictionaries
+    """
+    resp = []
+    for index in range(count):
+        if_name = 'eth%d/%d' % (index // 48 + 1, index % 48 + 1)
+        resp.append(Interface._get_mo_attributes({
+            'dn': 'sys/intf/phys-[%s]' % if_name, 'portT': 'leaf',
+            'adminSt': 'up', 'speed': '10G', 'mtu': '9216', 'id': if_name,
+            'monPolDn': 'uni/fabric/monfab-default', 'name': '', 'descr': '',
+            'usage': 'discovery', 'layer': 'Layer2'}))
+    return resp
+
+
+def get_endpoint_attributes(count):
+    """
+    Build the attributes of epmIpEp MOs
+
+    :param count: number of MOs
+    :return: list of attribute dictionaries
+    """
+    resp = []
+    for index in range(count):
+        addr = '10.%d.%d.%d' % (index >> 16, (index >> 8) & 255, index & 255)
+        resp.append({'addr': addr, 'name': '', 'flags': 'local',
+                     'ifId': 'eth1/%d' % (index % 48 + 1),
+                     'createTs': '2016-01-01T00:00:00',
+                     'dn': 'sys/ctx-[vxlan-2097152]/db-ep/ip-[%s]' % addr})
+    return resp
+
+
+def init_l2bd(attributes):
+    obj = L2BD(str(attributes['name']))
+    obj._populate_from_attributes(attributes)
+    return obj
+
+
+def init_interface(attributes):
+    obj = Interface(attributes['id'], attributes=attributes)
+    obj.porttype = attributes['porttype']
+    obj.adminstatus = attributes['adminstatus']
+    obj.speed = attributes['speed']
+    obj.mtu = attributes['mtu']
+    return obj
+
+
+def init_endpoint(attributes):
+    obj = ConcreteEp()
+    obj._populate_from_attributes(attributes)
+    return obj
+
+
+def measure(build, mo_attributes):
+    """
+    Build an object from each of the attribute dictionaries
+
+    :param build: function building an object from attributes
+    :param mo_attributes: list of attribute dictionaries
+    :return: number of seconds used
+    """
+    start = time.time()
+    for attributes in mo_attributes:
+        build(attributes)
+    return time.time() - start
+
+
+def main():
+    """
+    Main execution routine
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Compare building objects '
+                                                 'through __init__ and '
+                                                 'from_mo')
+    parser.add_argument('-c', '--counts', type=int, nargs='+',
+                        default=[10000, 100000],
+                        help='Numbers of objects built')
+    args = parser.parse_args()
+
+    cases = [('L2BD', get_l2bd_attributes, init_l2bd, L2BD.from_mo),
+             ('Interface', get_interface_attributes, init_interface,
+              Interface._from_mo_attributes),
+             ('ConcreteEp', get_endpoint_attributes, init_endpoint,
+              ConcreteEp.from_mo)]
+    print('{0:12} {1:>8} {2:>10} {3:>10} {4:>8}'.format(
+        'Class', 'Objects', '__init__', 'from_mo', 'Speedup'))
+    print('{0:12} {1:>8} {2:>10} {3:>10} {4:>8}'.format(
+        '-----', '-------', '--------', '-------', '-------'))
+    for count in args.counts:
+        for name, get_attributes, init_build, from_mo in cases:
+            mo_attributes = get_attributes(count)
+            init_time = measure(init_build, mo_attributes)
+            from_mo_time = measure(from_mo, mo_attributes)
+            print('{0:12} {1:>8} {2:>10.3f} {3:>10.3f} {4:>7.1f}x'.format(
+                name, count, init_time, from_mo_time,
+                init_time / from_mo_time))
+
+if __name__ == '__main__':
+    main()
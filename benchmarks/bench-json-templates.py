@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""
+Offline benchmark that compares the time used to generate the JSON of
+Interfaces and SVIs with attributes built attribute by attribute and with
+the precompiled JSON templates of their classes.  No Switch is needed.
+"""
+import argparse
+import time
+from nxtoolkit.nxtoolkit import SVI
+from nxtoolkit.nxphysobject import Interface
+
+
+def get_interfaces(count):
+    """
+    Build configured Interfaces
+
+    :param count: number of Interfaces
+    :return: list of Interfaces
+    """
+    resp = []
+    for index in range(count):
+        iface = Interface('eth%d/%d' % (index // 48 + 1, index % 48 + 1))
+        iface.set_layer('Layer2')
+        iface.set_mode('trunk')
+        iface.set_admin_status('up')
+        resp.append(iface)
+    return resp
+
+
+def get_svis(count):
+    """
+    Build configured SVIs
+
+    :param count: number of SVIs
+    :return: list of SVIs
+    """
+    resp = []
+    for index in range(count):
+        svi = SVI('vlan%d' % (index % 4000 + 1), admin_st='up')
+        svi.set_mtu('9216')
+        resp.append(svi)
+    return resp
+
+
+def get_json(obj_class, attributes, obj):
+    """
+    Build the JSON the way every object did before the templates, walking
+    the tags and the children of the object
+    """
+    children_json = []
+    for tag in obj._tags:
+        children_json.append({'tagInst': {'attributes': {'name': tag.name}}})
+    for child in obj._children:
+        data = child.get_json()
+        if data is not None:
+            children_json.append(data)
+    if obj._deleted:
+        attributes['status'] = 'deleted'
+    return {obj_class: {'attributes': attributes, 'children': children_json}}
+
+
+def interface_json(iface):
+    att = {}
+    if iface._access_vlan:
+        att['accessVlan'] = iface._access_vlan
+    if iface._trunk_vlans:
+        att['trunkVlans'] = iface._trunk_vlans
+    if iface._mtu:
+        att['mtu'] = iface._mtu
+    if iface._adminstatus:
+        att['adminSt'] = iface._adminstatus
+    if iface._speed:
+        att['speed'] = iface._speed
+    if iface._layer:
+        att['layer'] = iface._layer
+    if iface._snmp_trap_st:
+        att['snmpTrapSt'] = iface._snmp_trap_st
+    if iface._descr:
+        att['descr'] = iface._descr
+    if iface._duplex:
+        att['duplex'] = iface._duplex
+    if iface._mode:
+        att['mode'] = iface._mode
+    if iface._link_log:
+        att['linkLog'] = iface._link_log
+    if iface._trunk_log:
+        att['trunkLog'] = iface._trunk_log
+    att['id'] = iface.id
+    return get_json(iface.object, att, iface)
+
+
+def svi_json(svi):
+    att = {}
+    att['id'] = svi.id
+    if svi.admin_st:
+        att['adminSt'] = svi.admin_st
+    if svi.descr:
+        att['descr'] = svi.descr
+    if svi.mtu:
+        att['mtu'] = svi.mtu
+    if svi.bw:
+        att['bw'] = svi.bw
+    return get_json(svi.object, att, svi)
+
+
+def measure(build, objs, repeat=5):
+    """
+    Generate the JSON of each of the objects
+
+    :param build: function generating the JSON of an object
+    :param objs: list of objects
+    :param repeat: number of runs, the fastest one is kept
+    :return: number of seconds used
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for obj in objs:
+            build(obj)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    """
+    Main execution routine
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Compare generating JSON '
+                                                 'with and without the '
+                                                 'class templates')
+    parser.add_argument('-c', '--counts', type=int, nargs='+',
+                        default=[10000, 100000],
+                        help='Numbers of objects generated')
+    args = parser.parse_args()
+
+    cases = [('Interface', get_interfaces, interface_json),
+             ('SVI', get_svis, svi_json)]
+    print('{0:12} {1:>8} {2:>10} {3:>10} {4:>8}'.format(
+        'Class', 'Objects', 'By hand', 'Template', 'Speedup'))
+    print('{0:12} {1:>8} {2:>10} {3:>10} {4:>8}'.format(
+        '-----', '-------', '-------', '--------', '-------'))
+    for count in args.counts:
+        for name, get_objects, hand_json in cases:
+            objs = get_objects(count)
+            assert hand_json(objs[0]) == objs[0].get_json()
+            hand_time = measure(hand_json, objs)
+            template_time = measure(lambda obj: obj.get_json(), objs)
+            print('{0:12} {1:>8} {2:>10.3f} {3:>10.3f} {4:>7.1f}x'.format(
+                name, count, hand_time, template_time,
+                hand_time / template_time))
+
+if __name__ == '__main__':
+    main()
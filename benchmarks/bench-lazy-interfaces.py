@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""
+Offline benchmark that compares the Interfaces built from l1PhysIf MOs
+with their attributes copied and built lazily, when the caller only reads
+a few of their attributes.  No Switch is needed.
+
+The time includes building the Interfaces and reading the attributes.
+The bytes kept are the size of everything the Interfaces keep alive,
+including the MO attributes wrapped by the lazy Interfaces, and the bytes
+added are the part of it that is not already used by the decoded MOs.
+"""
+import argparse
+import gc
+import sys
+import time
+from nxtoolkit.nxphysobject import Interface
+
+
+def get_size(obj, seen):
+    """
+    Get the number of bytes used by an object and everything it references
+    that was not seen before.
+
+    :param obj: object to measure
+    :param seen: set of the ids of the objects already counted
+    :return: number of bytes
+    """
+    if id(obj) in seen or isinstance(obj, type):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key in obj:
+            size += get_size(key, seen) + get_size(obj[key], seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += get_size(item, seen)
+    if hasattr(obj, '__dict__'):
+        size += get_size(obj.__dict__, seen)
+    for cls in type(obj).__mro__:
+        for slot in cls.__dict__.get('__slots__', ()):
+            if hasattr(obj, slot):
+                size += get_size(getattr(obj, slot), seen)
+    return size
+
+
+def get_mos(count):
+    """
+    Build the attributes of l1PhysIf MOs as decoded from the Switch
+
+    :param count: number of MOs
+    :return: list of attribute dictionaries
+    """
+    resp = []
+    for index in range(count):
+        if_name = 'eth%d/%d' % (index // 48 + 1, index % 48 + 1)
+        resp.append({
+            'adminSt': 'up', 'autoNeg': 'on', 'bw': '0', 'childAction': '',
+            'delay': '1', 'descr': 'server %d' % index, 'dot1qEtherType':
+            '0x8100', 'dn': 'sys/intf/phys-[%s]' % if_name, 'duplex': 'auto',
+            'ethpmCfgFailedBmp': '', 'ethpmCfgFailedTs': '00:00:00:00.000',
+            'ethpmCfgState': '0', 'id': if_name, 'inhBw': '4294967295',
+            'layer': 'Layer2', 'linkDebounce': '100', 'linkLog': 'default',
+            'mdix': 'auto', 'medium': 'broadcast', 'modTs':
+            '2016-01-01T00:00:00.000', 'mode': 'access', 'monPolDn': '',
+            'mtu': '1500', 'name': '', 'portT': 'leaf', 'routerMac':
+            'not-applicable', 'snmpTrapSt': 'enable', 'spanMode': 'not-a-span-dest',
+            'speed': '10G', 'status': '', 'trunkLog': 'default',
+            'trunkVlans': '1-4094', 'usage': 'discovery', 'userCfgdFlags': '',
+            'vlanmgrCfgFailedBmp': '', 'vlanmgrCfgState': '0'})
+    return resp
+
+
+def measure(name, lazy, mos):
+    """
+    Build an Interface from each MO, read its name and admin status and
+    print the time used and the bytes kept per Interface.
+
+    :param name: name printed in the report
+    :param lazy: Boolean to build the Interfaces lazily
+    :param mos: list of MO attribute dictionaries
+    """
+    gc.collect()
+    start = time.time()
+    interfaces = []
+    for mo in mos:
+        interface = Interface._from_mo_attributes(
+            Interface._get_mo_attributes(mo, lazy))
+        interface.if_name
+        interface.adminstatus
+        interfaces.append(interface)
+    elapsed = time.time() - start
+    seen = set()
+    kept = sum(get_size(interface, seen) for interface in interfaces)
+    seen = set()
+    get_size(mos, seen)
+    added = sum(get_size(interface, seen) for interface in interfaces)
+    print('{0:10} {1:>8} {2:>8.3f} {3:>10,.1f} {4:>10,.1f}'.format(
+        name, len(mos), elapsed, float(kept) / len(mos),
+        float(added) / len(mos)))
+
+
+def main():
+    """
+    Main execution routine
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Compare copied and lazy '
+                                                 'Interface attributes')
+    parser.add_argument('-c', '--count', type=int, default=100000,
+                        help='Number of Interfaces built')
+    args = parser.parse_args()
+
+    print('{0:10} {1:>8} {2:>8} {3:>10} {4:>10}'.format(
+        'Build', 'Objects', 'Seconds', 'Kept/Obj', 'Added/Obj'))
+    print('{0:10} {1:>8} {2:>8} {3:>10} {4:>10}'.format(
+        '-----', '-------', '-------', '--------', '---------'))
+    mos = get_mos(args.count)
+    measure('copied', False, mos)
+    measure('lazy', True, mos)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""
+Offline benchmark that measures the bytes used per object by the high
+cardinality nxtoolkit classes.  No Switch is needed.
+
+The size of an object is the size of the object itself and of every
+container reachable from it that is not shared with the objects created
+before it, so the attribute strings shared by all the objects are only
+counted once.
+"""
+import argparse
+import sys
+import nxtoolkit.nxtoolkit as NX
+from nxtoolkit.nxConcreteLib import ConcreteEp
+from nxtoolkit.nxbaseobject import BaseRelation, Tag
+
+
+def get_size(obj, seen):
+    """
+    Get the number of bytes used by an object and everything it references
+    that was not seen before.
+
+    :param obj: object to measure
+    :param seen: set of the ids of the objects already counted
+    :return: number of bytes
+    """
+    if id(obj) in seen or isinstance(obj, type):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key in obj:
+            size += get_size(key, seen) + get_size(obj[key], seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += get_size(item, seen)
+    if hasattr(obj, '__dict__'):
+        size += get_size(obj.__dict__, seen)
+    for cls in type(obj).__mro__:
+        for slot in cls.__dict__.get('__slots__', ()):
+            if hasattr(obj, slot):
+                size += get_size(getattr(obj, slot), seen)
+    return size
+
+
+def measure(name, factory, count):
+    """
+    Create count objects and print the average bytes per object.
+
+    :param name: name printed in the report
+    :param factory: function called with an index to create an object
+    :param count: number of objects to create
+    """
+    seen = set()
+    objects = [factory(index) for index in range(count)]
+    total = sum(get_size(obj, seen) for obj in objects)
+    print('{0:20} {1:>10} {2:>12,.1f}'.format(name, count,
+                                              float(total) / count))
+
+
+def main():
+    """
+    Main execution routine
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Measure the bytes used '
+                                                 'per nxtoolkit object')
+    parser.add_argument('-c', '--count', type=int, default=10000,
+                        help='Number of objects to create per class')
+    args = parser.parse_args()
+
+    attributes = {'dist_name': 'sys/intf/phys-[eth1/1]', 'id': 'eth1/1',
+                  'operSt': 'up', 'adminSt': 'up'}
+    neighbor = {'devId': 'switch2', 'portId': 'Ethernet1/1', 'ver': '7.0',
+                'sysName': 'switch2', 'cap': 'router', 'Hldtme': '-',
+                'platId': 'N9K', 'id': 'eth1/1', 'operSt': 'up'}
+    interface = NX.Interface('eth1/1')
+
+    print('{0:20} {1:>10} {2:>12}'.format('Class', 'Objects', 'Bytes/Obj'))
+    print('{0:20} {1:>10} {2:>12}'.format('-----', '-------', '---------'))
+    measure('Interface', lambda index: NX.Interface('eth1/%d' % (index + 1),
+                                                    attributes=attributes),
+            args.count)
+    measure('ConcreteEp', lambda index: ConcreteEp(), args.count)
+    measure('LinkNeighbors', lambda index: NX.LinkNeighbors(
+        attributes=neighbor), args.count)
+    measure('BaseRelation', lambda index: BaseRelation(interface, 'attached'),
+            args.count)
+    measure('Tag', lambda index: Tag('tag'), args.count)
+
+if __name__ == '__main__':
+    main()
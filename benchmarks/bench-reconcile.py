@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""
+Offline benchmark that compares the bytes posted to converge Interfaces
+with a ChangeSet pushing every object and with a ChangeSet in reconcile
+mode pushing only what differs from the Switch.  No Switch is needed, the
+configuration of the Switch is simulated.
+"""
+import argparse
+import json
+import time
+from nxtoolkit.nxtoolkit import ChangeSet, Interface
+
+
+class Response(object):
+    """
+    Response of the simulated Switch
+    """
+    ok = True
+
+    def __init__(self, imdata=None):
+        self._imdata = imdata
+
+    def json(self):
+        return {'imdata': self._imdata}
+
+
+class SimulatedSession(object):
+    """
+    Session of a simulated Switch counting the bytes posted and received
+    """
+    def __init__(self, imdata):
+        self.imdata = imdata
+        self.posted = 0
+        self.received = 0
+        self.requests = 0
+
+    def get(self, url):
+        self.requests += 1
+        self.received += len(json.dumps({'imdata': self.imdata}))
+        return Response(self.imdata)
+
+    def push_to_switch(self, url, data, chunked=False):
+        self.requests += 1
+        self.posted += len(json.dumps(data))
+        return Response()
+
+
+def get_interfaces(count):
+    """
+    Build the desired Interfaces
+
+    :param count: number of Interfaces
+    :return: list of Interfaces
+    """
+    resp = []
+    for index in range(count):
+        iface = Interface('eth%d/%d' % (index // 48 + 1, index % 48 + 1))
+        iface.set_layer('Layer2')
+        iface.set_mode('trunk')
+        resp.append(iface)
+    return resp
+
+
+def get_config(interfaces):
+    """
+    Get the config-only MOs of the Switch holding the Interfaces
+    """
+    imdata = []
+    for iface in interfaces:
+        attributes = dict(iface.get_json()['l1PhysIf']['attributes'])
+        attributes['dn'] = iface._get_path()
+        imdata.append({'l1PhysIf': {'attributes': attributes,
+                                    'children': []}})
+    return imdata
+
+
+def main():
+    """
+    Main execution routine
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Compare pushing all of '
+                                                 'the Interfaces and only '
+                                                 'the changed ones')
+    parser.add_argument('-c', '--count', type=int, default=3000,
+                        help='Number of Interfaces')
+    parser.add_argument('-n', '--changed', type=int, default=20,
+                        help='Number of Interfaces changed')
+    args = parser.parse_args()
+
+    interfaces = get_interfaces(args.count)
+    imdata = get_config(interfaces)
+    step = max(args.count // max(args.changed, 1), 1)
+    for iface in interfaces[::step][:args.changed]:
+        iface.set_mtu('9216')
+
+    print('{0:10} {1:>9} {2:>10} {3:>10} {4:>8}'.format(
+        'Mode', 'Requests', 'Posted', 'Received', 'Seconds'))
+    print('{0:10} {1:>9} {2:>10} {3:>10} {4:>8}'.format(
+        '----', '--------', '------', '--------', '-------'))
+    for name, reconcile in (('full', False), ('reconcile', True)):
+        session = SimulatedSession(imdata)
+        start = time.time()
+        ChangeSet(interfaces).push(session, reconcile=reconcile)
+        elapsed = time.time() - start
+        print('{0:10} {1:>9} {2:>10} {3:>10} {4:>8.3f}'.format(
+            name, session.requests, session.posted, session.received,
+            elapsed))
+
+if __name__ == '__main__':
+    main()
@@ -24,6 +24,7 @@ This is a library of all the Concrete classes that are on a switch.
 """
 # all the import
 from .nxbaseobject import BaseNXPhysObject
+from .nxdn import Dn
 import nxtoolkit as NX
 import copy
 from .nxTable import Table
@@ -298,8 +299,7 @@ class ConcreteVpc(BaseNXPhysObject):
         vpc_data = top.get_class('vpcEntity')
         for vpc_d in vpc_data:
             if 'vpcEntity' in vpc_d:
-                vpc = cls()
-                vpc._populate_from_attributes(vpc_d['vpcEntity']['attributes'])
+                vpc = cls.from_mo(vpc_d['vpcEntity']['attributes'])
                 vpc._populate_from_inst(top)
                 vpc.member_ports = ConcreteVpcIf.get(top, vpc)
                 result.append(vpc)
@@ -508,8 +508,7 @@ class ConcreteVpcIf(BaseNXPhysObject):
         vpc_members = top.get_class('vpcIf')
         for vpc_member in vpc_members:
             if 'vpcIf' in vpc_member:
-                member = cls()
-                member._populate_from_attributes(vpc_member['vpcIf']['attributes'])
+                member = cls.from_mo(vpc_member['vpcIf']['attributes'])
                 member._get_interface(top, vpc_member['vpcIf']['attributes']['dn'])
                 result.append(member)
                 if parent:
@@ -1139,8 +1138,7 @@ class ConcreteBD(BaseNXPhysObject):
         result = []
         bd_data = top.get_class('l2BD')
         for l2bd in bd_data:
-            bdomain = cls()
-            bdomain._populate_from_attributes(l2bd['l2BD']['attributes'])
+            bdomain = cls.from_mo(l2bd['l2BD']['attributes'])
 
             # get the context name by reading the context
             bdomain._get_cxt_name(top)
@@ -1381,8 +1379,7 @@ class ConcreteAccCtrlRule(BaseNXPhysObject):
         contexts = NX.Context.get(top.session)
 
         for actrl_rule in rule_data:
-            rule = cls()
-            rule._populate_from_attributes(actrl_rule['actrlRule']['attributes'])
+            rule = cls.from_mo(actrl_rule['actrlRule']['attributes'])
             # get the context name by reading the context
             rule._get_tenant_context(contexts)
             rule._get_epg_names(epgs)
@@ -1629,8 +1626,7 @@ class ConcreteFilter(BaseNXPhysObject):
         filter_data = top.get_class('actrlFlt')
 
         for filter_object in filter_data:
-            acc_filter = cls()
-            acc_filter._populate_from_attributes(filter_object['actrlFlt']['attributes'])
+            acc_filter = cls.from_mo(filter_object['actrlFlt']['attributes'])
             # get the context name by reading the context
             acc_filter._get_entries(top)
             acc_filter._get_pod_node()
@@ -1800,8 +1796,7 @@ class ConcreteFilterEntry(BaseNXPhysObject):
         entry_data = top.get_subtree('actrlEntry', parent.attr['dn'])
 
         for entry_object in entry_data:
-            acc_entry = cls()
-            acc_entry._populate_from_attributes(entry_object['actrlEntry']['attributes'])
+            acc_entry = cls.from_mo(entry_object['actrlEntry']['attributes'])
             # get the context name by reading the context
             acc_entry._get_filter_name()
             acc_entry._get_entry_id()
@@ -1956,13 +1951,12 @@ class ConcreteEp(BaseNXPhysObject):
         ep_data.extend(top.get_class('epmMacEp')[:])
 
         for ep_object in ep_data:
-            end_point = cls()
             if 'epmIpEp' in ep_object:
-                end_point._populate_from_attributes(ep_object['epmIpEp']['attributes'])
+                end_point = cls.from_mo(ep_object['epmIpEp']['attributes'])
                 end_point.attr['address_family'] = 'ipv4'
                 end_point.attr['ip'] = str(ep_object['epmIpEp']['attributes']['addr'])
-            if 'epmMacEp' in ep_object:
-                end_point._populate_from_attributes(ep_object['epmMacEp']['attributes'])
+            else:
+                end_point = cls.from_mo(ep_object['epmMacEp']['attributes'])
                 end_point.attr['address_family'] = 'mac'
                 end_point.attr['mac'] = str(ep_object['epmMacEp']['attributes']['addr'])
 
@@ -1976,21 +1970,14 @@ class ConcreteEp(BaseNXPhysObject):
             if end_point.attr['address_family'] == 'mac':
                 rel_data = top.get_subtree('epmRsMacEpToIpEpAtt', end_point.attr['dn'])
                 for rel in rel_data:
-                    ip_add = str(rel['epmRsMacEpToIpEpAtt']['attributes']['tDn'].
-                                 split('/ip-[')[1].split(']')[0])
-                    if 'ctx-[vxlan-' in rel['epmRsMacEpToIpEpAtt']['attributes']['tDn']:
-
-                        ip_ctx = str(rel['epmRsMacEpToIpEpAtt']['attributes']['tDn'].
-                                     split('/ctx-[vxlan-')[1].split(']/')[0])
-                    elif '/inst-' in rel['epmRsMacEpToIpEpAtt']['attributes']['tDn']:
-                        ip_ctx = str(rel['epmRsMacEpToIpEpAtt']['attributes']['tDn'].
-                                     split('/inst-')[1].split('/')[0])
+                    target_dn = Dn(rel['epmRsMacEpToIpEpAtt']['attributes']['tDn'])
+                    ip_add = str(target_dn.get_value('ip-'))
+                    ip_ctx = cls._get_vnid(target_dn, 'ctx-')
+                    if ip_ctx is None:
+                        ip_ctx = target_dn.get_value('inst-')
                         if ip_ctx in top.ctx_dict:
                             ip_ctx = top.ctx_dict[ip_ctx]
-                    else:
-                        ip_ctx = None
-                    ip_bd = str(rel['epmRsMacEpToIpEpAtt']['attributes']['tDn'].
-                                split('/bd-[vxlan-')[1].split(']/')[0])
+                    ip_bd = cls._get_vnid(target_dn, 'bd-')
                     if ip_ctx == end_point.attr['ctx_vnid'] and ip_bd == \
                             end_point.attr['bd_vnid']:
                         # we have an IP address for this MAC
@@ -2036,29 +2023,43 @@ class ConcreteEp(BaseNXPhysObject):
 
         return final_result
 
+    @staticmethod
+    def _get_vnid(dn, prefix):
+        """ will extract the vnid from a ctx-[vxlan-<vnid>] or
+        bd-[vxlan-<vnid>] rn of the dn, None if there is no such rn
+        """
+        value = dn.get_value(prefix)
+        if value is None or not value.startswith('vxlan-'):
+            return None
+        return str(value[len('vxlan-'):])
+
     def _get_context_bd(self, top):
         """ will extract the context and bridge domain
         from the dn
         """
-        if '/ctx-[vxlan-' in self.attr['dn']:
-            self.attr['ctx_vnid'] = self.attr['dn'].split('/ctx-[vxlan-')[1].split(']/')[0]
+        dn = Dn(self.attr['dn'])
+        ctx_vnid = self._get_vnid(dn, 'ctx-')
+        context = dn.get_value('inst-')
+        bd_vnid = self._get_vnid(dn, 'bd-')
+        if ctx_vnid is not None:
+            self.attr['ctx_vnid'] = ctx_vnid
             ctx = top.vnid_dict.get(self.attr['ctx_vnid'])
             if ctx:
                 self.attr['context'] = ctx['name']
             else:
                 self.attr['context'] = self.attr['ctx_vnid']
 
-        elif '/inst-' in self.attr['dn']:
+        elif context is not None:
             self.attr['ctx_vnid'] = 'unknown'
-            self.attr['context'] = self.attr['dn'].split('/inst-')[1].split('/')[0]
+            self.attr['context'] = context
             if self.attr['context'] in top.ctx_dict:
                 self.attr['ctx_vnid'] = top.ctx_dict[self.attr['context']]
         else:
             self.attr['ctx_vnid'] = 'unknown'
             self.attr['context'] = 'unknown'
 
-        if '/bd-[vxlan-' in self.attr['dn']:
-            self.attr['bd_vnid'] = self.attr['dn'].split('/bd-[vxlan-')[1].split(']/')[0]
+        if bd_vnid is not None:
+            self.attr['bd_vnid'] = bd_vnid
             bdomain = top.vnid_dict.get(self.attr['bd_vnid'])
             if bdomain:
                 self.attr['bridge_domain'] = bdomain['name']
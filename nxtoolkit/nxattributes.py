@@ -0,0 +1,198 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the LazyAttributes class, a view of the attributes
+     of an MO whose values are only computed when they are read, and the
+     LazyAttribute descriptor reading an object attribute from such a view.
+"""
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+_REMOVED = object()
+_MISSING = object()
+
+
+class LazyAttributes(object):
+    """
+    Attributes of an object computed from the attributes of its MO the
+    first time each of them is read.  It wraps the MO attribute dictionary
+    as decoded instead of copying it, so an object whose caller only reads
+    a few attributes only pays for those.
+
+    It behaves as a dictionary: the values set are kept as set and the
+    values read are computed once.
+    """
+    __slots__ = ('_mo_attributes', '_fields', '_values')
+
+    def __init__(self, mo_attributes, fields):
+        """
+        :param mo_attributes: dictionary containing the attributes of the MO
+        :param fields: dictionary of the attribute names to the functions\
+                       computing their value from the MO attributes
+        """
+        self._mo_attributes = mo_attributes
+        self._fields = fields
+        self._values = {}
+
+    @property
+    def mo_attributes(self):
+        """
+        Dictionary containing the attributes of the MO
+        """
+        return self._mo_attributes
+
+    def __getitem__(self, key):
+        try:
+            value = self._values[key]
+        except KeyError:
+            compute = self._fields.get(key)
+            if compute is None:
+                raise KeyError(key)
+            value = compute(self._mo_attributes)
+            self._values[key] = value
+        if value is _REMOVED:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._values[key] = _REMOVED
+
+    def __contains__(self, key):
+        value = self._values.get(key, _MISSING)
+        if value is _MISSING:
+            return key in self._fields
+        return value is not _REMOVED
+
+    def __iter__(self):
+        values = self._values
+        for key in self._fields:
+            if values.get(key) is not _REMOVED:
+                yield key
+        for key in values:
+            if key not in self._fields and values[key] is not _REMOVED:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, (dict, LazyAttributes)):
+            return self.copy() == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def update(self, other=(), **kwargs):
+        if hasattr(other, 'keys'):
+            for key in other.keys():
+                self[key] = other[key]
+        else:
+            for key, value in other:
+                self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def pop(self, key, default=_MISSING):
+        try:
+            value = self[key]
+        except KeyError:
+            if default is _MISSING:
+                raise
+            return default
+        del self[key]
+        return value
+
+    def copy(self):
+        """
+        Get a dictionary of all of the attributes
+
+        :returns: dictionary
+        """
+        return dict(self.items())
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    __hash__ = None
+
+
+MutableMapping.register(LazyAttributes)
+
+
+class LazyAttribute(object):
+    """
+    Descriptor of an object attribute read from the attributes mapping of
+    the object the first time it is used.  The value is then stored in
+    the object, so an attribute set by __init__ or by the application
+    hides the descriptor.
+    """
+    def __init__(self, name, compute=None):
+        """
+        :param name: String containing the name of the attribute
+        :param compute: Optional function computing the value from the\
+                        object.  By default the value is the item of the\
+                        same name of the attributes of the object.
+        """
+        self._name = name
+        self._compute = compute
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self._compute is None:
+            try:
+                value = obj.attributes[self._name]
+            except KeyError:
+                raise AttributeError(self._name)
+        else:
+            value = self._compute(obj)
+        obj.__dict__[self._name] = value
+        return value
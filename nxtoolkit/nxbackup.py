@@ -0,0 +1,406 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the BackupStore class that keeps the configuration
+     backups of a fleet of Switches as content addressed chunks.
+
+     The configuration of a Switch is split into chunks along the subtrees
+     of its MOs, the children of an MO being stored in groups whose
+     boundaries depend on their content only.  Each chunk is stored once,
+     compressed, under the SHA-256 of its canonical JSON, so the subtrees
+     that are the same on several Switches or in several backups take the
+     space of one.  A backup is a
+     manifest listing the root chunk and all of the chunks it references.
+     Restoring a backup reads only the chunks of its manifest.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+
+# Query of the configuration of a Switch
+BACKUP_URL = '/api/mo/sys.json?rsp-subtree=full&rsp-prop-include=config-only'
+CHUNKS_DIR = 'chunks'
+MANIFESTS_DIR = 'manifests'
+MANIFEST_SUFFIX = '.json'
+# Key of the reference to a chunk in the children of its parent chunk
+CHUNK_REF = '#chunk'
+# Smallest subtree in bytes stored in a chunk of its own.  The smaller
+# subtrees stay in the chunk of their parent, in groups of children of
+# about this size.
+MIN_CHUNK_SIZE = 1024
+# Largest group of children in units of MIN_CHUNK_SIZE
+MAX_GROUP_FACTOR = 4
+# One child in BOUNDARY_MODULO ends a group of children
+BOUNDARY_MODULO = 4
+
+
+def _dumps(data):
+    """
+    Get the canonical JSON of a chunk
+    """
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+
+def _is_boundary(child):
+    """
+    Check if a child ends a group of children, from the hash of its JSON
+    """
+    digest = hashlib.sha1(_dumps(child).encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) % BOUNDARY_MODULO == 0
+
+
+class BackupManifest(object):
+    """
+    Backup of the configuration of a Switch
+    """
+    def __init__(self, switch, name, timestamp, root, chunks):
+        """
+        :param switch: String identifying the switch such as its address
+        :param name: String containing the name of the backup
+        :param timestamp: Time the backup was taken, in seconds
+        :param root: String containing the hash of the root chunk
+        :param chunks: sorted list of the hashes of the chunks of the backup
+        """
+        self.switch = switch
+        self.name = name
+        self.timestamp = timestamp
+        self.root = root
+        self.chunks = chunks
+        # Chunks and compressed bytes written by the backup
+        self.new_chunks = 0
+        self.new_bytes = 0
+
+    def get_json(self):
+        return {'switch': self.switch, 'name': self.name,
+                'timestamp': self.timestamp, 'root': self.root,
+                'chunks': self.chunks}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['switch'], data['name'], data['timestamp'],
+                   data['root'], data['chunks'])
+
+    def __repr__(self):
+        return '<BackupManifest %s %s %s chunks>' % (self.switch, self.name,
+                                                     len(self.chunks))
+
+
+class BackupStore(object):
+    """
+    Deduplicated store of the configuration backups of Switches
+    """
+    def __init__(self, directory, min_chunk_size=MIN_CHUNK_SIZE,
+                 compress_level=6):
+        """
+        :param directory: String containing the directory of the store
+        :param min_chunk_size: Smallest subtree in bytes stored in a chunk\
+                               of its own.  Default is 1024.
+        :param compress_level: zlib compression level.  Default is 6.
+        """
+        self.directory = directory
+        self.min_chunk_size = min_chunk_size
+        self.compress_level = compress_level
+
+    @staticmethod
+    def _get_switch_dir(switch):
+        return str(switch).replace(':', '_').replace('/', '_')
+
+    def _get_chunk_path(self, digest):
+        return os.path.join(self.directory, CHUNKS_DIR, digest[:2], digest)
+
+    def _get_manifest_dir(self, switch):
+        return os.path.join(self.directory, MANIFESTS_DIR,
+                            self._get_switch_dir(switch))
+
+    @staticmethod
+    def _write(path, data):
+        """
+        Write a file in one step so that a crash leaves no partial file.
+        Each writer uses its own temporary file, so concurrent backups
+        writing the same chunk don't clobber each other.
+        """
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Already created, possibly by a concurrent backup
+            if not os.path.isdir(directory):
+                raise
+        handle, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as tmp_file:
+                tmp_file.write(data)
+            os.rename(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def _put_chunk(self, text, manifest):
+        """
+        Store a chunk unless the store already has it
+
+        :returns: String containing the hash of the chunk
+        """
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._get_chunk_path(digest)
+        if not os.path.exists(path):
+            compressed = zlib.compress(data, self.compress_level)
+            self._write(path, compressed)
+            manifest.new_chunks += 1
+            manifest.new_bytes += len(compressed)
+        manifest.chunks.append(digest)
+        return digest
+
+    def _group(self, children, manifest):
+        """
+        Store the children of an MO in groups of about min_chunk_size
+        bytes.  A group ends after a child whose hash matches a boundary
+        pattern, so that adding, removing or changing a child only changes
+        its own group instead of moving every following boundary.
+
+        :param children: list of (JSON dictionary, size) tuples
+        :returns: list of the references to the groups
+        """
+        refs = []
+        group = []
+        size = 0
+        for index, (child, child_size) in enumerate(children):
+            group.append(child)
+            size += child_size
+            if index == len(children) - 1 or (
+                    size >= self.min_chunk_size and
+                    (size >= self.min_chunk_size * MAX_GROUP_FACTOR or
+                     _is_boundary(child))):
+                refs.append({CHUNK_REF: self._put_chunk(_dumps(group),
+                                                        manifest)})
+                group = []
+                size = 0
+        return refs
+
+    def _split(self, mo, manifest, is_root=False):
+        """
+        Store the subtrees of an MO that are large enough as chunks
+
+        :param mo: JSON dictionary of an MO
+        :returns: tuple of the JSON of the MO, with the stored subtrees\
+                  replaced by references, and of the size of that JSON
+        """
+        obj_class = list(mo)[0]
+        body = mo[obj_class]
+        children = [self._split(child, manifest)
+                    for child in body.get('children', [])]
+        size = len(_dumps(body.get('attributes', {}))) + len(obj_class)
+        children_size = sum(child_size for _, child_size in children)
+        split_body = dict(body)
+        if children_size >= self.min_chunk_size:
+            split_body['children'] = self._group(children, manifest)
+            size += len(_dumps(split_body['children']))
+        elif children:
+            split_body['children'] = [child for child, _ in children]
+            size += children_size
+        split_mo = {obj_class: split_body}
+        if is_root or size >= self.min_chunk_size:
+            digest = self._put_chunk(_dumps(split_mo), manifest)
+            ref = {CHUNK_REF: digest}
+            return ref, len(_dumps(ref))
+        return split_mo, size
+
+    def add(self, switch, config, name=None, timestamp=None):
+        """
+        Add a backup of the configuration of a Switch
+
+        :param switch: String identifying the switch such as its address
+        :param config: JSON dictionary of the configuration, such as the\
+                       topSystem MO returned by BACKUP_URL
+        :param name: String containing the name of the backup.  Default is\
+                     the UTC time of the backup.
+        :param timestamp: Time the backup was taken.  Default is now.
+        :returns: BackupManifest instance
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if name is None:
+            name = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(timestamp))
+        manifest = BackupManifest(switch, name, timestamp, None, [])
+        ref, _ = self._split(config, manifest, is_root=True)
+        manifest.root = ref[CHUNK_REF]
+        manifest.chunks = sorted(set(manifest.chunks))
+        self._write(os.path.join(self._get_manifest_dir(switch),
+                                 name + MANIFEST_SUFFIX),
+                    _dumps(manifest.get_json()).encode('utf-8'))
+        logging.debug('Backup %s of %s: %s chunks, %s new, %s bytes written',
+                      name, switch, len(manifest.chunks), manifest.new_chunks,
+                      manifest.new_bytes)
+        return manifest
+
+    def backup(self, session, name=None):
+        """
+        Read the configuration of a Switch and add a backup of it
+
+        :param session: the instance of Session used for Switch communication
+        :param name: String containing the name of the backup.  Default is\
+                     the UTC time of the backup.
+        :returns: BackupManifest instance or None if the configuration\
+                  could not be read
+        """
+        switch = getattr(session, 'ipaddr', None) or repr(session)
+        resp = session.get(BACKUP_URL)
+        if not resp.ok:
+            logging.error('Could not read the configuration of %s', switch)
+            return None
+        imdata = resp.json()['imdata']
+        if not imdata:
+            logging.error('No configuration returned by %s', switch)
+            return None
+        return self.add(switch, imdata[0], name)
+
+    def get_switches(self):
+        """
+        Get the switches that have backups
+
+        :returns: sorted list of switch directory names
+        """
+        directory = os.path.join(self.directory, MANIFESTS_DIR)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.listdir(directory))
+
+    def get_backups(self, switch):
+        """
+        Get the names of the backups of a switch, oldest first
+
+        :param switch: String identifying the switch
+        :returns: list of backup names
+        """
+        directory = self._get_manifest_dir(switch)
+        if not os.path.isdir(directory):
+            return []
+        manifests = [self.get_manifest(switch, file_name[:-len(
+                     MANIFEST_SUFFIX)]) for file_name in os.listdir(directory)
+                     if file_name.endswith(MANIFEST_SUFFIX)]
+        manifests.sort(key=lambda manifest: (manifest.timestamp,
+                                             manifest.name))
+        return [manifest.name for manifest in manifests]
+
+    def get_manifest(self, switch, name=None):
+        """
+        Read the manifest of a backup
+
+        :param switch: String identifying the switch
+        :param name: String containing the name of the backup.  Default is\
+                     the latest backup.
+        :returns: BackupManifest instance or None if there is no backup
+        """
+        if name is None:
+            names = self.get_backups(switch)
+            if not names:
+                return None
+            name = names[-1]
+        path = os.path.join(self._get_manifest_dir(switch),
+                            name + MANIFEST_SUFFIX)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as manifest_file:
+            return BackupManifest.from_json(
+                json.loads(manifest_file.read().decode('utf-8')))
+
+    def _get_chunk(self, digest):
+        with open(self._get_chunk_path(digest), 'rb') as chunk_file:
+            return json.loads(zlib.decompress(
+                chunk_file.read()).decode('utf-8'))
+
+    def _join(self, children):
+        """
+        Replace the references to chunks in a list of children by the MOs
+        of the chunks
+        """
+        resp = []
+        for child in children:
+            if CHUNK_REF in child:
+                child = self._get_chunk(child[CHUNK_REF])
+                if isinstance(child, list):
+                    # A group of children
+                    resp.extend(self._join(child))
+                    continue
+            body = child[list(child)[0]]
+            if body.get('children'):
+                body['children'] = self._join(body['children'])
+            resp.append(child)
+        return resp
+
+    def restore(self, switch, name=None):
+        """
+        Read the configuration of a backup
+
+        :param switch: String identifying the switch
+        :param name: String containing the name of the backup.  Default is\
+                     the latest backup.
+        :returns: JSON dictionary of the configuration or None if there is\
+                  no such backup
+        """
+        manifest = self.get_manifest(switch, name)
+        if manifest is None:
+            return None
+        return self._join([{CHUNK_REF: manifest.root}])[0]
+
+    def delete(self, switch, name):
+        """
+        Delete a backup.  Its chunks are removed by collect_garbage once no
+        other backup uses them.
+
+        :param switch: String identifying the switch
+        :param name: String containing the name of the backup
+        """
+        path = os.path.join(self._get_manifest_dir(switch),
+                            name + MANIFEST_SUFFIX)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def collect_garbage(self):
+        """
+        Remove the chunks that no backup uses.  It must not run while a
+        backup is added.
+
+        :returns: number of chunks removed
+        """
+        used = set()
+        for switch_dir in self.get_switches():
+            directory = os.path.join(self.directory, MANIFESTS_DIR,
+                                     switch_dir)
+            for file_name in os.listdir(directory):
+                if file_name.endswith(MANIFEST_SUFFIX):
+                    with open(os.path.join(directory, file_name),
+                              'rb') as manifest_file:
+                        used.update(json.loads(
+                            manifest_file.read().decode('utf-8'))['chunks'])
+        removed = 0
+        chunks_dir = os.path.join(self.directory, CHUNKS_DIR)
+        if not os.path.isdir(chunks_dir):
+            return removed
+        for prefix in os.listdir(chunks_dir):
+            for digest in os.listdir(os.path.join(chunks_dir, prefix)):
+                if digest not in used:
+                    os.remove(os.path.join(chunks_dir, prefix, digest))
+                    removed += 1
+        return removed
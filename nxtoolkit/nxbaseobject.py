@@ -19,15 +19,463 @@
 """
 This module implements the Base Class for creating all of the NX Objects.
 """
+import bisect
+import copy
 import logging
 from .nxSearch import NxSearch
 from .nxsession import Session
+from .nxcache import TEXT_TYPE, get_identity_map, get_parent_cache
+from .nxdn import Dn
+from .nxregistry import REGISTRY
+from .nxserializer import ChildJson, get_streamed_object
+
+
+class _PendingList(list):
+    """
+    Empty list returned for an attribute that has not been allocated yet.
+    It becomes the attribute of its owner the first time it is modified.
+    """
+    __slots__ = ('_owner', '_name')
+
+    def __init__(self, owner, name):
+        super(_PendingList, self).__init__()
+        self._owner = owner
+        self._name = name
+
+    def _install(self):
+        """
+        Make this list the attribute of its owner, unless another list was
+        installed since it was returned, and return the attribute.
+        """
+        if self._owner is None:
+            return self
+        target = self._owner.__dict__.setdefault(self._name, self)
+        self._owner = None
+        return target
+
+    def append(self, item):
+        list.append(self._install(), item)
+
+    def extend(self, items):
+        list.extend(self._install(), items)
+
+    def insert(self, index, item):
+        list.insert(self._install(), index, item)
+
+    def __setitem__(self, index, item):
+        list.__setitem__(self._install(), index, item)
+
+    def __setslice__(self, start, stop, items):
+        list.__setslice__(self._install(), start, stop, items)
+
+    def __iadd__(self, items):
+        target = self._install()
+        list.extend(target, items)
+        return target
+
+
+_REMOVED = object()
+
+
+class _OrderedIndex(object):
+    """
+    Base class of the insertion ordered lists that are also indexed for
+    lookups.  A removed item leaves a tombstone in the list until half of
+    the list is removed, so that the positions stored in the index stay
+    valid and removal does not shift the list.
+    """
+    __slots__ = ('_items', '_removed', '_owner', '_name')
+
+    def __init__(self, owner=None, name=None):
+        """
+        :param owner: Object whose attribute this index becomes when it is\
+                      first modified, or None if it already is
+        :param name: Name of that attribute
+        """
+        self._items = []
+        self._removed = 0
+        self._owner = owner
+        self._name = name
+        self._clear()
+
+    def _clear(self):
+        """
+        Empty the index.  Implemented by the inheriting classes.
+        """
+        raise NotImplementedError
+
+    def _add(self, item, position):
+        """
+        Add an item at a position to the index.  Implemented by the
+        inheriting classes.
+        """
+        raise NotImplementedError
+
+    def _install(self):
+        """
+        Make this index the attribute of its owner, unless another index was
+        installed since it was returned, and return the attribute.
+        """
+        if self._owner is None:
+            return self
+        target = self._owner.__dict__.setdefault(self._name, self)
+        self._owner = None
+        return target
+
+    def append(self, obj):
+        """
+        Add an item at the end.  Equal items are not replaced.
+
+        :param obj: item to add
+        """
+        if self._owner is not None:
+            target = self._install()
+            if target is not self:
+                return target.append(obj)
+        position = len(self._items)
+        self._items.append(obj)
+        self._add(obj, position)
+
+    def extend(self, objs):
+        for obj in objs:
+            self.append(obj)
+
+    def _discard(self, position):
+        """
+        Replace the item at a position, already removed from the index, by
+        a tombstone.
+        """
+        self._items[position] = _REMOVED
+        self._removed += 1
+        if self._removed > len(self._items) // 2:
+            self.reindex()
+
+    def reindex(self):
+        """
+        Rebuild the index, dropping the removed items and picking up
+        identity keys that changed.
+        """
+        items = [item for item in self._items if item is not _REMOVED]
+        self._items = []
+        self._removed = 0
+        self._clear()
+        for item in items:
+            self.append(item)
+
+    def __iter__(self):
+        return (item for item in self._items if item is not _REMOVED)
+
+    def __len__(self):
+        return len(self._items) - self._removed
+
+    def __getitem__(self, index):
+        if self._removed:
+            self.reindex()
+        return self._items[index]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _get_identity_key(obj):
+    """
+    Get the identity key of an object, or None if it does not have one
+    """
+    get_identity_key = getattr(obj, '_get_identity_key', None)
+    if get_identity_key is None:
+        return None
+    return get_identity_key()
+
+
+class ChildIndex(_OrderedIndex):
+    """
+    Insertion ordered list of the children of an object.  The children are
+    also indexed by class and identity key so that has_child, get_child,
+    add_child and remove_child only compare against the children that can
+    be equal instead of against every child.  Like the key of a dict, the
+    identity key of a child must not change while it is in the index;
+    call reindex() if it does.
+    """
+    __slots__ = ('_buckets', '_types')
+
+    def _clear(self):
+        self._buckets = {}
+        self._types = {}
+
+    def _add(self, obj, position):
+        key = type(obj), _get_identity_key(obj)
+        self._buckets.setdefault(key, []).append(position)
+        self._types.setdefault(key[0], set()).add(position)
+
+    def _find(self, obj):
+        """
+        Get the bucket and the position of the first child equal to obj
+        """
+        key = type(obj), _get_identity_key(obj)
+        bucket = self._buckets.get(key, ())
+        for index, position in enumerate(bucket):
+            if self._items[position] == obj:
+                return key, index, position
+        return key, None, None
+
+    def remove(self, obj):
+        """
+        Remove the first child equal to obj.
+
+        :param obj: Child object to remove
+        :raises ValueError: if there is no such child
+        """
+        key, index, position = self._find(obj)
+        if position is None:
+            raise ValueError('ChildIndex.remove(x): x not in list')
+        bucket = self._buckets[key]
+        del bucket[index]
+        if not bucket:
+            del self._buckets[key]
+        positions = self._types[key[0]]
+        positions.discard(position)
+        if not positions:
+            del self._types[key[0]]
+        self._discard(position)
+
+    def get_by_class(self, only_class):
+        """
+        Get the children that are instances of a class, in insertion order.
+
+        :param only_class: class of the children to return
+        :returns: list of children
+        """
+        positions = []
+        for child_class in self._types:
+            if issubclass(child_class, only_class):
+                positions.extend(self._types[child_class])
+        return [self._items[position] for position in sorted(positions)]
+
+    def get_by_name(self, only_class, name):
+        """
+        Get the first child that is an instance of a class and has a name.
+
+        :param only_class: class of the child to return
+        :param name: name of the child to return
+        :returns: the child or None if not found
+        """
+        positions = []
+        for child_class in self._types:
+            if not issubclass(child_class, only_class):
+                continue
+            if getattr(child_class, '_get_identity_key', None) == \
+                    BaseNXObject._get_identity_key:
+                positions.extend(self._buckets.get((child_class, name), ()))
+            else:
+                positions.extend(self._types[child_class])
+        for position in sorted(positions):
+            if self._items[position].name == name:
+                return self._items[position]
+        return None
+
+    def __contains__(self, obj):
+        return self._find(obj)[2] is not None
+
+
+ANY_RELATION_TYPE = object()
+
+
+class RelationIndex(_OrderedIndex):
+    """
+    Insertion ordered list of the relations or attachments of an object.
+    The relations are also indexed by (class of the item, relation type,
+    status), which keeps the sorted positions of its relations and maps
+    the identity key of the items to their positions, so that looking up
+    the relations to a class or to an item does not scan every relation.
+    A relation tells its index when its status changes.
+    """
+    __slots__ = ('_buckets',)
+
+    def _clear(self):
+        self._buckets = {}
+
+    def _add(self, relation, position):
+        relation._index = self
+        key = (type(relation.item), relation.relation_type, relation.status)
+        positions, items = self._buckets.setdefault(key, ([], {}))
+        bisect.insort(positions, position)
+        bisect.insort(items.setdefault(_get_identity_key(relation.item), []),
+                      position)
+
+    def _get_bucket(self, item, relation_type, status):
+        """
+        Get the positions of the relations that can be to item
+        """
+        key = (type(item), relation_type, status)
+        if key not in self._buckets:
+            return ()
+        return self._buckets[key][1].get(_get_identity_key(item), ())
+
+    def _find(self, item, relation_type, status, relation=None):
+        """
+        Get the position of the first relation to an item equal to item,
+        or of relation itself if it is given.
+        """
+        for position in self._get_bucket(item, relation_type, status):
+            if relation is not None:
+                if self._items[position] is relation:
+                    return position
+            elif self._items[position].item == item:
+                return position
+        return None
+
+    def _unlink(self, relation, status, position):
+        """
+        Remove the position of a relation from the index
+        """
+        key = (type(relation.item), relation.relation_type, status)
+        positions, items = self._buckets[key]
+        del positions[bisect.bisect_left(positions, position)]
+        item_key = _get_identity_key(relation.item)
+        items[item_key].remove(position)
+        if not items[item_key]:
+            del items[item_key]
+        if not positions:
+            del self._buckets[key]
+
+    def _move(self, relation, old_status):
+        """
+        Called by a relation of this index when its status changes
+        """
+        position = self._find(relation.item, relation.relation_type,
+                              old_status, relation)
+        if position is None:
+            return
+        self._unlink(relation, old_status, position)
+        self._add(relation, position)
+
+    def remove(self, relation):
+        """
+        Remove the first relation equal to relation.
+
+        :param relation: BaseRelation to remove
+        :raises ValueError: if there is no such relation
+        """
+        position = self._find(relation.item, relation.relation_type,
+                              relation.status)
+        if position is None:
+            raise ValueError('RelationIndex.remove(x): x not in list')
+        removed = self._items[position]
+        self._unlink(removed, removed.status, position)
+        removed._index = None
+        self._discard(position)
+
+    def _get_class_positions(self, item_class, relation_type, status):
+        """
+        Get the sorted position lists of the relations to instances of a
+        class
+        """
+        resp = []
+        for key in self._buckets:
+            if key[2] != status or not issubclass(key[0], item_class):
+                continue
+            if relation_type is ANY_RELATION_TYPE or key[1] == relation_type:
+                resp.append(self._buckets[key][0])
+        return resp
+
+    def get_relations(self, item_class, relation_type=ANY_RELATION_TYPE,
+                      status='attached'):
+        """
+        Get the relations to instances of a class, in insertion order.
+
+        :param item_class: class of the items
+        :param relation_type: relation type of the relations.  Default is\
+                              any relation type.
+        :param status: 'attached' or 'detached'.  Default is 'attached'.
+        :returns: list of BaseRelation
+        """
+        lists = self._get_class_positions(item_class, relation_type, status)
+        if len(lists) == 1:
+            positions = lists[0]
+        else:
+            positions = sorted(position for positions in lists
+                               for position in positions)
+        return [self._items[position] for position in positions]
+
+    def get_first_relation(self, item_class, relation_type=ANY_RELATION_TYPE,
+                           status='attached'):
+        """
+        Get the first relation to an instance of a class.
+
+        :param item_class: class of the item
+        :param relation_type: relation type of the relation.  Default is\
+                              any relation type.
+        :param status: 'attached' or 'detached'.  Default is 'attached'.
+        :returns: BaseRelation or None if there is none
+        """
+        lists = self._get_class_positions(item_class, relation_type, status)
+        if not lists:
+            return None
+        return self._items[min(positions[0] for positions in lists)]
+
+    def get_item_relations(self, item, relation_type=None,
+                           status='attached'):
+        """
+        Get the relations to the items equal to item, in insertion order.
+
+        :param item: the item
+        :param relation_type: relation type of the relations
+        :param status: 'attached' or 'detached'.  Default is 'attached'.
+        :returns: list of BaseRelation
+        """
+        return [self._items[position] for position in
+                self._get_bucket(item, relation_type, status)
+                if self._items[position].item == item]
+
+    def get_interfaces(self, status='attached'):
+        """
+        Get the items that are interfaces, in insertion order.
+
+        :param status: 'attached' or 'detached'.  Default is 'attached'.
+        :returns: list of items
+        """
+        positions = []
+        for key in self._buckets:
+            if key[2] != status:
+                continue
+            bucket = self._buckets[key][0]
+            if self._items[bucket[0]].item.is_interface():
+                positions.extend(bucket)
+        return [self._items[position].item for position in sorted(positions)]
+
+    def __contains__(self, relation):
+        return self._find(relation.item, relation.relation_type,
+                          relation.status) is not None
+
+
+class _LazyList(object):
+    """
+    Descriptor for a list attribute that is only allocated when it is first
+    modified.  Most objects never get children, relations, attachments or
+    tags, so this saves four empty lists per object.
+    """
+    def __init__(self, name, pending_class=_PendingList):
+        self._name = name
+        self._pending_class = pending_class
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self._pending_class(obj, self._name)
 
 
 class BaseRelation(object):
     """
     Class for all basic relations.
     """
+    __slots__ = ('item', '_status', 'relation_type', '_index')
+
     def __init__(self, item, status, relation_type=None):
         """
         A relation consists of the following elements:
@@ -42,10 +490,22 @@ class BaseRelation(object):
         """
         if status not in ('attached', 'detached'):
             raise ValueError
+        self._index = None
         self.item = item
-        self.status = status
+        self._status = status
         self.relation_type = relation_type
 
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, status):
+        old_status = self._status
+        self._status = status
+        if self._index is not None and status != old_status:
+            self._index._move(self, old_status)
+
     def is_attached(self):
         """
         :returns: True or False indicating whether the relation is attached.\
@@ -75,6 +535,8 @@ class BaseRelation(object):
 
 
 class Tag(object):
+    __slots__ = ('name', '_deleted')
+
     def __init__(self, name=None):
         self.name = name
         self._deleted = False
@@ -91,11 +553,100 @@ class Tag(object):
         return self.name == other.name and self._deleted == other._deleted
 
 
+class _Prototype(object):
+    """
+    Instance dictionary of an object built once through __init__ and
+    copied by from_mo to build the other objects of its class.  The values
+    that __init__ set to the name of the prototype are set to the name of
+    each new object and the empty containers are copied.
+    """
+    __slots__ = ('_values', '_name_keys', '_container_keys')
+
+    # Name of the prototypes.  A value derived from it, such as a part of
+    # it, can't be rebuilt for another name and the class is not copied.
+    NAME = '\x00\x01\x02\x03'
+
+    def __init__(self, values, name_keys, container_keys):
+        self._values = values
+        self._name_keys = name_keys
+        self._container_keys = container_keys
+
+    @staticmethod
+    def _is_constant(value):
+        if type(value) in (str, TEXT_TYPE):
+            for char in _Prototype.NAME:
+                if char in value:
+                    return False
+            return True
+        return value is None or type(value) in (bool, int, float)
+
+    @classmethod
+    def create(cls, toolkit_class):
+        """
+        Build the prototype of a class.
+
+        :param toolkit_class: nxtoolkit class
+        :returns: _Prototype instance or None if the objects of the class\
+                  can't be copied from a prototype
+        """
+        try:
+            obj = toolkit_class._new_prototype(cls.NAME)
+        except Exception:
+            logging.debug('No prototype for %s', toolkit_class.__name__)
+            return None
+        values = {}
+        name_keys = []
+        container_keys = []
+        for key, value in obj.__dict__.items():
+            if value is cls.NAME:
+                name_keys.append(key)
+            elif type(value) in (list, dict, set):
+                items = list(value)
+                if isinstance(value, dict):
+                    items.extend(value.values())
+                for item in items:
+                    if not cls._is_constant(item):
+                        return None
+                container_keys.append(key)
+            elif not cls._is_constant(value):
+                return None
+            values[key] = value
+        return cls(values, tuple(name_keys), tuple(container_keys))
+
+    def new_object(self, toolkit_class, name):
+        """
+        Create an object as a copy of the prototype without calling
+        __init__.
+
+        :param toolkit_class: nxtoolkit class of the object
+        :param name: String containing the name of the object
+        :returns: the new object
+        """
+        obj = toolkit_class.__new__(toolkit_class)
+        values = obj.__dict__
+        values.update(self._values)
+        for key in self._name_keys:
+            values[key] = name
+        for key in self._container_keys:
+            values[key] = copy.copy(values[key])
+        return obj
+
+
+# Prototypes of the nxtoolkit classes keyed by class, None for the classes
+# whose objects are built through __init__
+_prototypes = {}
+
+
 class BaseNXObject(NxSearch):
     """
     This class defines functionality common to all NX objects.
     Functions may be overwritten by inheriting classes.
     """
+    _children = _LazyList('_children', ChildIndex)
+    _relations = _LazyList('_relations', RelationIndex)
+    _attachments = _LazyList('_attachments', RelationIndex)
+    _tags = _LazyList('_tags')
+
     def __init__(self, name=None, parent=None):
         """
         Constructor initializes the basic object and should be called by\
@@ -113,10 +664,6 @@ class BaseNXObject(NxSearch):
             raise TypeError("Parent object can't be a string")
         self.name = name
         self._deleted = False
-        self._children = []
-        self._relations = []
-        self._attachments = []
-        self._tags = []
         self._parent = parent
         self.descr = None
         logging.debug('Creating %s %s', self.__class__.__name__, name)
@@ -125,6 +672,62 @@ class BaseNXObject(NxSearch):
                 self._parent.remove_child(self)
             self._parent.add_child(self)
 
+    @classmethod
+    def _new_prototype(cls, name):
+        """
+        Create the prototype copied by from_mo.  Meant to be overridden by
+        the classes whose __init__ takes other arguments than the name and
+        the parent.
+
+        :param name: String containing the name of the prototype
+        :returns: the prototype object
+        """
+        return cls(name)
+
+    @classmethod
+    def _new_from_prototype(cls, name):
+        """
+        Create an object of this class as a copy of its prototype, without
+        calling __init__.  The prototype is built the first time.
+
+        :param name: String containing the name of the object
+        :returns: the new object or None if the class has no prototype
+        """
+        try:
+            prototype = _prototypes[cls]
+        except KeyError:
+            prototype = _Prototype.create(cls)
+            _prototypes[cls] = prototype
+        if prototype is None:
+            return None
+        return prototype.new_object(cls, name)
+
+    @classmethod
+    def from_mo(cls, attributes, parent=None):
+        """
+        Create an object from the attributes of an MO returned by the
+        Switch.  This is the factory used by the getters to build many
+        objects: the object is a copy of a prototype of the class built
+        once through __init__, so the checks of the name and the parent
+        are skipped.  The classes that can't be copied are built through
+        __init__.
+
+        :param attributes: dictionary containing the attributes of the MO
+        :param parent: Optional parent object
+        :returns: the new object
+        """
+        name = str(attributes['name'])
+        obj = cls._new_from_prototype(name)
+        if obj is None:
+            obj = cls(name, parent)
+        elif parent is not None:
+            obj._parent = parent
+            if parent.has_child(obj):
+                parent.remove_child(obj)
+            parent.add_child(obj)
+        obj._populate_from_attributes(attributes)
+        return obj
+
     @classmethod
     def _get_subscription_urls(cls):
         """
@@ -175,14 +778,7 @@ class BaseNXObject(NxSearch):
         all of its children.
         :return: list of all switch classes
         """
-        resp = cls._get_switch_classes()
-        for child_class in cls._get_children_classes():
-            resp.extend(child_class.get_deep_switch_classes(include_concrete=include_concrete))
-        if include_concrete:
-            for child_class in cls._get_children_concrete_classes():
-                resp.extend(child_class.get_deep_switch_classes(include_concrete=include_concrete))
-
-        return list(set(resp))
+        return list(REGISTRY.get_deep_switch_classes(cls, include_concrete))
 
     @staticmethod
     def _get_parent_class():
@@ -314,21 +910,44 @@ class BaseNXObject(NxSearch):
                 existing_tag.mark_as_deleted()
 
     @classmethod
-    def _get_parent_from_dn(cls, dn):
+    def _get_parent_from_dn(cls, dn, session=None):
         """
         Derive the parent object using a dn
 
         :param dn: String containing a distinguished name of an object
+        :param session: Optional session whose parent cache is used
         """
         parent_class = cls._get_parent_class()
         if parent_class is None:
             return None
+        # The ancestors are shared by all the objects built from a dn of
+        # the same session instead of being built again for every event
+        parent_cache = get_parent_cache(session)
+        key = (parent_class, dn)
+        if parent_cache is not None:
+            parent_obj = parent_cache.get(key)
+            if parent_obj is not None:
+                return parent_obj
         parent_name = parent_class._get_name_from_dn(dn)
         parent_dn = cls._get_parent_dn(dn)
-        parent_obj = parent_class(parent_name,
-                                  parent_class._get_parent_from_dn(parent_dn))
+        parent_obj = parent_class(
+            parent_name, parent_class._get_parent_from_dn(parent_dn, session))
+        if parent_cache is not None:
+            parent_obj._detach_from_parent()
+            parent_cache.add(key, parent_obj)
         return parent_obj
 
+    def _detach_from_parent(self):
+        """
+        Remove this object from the children of its parent while keeping
+        the parent.  The parents kept in the parent cache of a session
+        don't hold the objects built from events, so the cache only keeps
+        as many objects as it has parents.
+        """
+        parent = self._parent
+        if parent is not None and parent.has_child(self):
+            parent.remove_child(self)
+
     @classmethod
     def get_deep(cls, full_data, working_data, parent=None, limit_to=[], subtree='full', config_only=False):
         """
@@ -339,27 +958,38 @@ class BaseNXObject(NxSearch):
         :param working_data:
         :param parent:
         """
+        obj = None
+        switch_classes = cls._get_switch_classes()
         for item in working_data:
             for key in item:
-                if key in cls._get_switch_classes():
-                    attribute_data = item[key]['attributes']
-                    obj = cls(str(attribute_data['name']), parent)
-                    obj._populate_from_attributes(attribute_data)
-                    if 'children' in item[key]:
-                        for child in item[key]['children']:
-                            for switch_class in child:
-                                class_map = cls._get_toolkit_to_switch_classmap()
-                                if switch_class not in class_map:
-                                    if switch_class == 'tagInst':
-                                        obj._tags.append(Tag(str(child[switch_class]['attributes']['name'])))
-                                    continue
-                                else:
-                                    class_map[switch_class].get_deep(full_data=full_data,
-                                                                   working_data=[child],
-                                                                   parent=obj,
-                                                                   limit_to=limit_to,
-                                                                   subtree=subtree,
-                                                                   config_only=config_only)
+                if key in switch_classes:
+                    obj = cls._decode_mo(key, item[key], parent)
+        return obj
+
+    @classmethod
+    def _decode_mo(cls, switch_class, mo_data, parent=None):
+        """
+        Create the object of an MO returned by the Switch along with the
+        objects of its children.  Used by get_deep and by the decode
+        function of the class registry.
+
+        :param switch_class: String containing the Switch class of the MO
+        :param mo_data: dictionary containing the attributes and children\
+                        of the MO
+        :param parent: Optional parent object
+        :returns: the new object
+        """
+        obj = cls.from_mo(mo_data['attributes'], parent)
+        if 'children' in mo_data:
+            class_map = REGISTRY.get_class_map(cls)
+            for child in mo_data['children']:
+                for child_class in child:
+                    if child_class in class_map:
+                        class_map[child_class]._decode_mo(child_class,
+                                                          child[child_class],
+                                                          obj)
+                    elif child_class == 'tagInst':
+                        obj._tags.append(Tag(str(child[child_class]['attributes']['name'])))
         return obj
 
     @classmethod
@@ -396,18 +1026,41 @@ class BaseNXObject(NxSearch):
                 if class_name in event['imdata'][0]:
                     break
             attributes = event['imdata'][0][class_name]['attributes']
-            status = str(attributes['status'])
-            dn = str(attributes['dn'])
-            parent = cls._get_parent_from_dn(cls._get_parent_dn(dn))
+            return cls._get_object_from_event(session, attributes)
+
+    @classmethod
+    def _get_object_from_event(cls, session, attributes):
+        """
+        Get the object an event is about.  If the session has an identity
+        map, the object already mapped to the dn is updated in place and
+        deleted objects are removed from the map.
+
+        :param session:  the instance of Session used for Switch communication
+        :param attributes: dictionary containing the attributes of the event
+        """
+        status = str(attributes['status'])
+        dn = str(attributes['dn'])
+        identity_map = get_identity_map(session)
+        obj = None
+        if identity_map is not None:
+            obj = identity_map.get(dn, cls)
+        if obj is None:
+            parent = cls._get_parent_from_dn(cls._get_parent_dn(dn), session)
             if status == 'created':
                 name = str(attributes['name'])
             else:
                 name = cls._get_name_from_dn(dn)
             obj = cls(name, parent=parent)
-            obj._populate_from_attributes(attributes)
-            if status == 'deleted':
-                obj.mark_as_deleted()
-            return obj
+            if get_parent_cache(session) is not None:
+                obj._detach_from_parent()
+            if identity_map is not None and status != 'deleted':
+                identity_map.add(dn, obj)
+        obj._populate_from_attributes(attributes)
+        if status == 'deleted':
+            obj.mark_as_deleted()
+            if identity_map is not None:
+                identity_map.remove(dn)
+        return obj
 
     @classmethod
     def has_events(cls, session):
@@ -471,18 +1124,7 @@ class BaseNXObject(NxSearch):
                 if class_name in event['imdata'][0]:
                     break
             attributes = event['imdata'][0][class_name]['attributes']
-            status = str(attributes['status'])
-            dn = str(attributes['dn'])
-            parent = self.__class__._get_parent_from_dn(self.__class__._get_parent_dn(dn))
-            if status == 'created':
-                name = str(attributes['name'])
-            else:
-                name = self.__class__._get_name_from_dn(dn)
-            obj = self.__class__(name, parent=parent)
-            obj._populate_from_attributes(attributes)
-            if status == 'deleted':
-                obj.mark_as_deleted()
-            return obj
+            return self.__class__._get_object_from_event(session, attributes)
 
     @classmethod
     def unsubscribe(cls, session):
@@ -614,11 +1256,7 @@ class BaseNXObject(NxSearch):
         :param child_name: Name of the child to return
         :return: The specific instance of child_type or None if not found
         """
-        children = self.get_children(child_type)
-        for child in children:
-            if child.name == child_name:
-                return child
-        return None
+        return self._children.get_by_name(child_type, child_name)
 
     def get_children(self, only_class=None):
         """
@@ -630,11 +1268,7 @@ class BaseNXObject(NxSearch):
         :returns: List of children objects.
         """
         if only_class is not None:
-            resp = []
-            for child in self._children:
-                if isinstance(child, only_class):
-                    resp.append(child)
-            return resp
+            return self._children.get_by_class(only_class)
         return self._children
 
     def add_child(self, obj):
@@ -654,10 +1288,7 @@ class BaseNXObject(NxSearch):
         :returns:  True or False, True indicates that it does indeed\
                    have the `obj` object as a child.
         """
-        for child in self._children:
-            if child == obj:
-                return True
-        return False
+        return obj in self._children
 
     def remove_child(self, obj):
         """
@@ -700,20 +1331,11 @@ class BaseNXObject(NxSearch):
 
     def _has_any_relation(self, other_class):
         """Check if the object has any relation to the other class"""
-        for relation in self._relations:
-            is_other_class = isinstance(relation.item, other_class)
-            if is_other_class and relation.is_attached():
-                return True
-        return False
+        return self._relations.get_first_relation(other_class) is not None
 
     def _has_relation(self, obj, relation_type=None):
         """Check if the object has a relation to the other object"""
-        for relation in self._relations:
-            same_item = relation.item == obj
-            same_relation_type = relation.relation_type == relation_type
-            if same_item and relation.is_attached() and same_relation_type:
-                return True
-        return False
+        return BaseRelation(obj, 'attached', relation_type) in self._relations
 
     def _add_relation(self, obj, relation_type=None):
         """Add a relation to the object"""
@@ -724,53 +1346,36 @@ class BaseNXObject(NxSearch):
 
     def _remove_relation(self, obj, relation_type=None):
         """Remove a relation from the object"""
-        removal = BaseRelation(obj, 'attached', relation_type)
-        for relation in self._relations:
-            if relation == removal:
-                relation.set_as_detached()
+        for relation in self._relations.get_item_relations(obj,
+                                                           relation_type):
+            relation.set_as_detached()
         return True
 
     def _remove_all_relation(self, obj_class, relation_type=None):
         """Remove all relations belonging to a particular class"""
-        for relation in self._relations:
-            same_obj_class = isinstance(relation.item, obj_class)
-            same_relation_type = relation.relation_type == relation_type
-            attached = relation.is_attached()
-            if same_obj_class and same_relation_type and attached:
-                relation.set_as_detached()
+        for relation in self._relations.get_relations(obj_class,
+                                                      relation_type):
+            relation.set_as_detached()
 
     def _get_any_relation(self, obj_class, relation_type=None):
         """Return a single relation belonging to a particular class.
            This will return the first relation encountered.
         """
-        for relation in self._relations:
-            same_obj_class = isinstance(relation.item, obj_class)
-            same_relation_type = relation.relation_type == relation_type
-            attached = relation.is_attached()
-            if same_obj_class and attached and same_relation_type:
-                return relation.item
+        relation = self._relations.get_first_relation(obj_class,
+                                                      relation_type)
+        if relation is not None:
+            return relation.item
 
     def _get_all_relation(self, obj_class, relation_type=None):
         """Get all relations belonging to a particular class"""
-        resp = []
-        for relation in self._relations:
-            same_obj_class = isinstance(relation.item, obj_class)
-            same_relation_type = relation.relation_type == relation_type
-            attached = relation.is_attached()
-            if same_obj_class and attached and same_relation_type:
-                resp.append(relation.item)
-        return resp
+        return [relation.item for relation in
+                self._relations.get_relations(obj_class, relation_type)]
 
     def _get_all_detached_relation(self, obj_class, relation_type=None):
         """Get all detached relations belonging to a particular class"""
-        resp = []
-        for relation in self._relations:
-            same_obj_class = isinstance(relation.item, obj_class)
-            same_relation_type = relation.relation_type == relation_type
-            attached = relation.is_attached()
-            if same_obj_class and not attached and same_relation_type:
-                resp.append(relation.item)
-        return resp
+        return [relation.item for relation in
+                self._relations.get_relations(obj_class, relation_type,
+                                              'detached')]
 
     def get_interfaces(self, status='attached'):
         """
@@ -783,11 +1388,7 @@ class BaseNXObject(NxSearch):
         :returns:  List of interfaces that this object has relations\
                    and the status matches.
         """
-        resp = []
-        for relation in self._relations:
-            if relation.item.is_interface() and relation.status == status:
-                resp.append(relation.item)
-        return resp
+        return self._relations.get_interfaces(status)
 
     def _get_all_relations_by_class(self, relations, attached_class,
                                     status='attached'):
@@ -799,13 +1400,8 @@ class BaseNXObject(NxSearch):
         :param status:  Valid values are 'attached' and 'detached'.\
                         Default is 'attached'.
         """
-        resp = []
-        for relation in relations:
-            same_class = isinstance(relation.item, attached_class)
-            same_status = relation.status == status
-            if same_class and same_status:
-                resp.append(relation.item)
-        return resp
+        return [relation.item for relation in
+                relations.get_relations(attached_class, status=status)]
 
     def get_all_attached(self, attached_class, status='attached'):
         """
@@ -854,10 +1450,15 @@ class BaseNXObject(NxSearch):
                               should be included.
         :returns: JSON dictionary to be pushed to the Switch.
         """
-        if children is None:
-            children = []
         if attributes is None:
             attributes = {}
+        values = self.__dict__
+        if not (children or values.get('_tags') or values.get('_children') or
+                self._deleted):
+            # Most objects are leaves without tags, there is nothing to walk
+            return {obj_class: {'attributes': attributes, 'children': []}}
+        if children is None:
+            children = []
         children_json = []
         for child in children:
             children_json.append(child)
@@ -866,7 +1467,12 @@ class BaseNXObject(NxSearch):
             if tag.is_deleted():
                 child['tagInst']['attributes']['status'] = 'deleted'
             children_json.append(child)
-        if get_children:
+        if get_children and get_streamed_object() is self:
+            # The serializer streaming this object gets the JSON of the
+            # children when it writes them
+            for child in self._children:
+                children_json.append(ChildJson(child))
+        elif get_children:
             for child in self._children:
                 data = child.get_json()
                 if data is not None:
@@ -891,6 +1497,16 @@ class BaseNXObject(NxSearch):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def _get_identity_key(self):
+        """
+        Get the key under which this object is indexed among the children
+        of its parent.  Objects that are equal must have the same key, so
+        classes that override __eq__ override this too.
+
+        :returns: hashable key
+        """
+        return self.name
+
     def _populate_from_attributes(self, attributes):
         """Fills in an object with the desired attributes.
            Overridden by inheriting classes to provide the specific attributes
@@ -932,10 +1548,8 @@ class BaseNXObject(NxSearch):
         logging.debug('response returned %s', data)
         resp = []
         for object_data in data:
-            name = str(object_data[switch_class]['attributes']['name'])
-            obj = toolkit_class(name, parent)
-            attribute_data = object_data[switch_class]['attributes']
-            obj._populate_from_attributes(attribute_data)
+            obj = toolkit_class.from_mo(object_data[switch_class]['attributes'],
+                                        parent)
             resp.append(obj)
         return resp
 
@@ -962,10 +1576,8 @@ class BaseNXObject(NxSearch):
         logging.debug('response returned %s', data)
         resp = []
         for object_data in data:
-            name = str(object_data[switch_class]['attributes']['name'])
-            obj = toolkit_class(name, parent)
-            attribute_data = object_data[switch_class]['attributes']
-            obj._populate_from_attributes(attribute_data)
+            obj = toolkit_class.from_mo(object_data[switch_class]['attributes'],
+                                        parent)
             resp.append(obj)
         return resp
 
@@ -1063,6 +1675,55 @@ class BaseNXPhysObject(BaseNXObject):
                 self.pod = parent.pod
         super(BaseNXPhysObject, self).__init__(name=name, parent=parent)
 
+    def _get_identity_key(self):
+        """
+        Physical objects fill in the attributes compared by __eq__ after
+        they are added to their parent, so they share a single key and are
+        only told apart by __eq__.
+        """
+        return None
+
+    @classmethod
+    def _new_prototype(cls, name):
+        """
+        Physical objects are built without a name
+        """
+        return cls()
+
+    @classmethod
+    def from_mo(cls, attributes, parent=None):
+        """
+        Create an object from the attributes of an MO returned by the
+        Switch, as a copy of a prototype of the class.  Used by the getters
+        of the classes built without arguments such as the concrete
+        classes.
+
+        :param attributes: dictionary containing the attributes of the MO
+        :param parent: Optional parent object
+        :returns: the new object
+        """
+        obj = cls._new_from_prototype('')
+        if obj is None:
+            obj = cls(parent=parent)
+        elif parent is not None:
+            obj._parent = parent
+            obj.pod = parent.pod
+            if parent.has_child(obj):
+                parent.remove_child(obj)
+            parent.add_child(obj)
+        obj._populate_from_attributes(attributes)
+        return obj
+
+    @classmethod
+    def _decode_mo(cls, switch_class, mo_data, parent=None):
+        """
+        Physical objects are built by their get() methods from several
+        queries, so by default they are not decoded from a single MO.
+
+        :returns: None
+        """
+        return None
+
     @staticmethod
     def _delete_redundant_policy(infra, policy_type):
         """
@@ -1158,11 +1819,7 @@ class BaseNXPhysObject(BaseNXObject):
         :returns: list of children
         """
         if child_type:
-            children = []
-            for child in self._children:
-                if isinstance(child, child_type):
-                    children.append(child)
-            return children
+            return self._children.get_by_class(child_type)
         else:
             return self._children
 
@@ -1300,9 +1957,26 @@ class BaseNXPhysModule(BaseNXPhysObject):
 
            :returns: pod, node, slot strings
         """
-        name = dn.split('/')
-        slot = str(name[2].split('-')[1])
-        return slot
+        return str(Dn(dn).slot)
+
+    @classmethod
+    def _decode_mo(cls, switch_class, mo_data, parent=None):
+        """
+        Create the module of an MO returned by the Switch.  The firmware
+        is not read since it needs another query.
+
+        :param switch_class: String containing the Switch class of the MO
+        :param mo_data: dictionary containing the attributes of the MO
+        :param parent: Optional parent Node
+        :returns: the new module
+        """
+        attributes = mo_data['attributes']
+        card = cls(cls._parse_dn(str(attributes['dn'])))
+        card._populate_from_attributes(attributes)
+        if parent is not None:
+            card._parent = parent
+            card._parent.add_child(card)
+        return card
 
     @classmethod
     def get_obj(cls, session, switch_classes, parent_node):
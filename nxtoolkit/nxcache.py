@@ -0,0 +1,271 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the IdentityMap class that lets the getters and
+     the events of a Session resolve the same dn to the same object, the
+     LruCache class used by each Session to reuse the parents rebuilt from
+     a dn, and the InternTable class that shares the strings of the
+     decoded JSON.
+"""
+from collections import OrderedDict
+import json
+import threading
+import weakref
+
+try:
+    TEXT_TYPE = unicode
+except NameError:
+    TEXT_TYPE = str
+
+# Number of parent objects kept by a Session for the objects built from
+# events
+PARENT_CACHE_SIZE = 1024
+# Number of distinct strings kept by an InternTable before it is emptied
+INTERN_TABLE_SIZE = 65536
+# Longer values such as descriptions are rarely repeated and not interned
+INTERN_MAX_LENGTH = 64
+# Attributes whose values are different in every MO and not interned
+UNIQUE_ATTRIBUTES = frozenset(['dn', 'modTs', 'addr'])
+
+
+class IdentityMap(object):
+    """
+    Maps the dn of every object read through a Session to the object.
+    When a Session has an identity map, repeated gets and events update
+    the existing object in place instead of building a new one, so that
+    every part of the application sees the same object graph.
+
+    The objects are weakly referenced.  An object that is no longer used
+    by the application is dropped from the map and is built again by the
+    next get.
+    """
+    def __init__(self):
+        self._objects = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, dn, obj_class=None):
+        """
+        Get the object of a dn.
+
+        :param dn: String containing the distinguished name of the object
+        :param obj_class: Class the object must be an instance of.\
+                          Default is None which accepts any class.
+        :returns: the object or None if there is no such object
+        """
+        obj = self._objects.get(dn)
+        if obj is None or (obj_class is not None and
+                           not isinstance(obj, obj_class)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return obj
+
+    def add(self, dn, obj):
+        """
+        Add an object, replacing any object previously mapped to the dn.
+
+        :param dn: String containing the distinguished name of the object
+        :param obj: the object
+        """
+        self._objects[dn] = obj
+
+    def remove(self, dn):
+        """
+        Remove the object of a dn, usually because it was deleted.
+
+        :param dn: String containing the distinguished name of the object
+        """
+        self._objects.pop(dn, None)
+
+    def clear(self):
+        """
+        Remove all of the objects
+        """
+        self._objects.clear()
+
+    def __contains__(self, dn):
+        return dn in self._objects
+
+    def __len__(self):
+        return len(self._objects)
+
+
+class LruCache(object):
+    """
+    Dictionary holding at most max_size items.  When it is full, adding
+    an item drops the least recently used one.  It can be used by several
+    threads, such as the subscriber and the consumer of a Session.
+    """
+    def __init__(self, max_size):
+        """
+        :param max_size: Maximum number of items kept
+        """
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Get an item and make it the most recently used one.
+
+        :param key: key of the item
+        :returns: the item or None if there is no such item
+        """
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self._items[key] = value
+            self.hits += 1
+            return value
+
+    def add(self, key, value):
+        """
+        Add an item, dropping the least recently used item if needed.
+
+        :param key: key of the item
+        :param value: the item
+        """
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all of the items
+        """
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _get_native_string(value):
+    """
+    Get an ASCII unicode string as a str with python 2
+    """
+    if TEXT_TYPE is not str:
+        try:
+            return value.encode('ascii')
+        except UnicodeError:
+            pass
+    return value
+
+
+class InternTable(object):
+    """
+    Shares the strings of the JSON decoded from the Switch.  The attribute
+    names and most of the attribute values such as 'up', 'access' or
+    'Layer2' are the same in every MO, so a decoded snapshot holds one
+    copy of each of them instead of one per MO.
+
+    With python 2 the ASCII strings are also returned as str instead of
+    unicode, so the str() calls of the toolkit return them without a copy.
+    """
+    def __init__(self, max_size=INTERN_TABLE_SIZE,
+                 max_length=INTERN_MAX_LENGTH):
+        """
+        :param max_size: Maximum number of strings kept.  The table is\
+                         emptied when it is full.
+        :param max_length: Length of the longest value interned
+        """
+        self.max_size = max_size
+        self.max_length = max_length
+        self._strings = {}
+
+    def intern(self, value):
+        """
+        Get the shared copy of a string
+
+        :param value: String to intern
+        :returns: String equal to value
+        """
+        string = self._strings.get(value)
+        if string is None:
+            if len(self._strings) >= self.max_size:
+                self._strings.clear()
+            string = _get_native_string(value)
+            self._strings[value] = string
+        return string
+
+    def object_pairs_hook(self, pairs):
+        """
+        object_pairs_hook of json.loads interning the keys and the short
+        string values of the decoded objects.
+
+        :param pairs: list of (key, value) tuples of a JSON object
+        :returns: dictionary
+        """
+        get = self._strings.get
+        intern = self.intern
+        max_length = self.max_length
+        result = {}
+        for key, value in pairs:
+            key = get(key) or intern(key)
+            if type(value) is TEXT_TYPE:
+                if len(value) > max_length or key in UNIQUE_ATTRIBUTES:
+                    value = _get_native_string(value)
+                else:
+                    value = get(value) or intern(value)
+            result[key] = value
+        return result
+
+    def loads(self, text):
+        """
+        Decode a JSON document
+
+        :param text: String containing the JSON document
+        :returns: the decoded document
+        """
+        return json.loads(text, object_pairs_hook=self.object_pairs_hook)
+
+    def __len__(self):
+        return len(self._strings)
+
+
+def get_identity_map(session):
+    """
+    Get the identity map of a session.  Sessions that are not a Session
+    instance, such as a ReplaySession, have no identity map.
+
+    :param session: the session used for Switch communication
+    :returns: IdentityMap instance or None
+    """
+    return getattr(session, 'identity_map', None)
+
+
+def get_parent_cache(session):
+    """
+    Get the cache of the parents rebuilt from a dn of a session.  Sessions
+    that are not a Session instance have no parent cache.
+
+    :param session: the session used for Switch communication
+    :returns: LruCache instance or None
+    """
+    return getattr(session, 'parent_cache', None)
@@ -0,0 +1,750 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the ChangeSet class that pushes the JSON of many
+     nxtoolkit objects to a Switch in as few requests as possible, merging
+     them by dn under their common ancestors, that can push only what
+     differs from the configuration of the Switch, and that can read back
+     the MOs it pushed to verify them.
+"""
+import json
+import logging
+import re
+from .nxdn import Dn
+
+# Switch classes of the containers the JSON of the objects is merged into,
+# keyed by dn.  Objects whose URL is not below these containers are pushed
+# on their own.
+CONTAINER_CLASSES = {
+    'sys': 'topSystem',
+    'sys/intf': 'interfaceEntity',
+    'sys/bd': 'bdEntity',
+    'sys/vrrp': 'vrrpEntity',
+    'sys/vrrp/inst': 'vrrpInst',
+    'sys/dhcp': 'dhcpEntity',
+    'sys/dhcp/inst': 'dhcpInst',
+    'sys/ipv6': 'ipv6Entity',
+    'sys/ipv6/inst': 'ipv6Inst',
+    'sys/ipv6/inst/dom-default': 'ipv6Dom',
+    'sys/icmpv4': 'icmpv4Entity',
+    'sys/icmpv4/inst': 'icmpv4Inst',
+    'sys/icmpv4/inst/dom-default': 'icmpv4Dom',
+    'sys/icmpv6': 'icmpv6Entity',
+    'sys/icmpv6/inst': 'icmpv6Inst',
+    'sys/bgp': 'bgpEntity',
+    'sys/bgp/inst': 'bgpInst',
+    'sys/ethpm': 'ethpmEntity',
+    'sys/ethpm/inst': 'ethpmInst',
+    'sys/syslog': 'syslogSyslog',
+    'sys/breakout': 'imBreakout',
+    'sys/fm': 'fmEntity',
+    'sys/boot': 'bootBoot',
+    'sys/dns': 'dnsEntity',
+}
+
+# Largest body in bytes sent in one request.  The objects are split into
+# several requests above it.
+MAX_BODY_SIZE = 1048576
+
+# URL of an MO such as /api/mo/sys/intf.json or /api/node/mo/sys.json
+MO_URL = re.compile(r'^/api/(?:node/)?mo/(.+?)/?\.json$')
+
+# Attributes naming an MO among the children of its parent, in the order
+# they are used to match the desired MOs with the MOs of the Switch.  They
+# are always sent with the changed attributes.
+NAMING_ATTRIBUTES = ('id', 'fabEncap', 'pcId', 'addr', 'nhAddr', 'secondary',
+                     'name')
+
+# Query of the configuration of the children of a class below an MO
+CONFIG_QUERY = ('?query-target=children&target-subtree-class=%s'
+                '&rsp-subtree=full&rsp-prop-include=config-only')
+
+# Number of MOs read by one query when verifying a ChangeSet
+VERIFY_CHUNK_SIZE = 50
+
+# Query of the configuration of the MOs of a class picked by a filter
+FILTER_QUERY = ('?query-target-filter=%s&rsp-subtree=full'
+                '&rsp-prop-include=config-only')
+
+try:
+    STRING_TYPES = basestring
+except NameError:
+    STRING_TYPES = str
+
+# Dns of the containers keyed by the dn of their parent and their class
+_CONTAINER_DNS = dict(((Dn(dn).parent, obj_class), Dn(dn))
+                      for dn, obj_class in CONTAINER_CLASSES.items())
+
+
+class ChangeResult(object):
+    """
+    Result of pushing an object in a ChangeSet
+    """
+    def __init__(self, obj, url, response):
+        """
+        :param obj: the nxtoolkit object
+        :param url: String containing the URL of the request that pushed\
+                    the object
+        :param response: Response of the request, None if the object had\
+                         no JSON to push
+        """
+        self.obj = obj
+        self.url = url
+        self.response = response
+
+    @property
+    def ok(self):
+        """
+        True if the object was pushed successfully
+        """
+        return self.response is None or self.response.ok
+
+    def __repr__(self):
+        return '<ChangeResult %s %s>' % (self.url, 'ok' if self.ok else
+                                         'failed')
+
+
+class VerifyResult(object):
+    """
+    Result of reading back an object of a ChangeSet
+    """
+    def __init__(self, obj, differences, verified=True):
+        """
+        :param obj: the nxtoolkit object
+        :param differences: list of the JSON dictionaries of the pushed MOs\
+                            that differ from the MOs of the Switch
+        :param verified: False if the MOs of the object could not be read
+        """
+        self.obj = obj
+        self.differences = differences
+        self.verified = verified
+
+    @property
+    def ok(self):
+        """
+        True if the Switch has the configuration of the object
+        """
+        return self.verified and not self.differences
+
+    def __repr__(self):
+        if not self.verified:
+            return '<VerifyResult not verified>'
+        return '<VerifyResult %s differences>' % len(self.differences)
+
+
+class _Change(object):
+    """
+    JSON of an object of a ChangeSet and where it goes in the MIT
+    """
+    __slots__ = ('obj', 'url', 'data', 'dn', 'parent_dn', 'size')
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.url = obj.get_url()
+        self.data = obj.get_json()
+        self.dn = None
+        self.parent_dn = None
+        self.size = 0
+        if self.data is None:
+            return
+        self.set_data(self.data)
+        match = MO_URL.match(self.url)
+        if not match or not isinstance(self.data, dict) or \
+                len(self.data) != 1:
+            return
+        url_dn = Dn(match.group(1))
+        obj_class = list(self.data)[0]
+        container_class = CONTAINER_CLASSES.get(url_dn)
+        if container_class == obj_class:
+            # The object is the container of the URL
+            self.dn = url_dn
+            self.parent_dn = url_dn.parent
+        elif container_class is not None:
+            # The object is posted to its parent container
+            self.parent_dn = url_dn
+        else:
+            self.dn = url_dn
+            self.parent_dn = url_dn.parent
+        path = self.dn or self.parent_dn
+        if path.rns[0] != 'sys' or not _is_container(self.parent_dn):
+            self.dn = self.parent_dn = None
+
+    @property
+    def is_mergeable(self):
+        """
+        True if the JSON can be merged with the JSON of other objects
+        """
+        return self.parent_dn is not None
+
+    @property
+    def obj_class(self):
+        """
+        Switch class of the MO of the JSON
+        """
+        return list(self.data)[0]
+
+    def set_data(self, data):
+        """
+        Set the JSON pushed for the object
+
+        :param data: JSON dictionary or None if there is nothing to push
+        """
+        self.data = data
+        # The JSON and the separator before it in the merged body
+        self.size = 0 if data is None else len(json.dumps(data)) + 2
+
+    def get_containers(self):
+        """
+        Get the containers the JSON is merged into with their size
+
+        :returns: list of (dn, size) tuples
+        """
+        resp = []
+        dn = self.parent_dn
+        while dn:
+            wrapper = {CONTAINER_CLASSES[dn]: {'attributes': {},
+                                               'children': []}}
+            resp.append((dn, len(json.dumps(wrapper)) + 2))
+            dn = dn.parent
+        return resp
+
+
+def _is_container(dn):
+    """
+    Check if a dn and all of its ancestors are known containers.  The
+    empty dn above sys is the root of all of them.
+
+    :param dn: Dn instance
+    :returns: True or False
+    """
+    while dn:
+        if dn not in CONTAINER_CLASSES:
+            return False
+        dn = dn.parent
+    return True
+
+
+def _get_common_dn(dns):
+    """
+    Get the dn of the deepest object containing all of the dns
+
+    :param dns: list of Dn instances
+    :returns: Dn instance
+    """
+    rns = list(dns[0].rns)
+    for dn in dns[1:]:
+        other = dn.rns
+        length = 0
+        while (length < len(rns) and length < len(other) and
+               rns[length] == other[length]):
+            length += 1
+        del rns[length:]
+    return Dn('/'.join(rns))
+
+
+def _same_value(value, current):
+    """
+    Check if an attribute value is the value of the Switch
+    """
+    if value == current:
+        return True
+    return not isinstance(value, STRING_TYPES) and str(value) == current
+
+
+def _get_dn_index(obj_class, mos):
+    """
+    Index the MOs of the Switch of a class by dn
+
+    :param obj_class: String containing the Switch class of the MOs
+    :param mos: list of JSON dictionaries of the MOs of the Switch
+    :returns: dictionary of the attributes and children of the MOs keyed\
+              by dn
+    """
+    index = {}
+    for mo in mos:
+        if obj_class in mo:
+            dn = mo[obj_class].get('attributes', {}).get('dn')
+            if dn is not None:
+                index[dn] = mo[obj_class]
+    return index
+
+
+def _find_mo(body, mos):
+    """
+    Find the MO of the Switch matching the JSON of a desired MO.  The MOs
+    are matched by the first naming attribute of the desired MO, or by
+    class alone if it has no naming attribute.
+
+    :param body: JSON dictionary of the desired MO
+    :param mos: list of JSON dictionaries of the MOs of the Switch
+    :returns: JSON dictionary of the matching MO or None
+    """
+    obj_class = list(body)[0]
+    attributes = body[obj_class].get('attributes', {})
+    candidates = [mo[obj_class] for mo in mos if obj_class in mo]
+    for name in NAMING_ATTRIBUTES:
+        if name in attributes:
+            for candidate in candidates:
+                if _same_value(attributes[name],
+                               candidate.get('attributes', {}).get(name)):
+                    return candidate
+            return None
+    if len(candidates) == 1:
+        return candidates[0]
+    return None
+
+
+def _diff(body, current):
+    """
+    Get the part of the JSON of a desired MO that differs from the MO of
+    the Switch: the changed attributes along with the naming attributes,
+    the changed children, the new children and the deleted children that
+    exist on the Switch.  The children of the Switch that are not in the
+    desired JSON are left as they are.
+
+    :param body: JSON dictionary of the desired MO
+    :param current: JSON dictionary of the attributes and the children of\
+                    the MO of the Switch, or None if it does not exist
+    :returns: JSON dictionary or None if there is no difference
+    """
+    obj_class = list(body)[0]
+    attributes = body[obj_class].get('attributes', {})
+    deleted = attributes.get('status') == 'deleted'
+    if current is None:
+        return None if deleted else body
+    if deleted:
+        return body
+    current_attributes = current.get('attributes', {})
+    changed = {}
+    for key, value in attributes.items():
+        if key not in current_attributes or \
+                not _same_value(value, current_attributes[key]):
+            changed[key] = value
+    current_children = current.get('children', [])
+    children = []
+    for child in body[obj_class].get('children', []):
+        child_diff = _diff(child, _find_mo(child, current_children))
+        if child_diff is not None:
+            children.append(child_diff)
+    if not changed and not children:
+        return None
+    for key in NAMING_ATTRIBUTES:
+        if key in attributes:
+            changed[key] = attributes[key]
+    return {obj_class: {'attributes': changed, 'children': children}}
+
+
+def _get_filter(obj_class, name, values):
+    """
+    Get a query-target-filter matching the MOs whose attribute is one of
+    the values
+    """
+    terms = ['eq(%s.%s,"%s")' % (obj_class, name, value) for value in values]
+    if len(terms) == 1:
+        return terms[0]
+    return 'or(%s)' % ','.join(terms)
+
+
+def _get_naming_attribute(body):
+    """
+    Get the name of the first naming attribute of the JSON of an MO
+    """
+    attributes = list(body.values())[0].get('attributes', {})
+    for name in NAMING_ATTRIBUTES:
+        if name in attributes:
+            return name
+    return None
+
+
+def _get_checks(change):
+    """
+    Get the MOs read back to verify a change.  The children posted to a
+    known container are checked one by one below the container, so that
+    only the MOs of the change are read instead of the whole container.
+
+    :param change: mergeable _Change instance
+    :returns: list of (dn, parent_dn, body) tuples where dn is None when\
+              the MO is only known by its naming attributes
+    """
+    if change.dn is not None:
+        return [(change.dn, change.parent_dn, change.data)]
+    checks = []
+    pending = [(change.parent_dn, change.data)]
+    while pending:
+        parent_dn, body = pending.pop(0)
+        obj_class = list(body)[0]
+        dn = _CONTAINER_DNS.get((parent_dn, obj_class))
+        if dn is None:
+            checks.append((None, parent_dn, body))
+            continue
+        attributes = body[obj_class].get('attributes', {})
+        if attributes:
+            checks.append((dn, parent_dn,
+                           {obj_class: {'attributes': attributes}}))
+        pending.extend((dn, child)
+                       for child in body[obj_class].get('children', []))
+    return checks
+
+
+class _Node(object):
+    """
+    MO of a merged body, keyed by dn in its parent
+    """
+    __slots__ = ('obj_class', 'attributes', 'children', 'nodes')
+
+    def __init__(self, obj_class):
+        self.obj_class = obj_class
+        self.attributes = {}
+        self.children = []
+        self.nodes = {}
+
+    def get_node(self, rn, obj_class):
+        """
+        Get the child node of an rn, adding it the first time
+        """
+        node = self.nodes.get(rn)
+        if node is None:
+            node = _Node(obj_class)
+            self.nodes[rn] = node
+            self.children.append(node)
+        return node
+
+    def merge(self, data):
+        """
+        Merge the JSON of the MO of this node
+        """
+        body = list(data.values())[0]
+        self.attributes.update(body.get('attributes', {}))
+        self.children.extend(body.get('children', []))
+
+    def get_json(self):
+        children = []
+        for child in self.children:
+            if isinstance(child, _Node):
+                child = child.get_json()
+            children.append(child)
+        return {self.obj_class: {'attributes': self.attributes,
+                                 'children': children}}
+
+
+class ChangeSet(object):
+    """
+    Set of nxtoolkit objects pushed together to a Switch.  Instead of one
+    request per object, the JSON of the objects is merged by dn into a
+    body rooted at their common ancestor, such as /api/mo/sys.json, and
+    sent in as few requests as the size limit allows.
+
+    The objects whose URL is not below the known containers, or whose JSON
+    is not a single MO, are pushed on their own with their URL.
+
+    When the ChangeSet is pushed in reconcile mode, the configuration of
+    the Switch is read first and only what differs is pushed, so that the
+    objects that did not change are not sent at all.
+    """
+    def __init__(self, objs=None, max_size=MAX_BODY_SIZE):
+        """
+        :param objs: Optional list of nxtoolkit objects
+        :param max_size: Largest body in bytes sent in one request.  An\
+                         object whose JSON is larger is sent on its own.
+        """
+        self.max_size = max_size
+        self._objs = []
+        for obj in objs or []:
+            self.add(obj)
+
+    def add(self, obj):
+        """
+        Add an object.  Its JSON is read when the ChangeSet is pushed.
+
+        :param obj: nxtoolkit object with get_url and get_json methods
+        """
+        self._objs.append(obj)
+
+    def __len__(self):
+        return len(self._objs)
+
+    def _get_batches(self, changes):
+        """
+        Split the mergeable changes into the batches sent in one request
+        """
+        batches = []
+        batch = []
+        size = 0
+        containers = set()
+        for change in changes:
+            change_containers = change.get_containers()
+            change_size = change.size + sum(
+                container_size for dn, container_size in change_containers
+                if dn not in containers)
+            if batch and size + change_size > self.max_size:
+                batches.append(batch)
+                batch = []
+                containers = set()
+                change_size = change.size + sum(
+                    container_size for _, container_size in change_containers)
+                size = 0
+            batch.append(change)
+            size += change_size
+            containers.update(dn for dn, _ in change_containers)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def _merge(batch):
+        """
+        Merge the JSON of a batch of changes
+
+        :returns: tuple of the URL and of the JSON of the request
+        """
+        dns = [change.dn or change.parent_dn for change in batch]
+        root_dn = _get_common_dn(dns)
+        obj_class = CONTAINER_CLASSES.get(root_dn)
+        if obj_class is None:
+            # All of the objects are the same MO
+            obj_class = list(batch[0].data)[0]
+        root = _Node(obj_class)
+        depth = len(root_dn.rns)
+        for change in batch:
+            node = root
+            path = change.dn or change.parent_dn
+            for index in range(depth, len(path.rns)):
+                dn = Dn('/'.join(path.rns[:index + 1]))
+                obj_class = CONTAINER_CLASSES.get(dn)
+                if obj_class is None:
+                    obj_class = list(change.data)[0]
+                node = node.get_node(path.rns[index], obj_class)
+            if change.dn is not None:
+                node.merge(change.data)
+            else:
+                node.children.append(change.data)
+        return '/api/mo/%s.json' % root_dn, root.get_json()
+
+    def _get_requests(self, changes):
+        """
+        Get the requests pushing changes
+
+        :returns: list of (url, data, changes) tuples
+        """
+        requests = []
+        for change in changes:
+            if change.data is not None and not change.is_mergeable:
+                requests.append((change.url, change.data, [change]))
+        mergeable = [change for change in changes
+                     if change.data is not None and change.is_mergeable]
+        batches = self._get_batches(mergeable)
+        while batches:
+            batch = batches.pop(0)
+            url, data = self._merge(batch)
+            if len(batch) > 1 and len(json.dumps(data)) > self.max_size:
+                # The containers made the body too large, split it in two
+                half = len(batch) // 2
+                batches[:0] = [batch[:half], batch[half:]]
+                continue
+            requests.append((url, data, batch))
+        return requests
+
+    def get_requests(self):
+        """
+        Get the requests pushing the objects
+
+        :returns: list of (url, data, objs) tuples where objs is the list\
+                  of the objects pushed by the request
+        """
+        changes = [_Change(obj) for obj in self._objs]
+        return [(url, data, [change.obj for change in batch])
+                for url, data, batch in self._get_requests(changes)]
+
+    @staticmethod
+    def _reconcile(session, changes):
+        """
+        Reduce the JSON of the changes to what differs from the
+        configuration of the Switch.  The configuration of the children of
+        a class below a container is read with a single query.  The JSON
+        of the changes whose configuration could not be read is kept.
+
+        :param session: the instance of Session used for Switch communication
+        :param changes: list of _Change instances
+        """
+        groups = {}
+        for change in changes:
+            if change.data is not None and change.is_mergeable:
+                key = (change.parent_dn, change.obj_class)
+                groups.setdefault(key, []).append(change)
+        for (parent_dn, obj_class), group in groups.items():
+            if parent_dn:
+                url = '/api/mo/%s.json' % parent_dn + CONFIG_QUERY % obj_class
+            else:
+                url = ('/api/mo/%s.json?rsp-subtree=full'
+                       '&rsp-prop-include=config-only' % group[0].dn)
+            resp = session.get(url)
+            if not resp.ok:
+                logging.warning('Could not read the configuration %s, '
+                                'pushing %s objects whole', url, len(group))
+                continue
+            mos = resp.json()['imdata']
+            dn_index = _get_dn_index(obj_class, mos)
+            for change in group:
+                if change.dn is not None and dn_index:
+                    current = dn_index.get(change.dn)
+                else:
+                    current = _find_mo(change.data, mos)
+                change.set_data(_diff(change.data, current))
+
+    def push(self, session, retry=True, reconcile=False):
+        """
+        Push the objects to the Switch
+
+        :param session: the instance of Session used for Switch communication
+        :param retry: Boolean to push the objects of a failed request again\
+                      one by one, so that each object gets its own result
+        :param reconcile: Boolean to read the configuration of the Switch\
+                          and push only the attributes and the children\
+                          that differ
+        :returns: list of ChangeResult instances in the order of the\
+                  objects.  The objects that had nothing to push have no\
+                  response.
+        """
+        changes = [_Change(obj) for obj in self._objs]
+        if reconcile:
+            self._reconcile(session, changes)
+        results = {}
+        for url, data, batch in self._get_requests(changes):
+            resp = session.push_to_switch(url, data)
+            if not resp.ok and retry and len(batch) > 1:
+                logging.warning('ChangeSet request %s failed, pushing its '
+                                '%s objects one by one', url, len(batch))
+                for change in batch:
+                    change_resp = session.push_to_switch(change.url,
+                                                         change.data)
+                    results[id(change.obj)] = ChangeResult(
+                        change.obj, change.url, change_resp)
+                continue
+            for change in batch:
+                results[id(change.obj)] = ChangeResult(change.obj, url, resp)
+        return [results.get(id(obj)) or ChangeResult(obj, None, None)
+                for obj in self._objs]
+
+    @staticmethod
+    def _read_back(session, url, count):
+        """
+        Read the configuration of MOs
+
+        :returns: list of JSON dictionaries of the MOs or None
+        """
+        resp = session.get(url)
+        if not resp.ok:
+            logging.warning('Could not read back %s, %s objects not verified',
+                            url, count)
+            return None
+        return resp.json()['imdata']
+
+    def verify(self, session, chunk_size=VERIFY_CHUNK_SIZE):
+        """
+        Read back the MOs pushed by the ChangeSet and compare them with the
+        JSON of the objects.  Only the MOs of the objects are read: the MOs
+        of a class are picked by dn with one query-target-filter query per
+        chunk of MOs, and the MOs posted to a container by their naming
+        attribute, so that the cost of the verification grows with the
+        size of the change instead of the size of the Switch.
+
+        The objects that are not below the known containers are not read
+        back and are not verified.
+
+        :param session: the instance of Session used for Switch communication
+        :param chunk_size: Largest number of MOs read by one query
+        :returns: list of VerifyResult instances in the order of the objects
+        """
+        results = {}
+        by_dn = {}
+        by_name = {}
+        checks = {}
+        for change in [_Change(obj) for obj in self._objs]:
+            key = id(change.obj)
+            if change.data is None:
+                results[key] = VerifyResult(change.obj, [])
+                continue
+            if not change.is_mergeable:
+                results[key] = VerifyResult(change.obj, [], verified=False)
+                continue
+            checks[key] = (change.obj, _get_checks(change))
+            for dn, parent_dn, body in checks[key][1]:
+                obj_class = list(body)[0]
+                if dn is not None:
+                    by_dn.setdefault(obj_class, []).append(dn)
+                else:
+                    by_name.setdefault((parent_dn, obj_class), []).append(body)
+        # The MOs of the Switch keyed by dn, and the MOs of the Switch
+        # below a parent keyed by parent and class.  A failed query leaves
+        # its MOs out of both.
+        current = {}
+        children = {}
+        for obj_class, dns in by_dn.items():
+            dns = sorted(set(dns))
+            for index in range(0, len(dns), chunk_size):
+                chunk = dns[index:index + chunk_size]
+                url = '/api/class/%s.json' % obj_class + FILTER_QUERY % (
+                    _get_filter(obj_class, 'dn', chunk))
+                mos = self._read_back(session, url, len(chunk))
+                if mos is None:
+                    continue
+                mo_index = _get_dn_index(obj_class, mos)
+                for dn in chunk:
+                    current[dn] = mo_index.get(dn)
+        for (parent_dn, obj_class), bodies in by_name.items():
+            url = '/api/mo/%s.json' % parent_dn + CONFIG_QUERY % obj_class
+            names = set(_get_naming_attribute(body) for body in bodies)
+            name = names.pop()
+            if names or name is None:
+                # The MOs cannot all be picked by the same attribute
+                urls = [url]
+            else:
+                values = sorted(set(
+                    str(list(body.values())[0]['attributes'][name])
+                    for body in bodies))
+                urls = [url + '&query-target-filter=' + _get_filter(
+                    obj_class, name, values[index:index + chunk_size])
+                    for index in range(0, len(values), chunk_size)]
+            mos = []
+            for chunk_url in urls:
+                chunk_mos = self._read_back(session, chunk_url, len(bodies))
+                if chunk_mos is None:
+                    break
+                mos.extend(chunk_mos)
+            else:
+                children[(parent_dn, obj_class)] = mos
+        for key, (obj, change_checks) in checks.items():
+            differences = []
+            verified = True
+            for dn, parent_dn, body in change_checks:
+                if dn is not None:
+                    if dn not in current:
+                        verified = False
+                        continue
+                    mo = current[dn]
+                else:
+                    mos = children.get((parent_dn, list(body)[0]))
+                    if mos is None:
+                        verified = False
+                        continue
+                    mo = _find_mo(body, mos)
+                difference = _diff(body, mo)
+                if difference is not None:
+                    differences.append(difference)
+            results[key] = VerifyResult(obj, differences, verified)
+        return [results[id(obj)] for obj in self._objs]
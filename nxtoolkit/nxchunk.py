@@ -0,0 +1,244 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the ChunkedPush class that pushes a container of
+     many children, such as a ConfigBDs holding thousands of L2BDs, in
+     chunks of a bounded number of children and bytes, and that resumes
+     from the chunks not pushed yet after a failure.
+"""
+import copy
+import json
+import logging
+import threading
+import time
+
+# Queue library is named "queue" in Python3
+try:
+    from Queue import Queue, Empty
+except ImportError:
+    from queue import Queue, Empty
+
+# Largest number of children pushed in one chunk
+MAX_CHUNK_COUNT = 500
+# Largest body in bytes of a chunk.  A child whose JSON is larger is
+# pushed alone.
+MAX_CHUNK_SIZE = 262144
+# Number of chunks pushed at the same time
+MAX_CONCURRENCY = 2
+
+
+class ChunkResult(object):
+    """
+    Result of pushing a chunk
+    """
+    def __init__(self, index, objs, response=None, error=None, latency=None):
+        """
+        :param index: index of the chunk
+        :param objs: list of the children pushed in the chunk
+        :param response: Response of the request
+        :param error: exception raised by the push, if any
+        :param latency: seconds used to push the chunk
+        """
+        self.index = index
+        self.objs = objs
+        self.response = response
+        self.error = error
+        self.latency = latency
+
+    @property
+    def ok(self):
+        """
+        True if the chunk was pushed successfully
+        """
+        return (self.error is None and self.response is not None and
+                self.response.ok)
+
+    def __repr__(self):
+        return '<ChunkResult %s %s objects %s>' % (
+            self.index, len(self.objs), 'ok' if self.ok else 'failed')
+
+
+class ChunkedPush(object):
+    """
+    Pushes the children of a container object in chunks.  Each chunk is a
+    copy of the container holding some of the children, so that it is
+    pushed to the URL of the container like the container itself::
+
+        bds = ConfigBDs()
+        for vlan in range(2, 4000):
+            bds.add_l2bds(L2BD('vlan-%d' % vlan))
+        bulk = ChunkedPush(bds)
+        results = bulk.run(session)
+        if not bulk.done:
+            results = bulk.run(session)
+
+    When a chunk fails, no new chunk is started and run returns.  The
+    indexes of the chunks pushed successfully are kept in completed, and
+    the next run pushes the remaining chunks only.  The chunks of a
+    container are always the same, so completed can also be saved and
+    given to a new ChunkedPush to resume in another process.
+    """
+    def __init__(self, container, max_count=MAX_CHUNK_COUNT,
+                 max_size=MAX_CHUNK_SIZE, max_concurrency=MAX_CONCURRENCY,
+                 completed=None):
+        """
+        :param container: nxtoolkit object whose children are pushed,\
+                          such as a ConfigBDs instance
+        :param max_count: Largest number of children in a chunk
+        :param max_size: Largest body in bytes of a chunk
+        :param max_concurrency: Number of chunks pushed at the same time
+        :param completed: Optional indexes of the chunks already pushed
+        """
+        if max_count < 1 or max_concurrency < 1:
+            raise ValueError('max_count and max_concurrency must be at '
+                             'least 1')
+        self.container = container
+        self.max_count = max_count
+        self.max_size = max_size
+        self.max_concurrency = max_concurrency
+        self.completed = set(completed or [])
+        self._chunks = None
+
+    def _get_chunk(self, children):
+        """
+        Get a copy of the container holding some of its children
+        """
+        chunk = copy.copy(self.container)
+        chunk.__dict__.pop('_children', None)
+        for child in children:
+            chunk._children.append(child)
+        return chunk
+
+    def get_chunks(self):
+        """
+        Get the chunks of the container.  The children are split in their
+        order, starting a new chunk when adding a child would exceed the
+        number of children or the size of a chunk.
+
+        :returns: list of copies of the container
+        """
+        if self._chunks is not None:
+            return self._chunks
+        size = len(json.dumps(self._get_chunk([]).get_json()))
+        chunks = []
+        children = []
+        chunk_size = size
+        for child in self.container.get_children():
+            # The JSON of the child and the separator before it
+            child_size = len(json.dumps(child.get_json())) + 2
+            if children and (len(children) >= self.max_count or
+                             chunk_size + child_size > self.max_size):
+                chunks.append(children)
+                children = []
+                chunk_size = size
+            children.append(child)
+            chunk_size += child_size
+        if children:
+            chunks.append(children)
+        self._chunks = [self._get_chunk(children) for children in chunks]
+        return self._chunks
+
+    @property
+    def next_chunk(self):
+        """
+        Index of the first chunk not pushed yet, or None if all of the
+        chunks were pushed
+        """
+        for index in range(len(self.get_chunks())):
+            if index not in self.completed:
+                return index
+        return None
+
+    @property
+    def done(self):
+        """
+        True if all of the chunks were pushed successfully
+        """
+        return self.next_chunk is None
+
+    def _push(self, session, index, chunk):
+        """
+        Push a chunk
+
+        :returns: ChunkResult instance
+        """
+        objs = list(chunk.get_children())
+        start = time.time()
+        try:
+            resp = session.push_to_switch(chunk.get_url(), chunk.get_json())
+        except Exception as error:
+            result = ChunkResult(index, objs, error=error,
+                                 latency=time.time() - start)
+        else:
+            result = ChunkResult(index, objs, response=resp,
+                                 latency=time.time() - start)
+        if result.error is not None:
+            logging.error('Chunk %s of %s objects failed: %s', index,
+                          len(objs), result.error)
+        elif not result.ok:
+            logging.error('Chunk %s of %s objects was rejected', index,
+                          len(objs))
+        return result
+
+    def run(self, session):
+        """
+        Push the chunks not pushed yet, stopping to start chunks after a
+        failure
+
+        :param session: the instance of Session used for Switch communication
+        :returns: list of ChunkResult instances of the chunks pushed by\
+                  this run, in the order of the chunks
+        """
+        work_q = Queue()
+        for index, chunk in enumerate(self.get_chunks()):
+            if index not in self.completed:
+                work_q.put((index, chunk))
+        lock = threading.Lock()
+        results = []
+        state = {'failed': False}
+
+        def worker():
+            while True:
+                with lock:
+                    if state['failed']:
+                        return
+                try:
+                    index, chunk = work_q.get_nowait()
+                except Empty:
+                    return
+                result = self._push(session, index, chunk)
+                with lock:
+                    results.append(result)
+                    if result.ok:
+                        self.completed.add(index)
+                    else:
+                        state['failed'] = True
+
+        workers = [threading.Thread(target=worker)
+                   for _ in range(min(self.max_concurrency, work_q.qsize()))]
+        for thread in workers:
+            thread.daemon = True
+            thread.start()
+        for thread in workers:
+            thread.join()
+        results.sort(key=lambda result: result.index)
+        if not self.done:
+            logging.warning('Chunked push stopped, %s of %s chunks pushed, '
+                            'next chunk is %s', len(self.completed),
+                            len(self._chunks), self.next_chunk)
+        return results
@@ -21,6 +21,7 @@ NX Toolkit module for counter and stats objects
 """
 
 import re
+from .nxdn import Dn
 
 
 class InterfaceStats(object):
@@ -51,6 +52,8 @@ class InterfaceStats(object):
     values retained.  The best way to see a list of these counters is to
     print the keys of the dictionary.
     """
+    __slots__ = ('_parent', '_interfaceDn', 'result')
+
     def __init__(self, parent, interfaceDn):
         self._parent = parent
         self._interfaceDn = interfaceDn
@@ -88,6 +91,29 @@ class InterfaceStats(object):
                 result[port_id] = port_stats
         return result
 
+    @classmethod
+    def get_all_by_dn(cls, session):
+        """
+        This method will get the current stats of all the interfaces with a
+        single query and return them as a dictionary indexed by the
+        interface dn.  It is used to refresh the stats of many interfaces
+        without one query per interface.
+
+        :param session: Session to use when accessing the Switch
+
+        :returns:  Dictionary of counters. Format is {<interface_dn>:
+                        {<counterFamily>: {<counter>:value}}}
+        """
+        mo_query_url = '/api/class/l1PhysIf.json?rsp-subtree=full&rsp-subtree-include=stats'
+        ret = session.get(mo_query_url)
+        data = ret.json()['imdata']
+
+        result = {}
+        for interface in data:
+            dn = interface['l1PhysIf']['attributes']['dn']
+            result[dn] = InterfaceStats._process_data(interface)
+        return result
+
     @classmethod
     def _parseDn2PortId(cls, dn):
         """
@@ -97,15 +123,8 @@ class InterfaceStats(object):
         topology/pod-1/node-103/sys/phys-[eth1/12]
         and returns 1/103/1/12.
         """
-        name = dn.split('/')
-        pod = name[1].split('-')[1]
-        node = name[2].split('-')[1]
-        module = name[4].split('[')[1]
-        interface_type = module[:3]
-        module = module[3:]
-        port = name[5].split(']')[0]
-
-        return '{0}/{1}/{2}/{3}'.format(pod, node, module, port)
+        dn = Dn(dn)
+        return '{0}/{1}/{2}/{3}'.format(dn.pod, dn.node, dn.module, dn.port)
 
     def get(self, session=None, period=None):
         """
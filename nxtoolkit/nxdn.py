@@ -0,0 +1,203 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the Dn class, the distinguished name of an object
+     on the Switch, used by the toolkit to parse the dns it receives.
+"""
+import re
+
+# Number of distinct dns kept interned before the table is emptied
+DN_CACHE_SIZE = 131072
+
+# Interface names such as eth1/12 or eth1/1/2
+INTERFACE_NAME = re.compile(r'^([a-zA-Z]+)(\d+)/(.+)$')
+
+_interned = {}
+
+
+def _split_rns(dn):
+    """
+    Split a dn into its rns.  Slashes inside brackets such as in
+    ``sys/intf/phys-[eth1/1]`` are part of the rn.
+    """
+    if not dn:
+        return ()
+    if '[' not in dn:
+        return tuple(dn.split('/'))
+    rns = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(dn):
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == '/' and depth == 0:
+            rns.append(dn[start:index])
+            start = index + 1
+    rns.append(dn[start:])
+    return tuple(rns)
+
+
+class Dn(str):
+    """
+    Distinguished name of an object such as ``sys/intf/phys-[eth1/1]``.
+
+    A Dn is a str, so it can be used wherever a dn string is expected.
+    Each distinct dn is created once and shared, and it is only split
+    into rns the first time one of its parts is used.
+    """
+    def __new__(cls, value=''):
+        """
+        :param value: String containing the dn
+        """
+        if type(value) is Dn:
+            return value
+        dn = _interned.get(value)
+        if dn is None:
+            if len(_interned) >= DN_CACHE_SIZE:
+                _interned.clear()
+            dn = str.__new__(cls, value)
+            _interned[dn] = dn
+        return dn
+
+    @property
+    def rns(self):
+        """
+        Tuple of strings containing the rns of the dn
+        """
+        rns = self.__dict__.get('_rns')
+        if rns is None:
+            rns = _split_rns(self)
+            self._rns = rns
+        return rns
+
+    @property
+    def rn(self):
+        """
+        String containing the last rn of the dn
+        """
+        rns = self.rns
+        if not rns:
+            return ''
+        return rns[-1]
+
+    @property
+    def parent(self):
+        """
+        Dn of the parent object, an empty Dn for a top level object
+        """
+        rns = self.rns
+        if len(rns) < 2:
+            return Dn('')
+        return Dn(self[:len(self) - len(rns[-1]) - 1])
+
+    def prefix_of(self, dn):
+        """
+        Check if a dn is this dn or the dn of an object below it
+
+        :param dn: String containing the dn
+        :returns: True or False
+        """
+        return dn == self or dn.startswith(self + '/')
+
+    def get_value(self, prefix):
+        """
+        Get the value of the first rn starting with a prefix.  The value is
+        the rest of the rn without the enclosing brackets, so the value
+        of ``phys-`` in ``sys/intf/phys-[eth1/1]`` is ``eth1/1``.
+
+        :param prefix: String containing the start of the rn such as 'pod-'
+        :returns: String containing the value or None if there is no such rn
+        """
+        for rn in self.rns:
+            if rn.startswith(prefix):
+                value = rn[len(prefix):]
+                if value.startswith('[') and value.endswith(']'):
+                    value = value[1:-1]
+                return value
+        return None
+
+    @property
+    def pod(self):
+        """
+        String containing the pod id or None
+        """
+        return self.get_value('pod-')
+
+    @property
+    def node(self):
+        """
+        String containing the node id or None
+        """
+        return self.get_value('node-')
+
+    @property
+    def slot(self):
+        """
+        String containing the slot of a module such as ``lcslot-1`` or None
+        """
+        for rn in self.rns:
+            name, _, value = rn.partition('-')
+            if name.endswith('slot'):
+                return value
+        return None
+
+    @property
+    def interface(self):
+        """
+        Tuple of strings (interface_type, module, port) of the interface
+        found in the dn, such as ('eth', '1', '12') for
+        ``sys/intf/phys-[eth1/12]``, or None
+        """
+        interface = self.__dict__.get('_interface', False)
+        if interface is False:
+            interface = None
+            for rn in reversed(self.rns):
+                if not rn.endswith(']'):
+                    continue
+                match = INTERFACE_NAME.match(rn[rn.find('[') + 1:-1])
+                if match:
+                    interface = match.groups()
+                    break
+            self._interface = interface
+        return interface
+
+    @property
+    def interface_type(self):
+        """
+        String containing the interface type such as 'eth' or None
+        """
+        interface = self.interface
+        return interface and interface[0]
+
+    @property
+    def module(self):
+        """
+        String containing the module of the interface or None
+        """
+        interface = self.interface
+        return interface and interface[1]
+
+    @property
+    def port(self):
+        """
+        String containing the port of the interface or None
+        """
+        interface = self.interface
+        return interface and interface[2]
@@ -267,7 +267,7 @@ class FakeSession(Session):
         """
         pass
 
-    def push_to_switch(self, url, data):
+    def push_to_switch(self, url, data, chunked=False):
         """
         Push the object data to the Switch
 
@@ -275,6 +275,7 @@ class FakeSession(Session):
                     send the object data to the Switch.
         :param data: Dictionary containing the JSON objects to be sent\
                      to the Switch.
+        :param chunked: Boolean to send a chunked request body
         :returns: Response class instance from the requests library.\
                   response.ok is True if request is sent successfully.
         """
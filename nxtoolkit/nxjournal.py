@@ -0,0 +1,466 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the EventJournal class that records the events
+     received from the Switch in an append-only log, and the ReplaySession
+     class that plays a recorded journal back through the Session event API.
+
+     Each switch has its own directory holding the log segments and an
+     offset index.  A segment is a raw deflate stream where every record is
+     a JSON line flushed on its own, so a segment can be read up to the last
+     record written at any time.  Every few records the compressor is fully
+     flushed and the position is written to the index so that reading can
+     start close to any offset without decompressing the whole segment.
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from .nxcache import LruCache, PARENT_CACHE_SIZE
+from .nxsession import Session
+
+SEGMENT_SUFFIX = '.seg'
+INDEX_FILE = 'index'
+CONSUMERS_FILE = 'consumers.json'
+READ_SIZE = 64 * 1024
+
+
+class SwitchLog(object):
+    """
+    Append-only log of the events of a single switch
+    """
+    def __init__(self, directory, max_segment_bytes, index_interval,
+                 compress_level, fsync=False):
+        """
+        :param directory: String containing the directory of the log
+        :param max_segment_bytes: Size after which a new segment is started
+        :param index_interval: Number of records between index entries
+        :param compress_level: zlib compression level
+        :param fsync: Boolean indicating whether every record is synced\
+                      to disk.  Default is False.
+        """
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.index_interval = index_interval
+        self.compress_level = compress_level
+        self.fsync = fsync
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._index = self._load_index()
+        self._file = None
+        self._compressor = None
+        self._segment = None
+        self._since_index = 0
+        self.next_offset = self._recover_next_offset()
+
+    def _load_index(self):
+        """
+        Read the index of the log
+
+        :returns: list of (offset, segment name, byte position) tuples
+        """
+        index = []
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return index
+        with open(index_path, 'r') as index_file:
+            for line in index_file:
+                fields = line.split()
+                if len(fields) != 3:
+                    continue
+                index.append((int(fields[0]), fields[1], int(fields[2])))
+        return index
+
+    def _recover_next_offset(self):
+        """
+        Find the offset following the last record in the log
+
+        :returns: integer offset
+        """
+        if not self._index:
+            return 0
+        next_offset = self._index[-1][0]
+        for record in self._read_from(len(self._index) - 1):
+            next_offset = record[0] + 1
+        return next_offset
+
+    def _add_index_entry(self, offset, position):
+        entry = (offset, self._segment, position)
+        self._index.append(entry)
+        with open(os.path.join(self.directory, INDEX_FILE), 'a') as index_file:
+            index_file.write('%d %s %d\n' % entry)
+
+    def _open_segment(self):
+        self._segment = '%020d%s' % (self.next_offset, SEGMENT_SUFFIX)
+        # A segment with this name can only hold a record torn by a crash
+        self._file = open(os.path.join(self.directory, self._segment), 'wb')
+        self._compressor = zlib.compressobj(self.compress_level,
+                                            zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._add_index_entry(self.next_offset, self._file.tell())
+        self._since_index = 0
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.write(self._compressor.flush())
+        self._file.close()
+        self._file = None
+        self._compressor = None
+
+    def append(self, timestamp, url, event):
+        """
+        Append an event to the log
+
+        :param timestamp: Time the event was received, in seconds
+        :param url: URL string of the subscription the event belongs to
+        :param event: String containing the event as sent by the Switch
+        :returns: integer offset of the record
+        """
+        if self._file is None:
+            self._open_segment()
+        offset = self.next_offset
+        if self._since_index >= self.index_interval:
+            self._file.write(self._compressor.flush(zlib.Z_FULL_FLUSH))
+            self._add_index_entry(offset, self._file.tell())
+            self._since_index = 0
+        record = json.dumps([offset, timestamp, url, event]) + '\n'
+        self._file.write(self._compressor.compress(record.encode('ascii')))
+        self._file.write(self._compressor.flush(zlib.Z_SYNC_FLUSH))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._since_index += 1
+        self.next_offset += 1
+        if self._file.tell() >= self.max_segment_bytes:
+            self._close_segment()
+        return offset
+
+    def _read_from(self, entry_index):
+        """
+        Read the records starting at an index entry
+
+        :param entry_index: position in the index to start reading from
+        :returns: generator of [offset, timestamp, url, event] records
+        """
+        index = list(self._index)
+        segment = index[entry_index][1]
+        position = index[entry_index][2]
+        segments = [segment]
+        for entry in index[entry_index + 1:]:
+            if entry[1] != segments[-1]:
+                segments.append(entry[1])
+        for segment in segments:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            pending = b''
+            with open(os.path.join(self.directory, segment), 'rb') as seg:
+                seg.seek(position)
+                while True:
+                    data = seg.read(READ_SIZE)
+                    if not data:
+                        break
+                    try:
+                        pending += decompressor.decompress(data)
+                    except zlib.error:
+                        logging.warning('Truncated journal segment %s',
+                                        segment)
+                        break
+                    lines = pending.split(b'\n')
+                    pending = lines.pop()
+                    for line in lines:
+                        yield json.loads(line.decode('ascii'))
+            position = 0
+
+    def read(self, offset=0):
+        """
+        Read the records starting at an offset
+
+        :param offset: integer offset of the first record to return
+        :returns: generator of [offset, timestamp, url, event] records
+        """
+        if not self._index:
+            return
+        offsets = [entry[0] for entry in self._index]
+        entry_index = max(0, bisect.bisect_right(offsets, offset) - 1)
+        for record in self._read_from(entry_index):
+            if record[0] >= offset:
+                yield record
+
+    def get_first_offset(self):
+        """
+        :returns: integer offset of the oldest record in the log
+        """
+        if not self._index:
+            return 0
+        return self._index[0][0]
+
+    def close(self):
+        self._close_segment()
+
+
+class EventJournal(object):
+    """
+    Durable journal of the events received from one or more switches.
+    Records are addressed by a per-switch offset that increases by one
+    for every event.
+    """
+    def __init__(self, directory, max_segment_bytes=16 * 1024 * 1024,
+                 index_interval=256, compress_level=6, fsync=False):
+        """
+        :param directory: String containing the directory of the journal
+        :param max_segment_bytes: Size in bytes after which a new segment\
+                                  is started.  Default is 16MB.
+        :param index_interval: Number of records between entries of the\
+                               offset index.  Default is 256.
+        :param compress_level: zlib compression level.  Default is 6.
+        :param fsync: Boolean indicating whether every record is synced\
+                      to disk.  Default is False.
+        """
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.index_interval = index_interval
+        self.compress_level = compress_level
+        self.fsync = fsync
+        self._logs = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_switch_dir(switch):
+        return str(switch).replace(':', '_').replace('/', '_')
+
+    def _get_log(self, switch):
+        if switch not in self._logs:
+            directory = os.path.join(self.directory,
+                                     self._get_switch_dir(switch))
+            self._logs[switch] = SwitchLog(directory, self.max_segment_bytes,
+                                           self.index_interval,
+                                           self.compress_level, self.fsync)
+        return self._logs[switch]
+
+    def append(self, switch, url, event, timestamp=None):
+        """
+        Append an event to the journal of a switch
+
+        :param switch: String identifying the switch such as its address
+        :param url: URL string of the subscription the event belongs to
+        :param event: String containing the event as sent by the Switch
+        :param timestamp: Time the event was received.  Default is now.
+        :returns: integer offset of the event
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            return self._get_log(switch).append(timestamp, url, event)
+
+    def read(self, switch, offset=0):
+        """
+        Read the events of a switch starting at an offset
+
+        :param switch: String identifying the switch
+        :param offset: integer offset of the first event to return
+        :returns: generator of (offset, timestamp, url, event) tuples
+        """
+        with self._lock:
+            log = self._get_log(switch)
+        for record in log.read(offset):
+            yield tuple(record)
+
+    def get_offsets(self, switch):
+        """
+        Get the range of offsets recorded for a switch
+
+        :param switch: String identifying the switch
+        :returns: tuple of the first offset and the next offset to be written
+        """
+        with self._lock:
+            log = self._get_log(switch)
+            return log.get_first_offset(), log.next_offset
+
+    def get_switches(self):
+        """
+        :returns: list of the switch directories in the journal
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.isdir(os.path.join(self.directory, name)))
+
+    def _get_consumers_path(self, switch):
+        return os.path.join(self.directory, self._get_switch_dir(switch),
+                            CONSUMERS_FILE)
+
+    def _load_consumers(self, switch):
+        path = self._get_consumers_path(switch)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r') as consumers_file:
+            return json.load(consumers_file)
+
+    def commit(self, switch, consumer, offset):
+        """
+        Record the offset a consumer should resume from
+
+        :param switch: String identifying the switch
+        :param consumer: String containing the name of the consumer
+        :param offset: integer offset of the next event to be consumed
+        """
+        with self._lock:
+            self._get_log(switch)
+            consumers = self._load_consumers(switch)
+            consumers[consumer] = offset
+            path = self._get_consumers_path(switch)
+            with open(path + '.tmp', 'w') as consumers_file:
+                json.dump(consumers, consumers_file)
+            os.rename(path + '.tmp', path)
+
+    def get_committed(self, switch, consumer):
+        """
+        Get the offset a consumer should resume from
+
+        :param switch: String identifying the switch
+        :param consumer: String containing the name of the consumer
+        :returns: integer offset, 0 if the consumer never committed
+        """
+        with self._lock:
+            return self._load_consumers(switch).get(consumer, 0)
+
+    def close(self):
+        """
+        Close the segments currently being written
+        """
+        with self._lock:
+            for log in self._logs.values():
+                log.close()
+
+
+class ReplaySubscriber(object):
+    """
+    Plays the events of a journal back with the timing they were
+    recorded with.  Used by the ReplaySession.
+    """
+    def __init__(self, journal, switch, offset=0, speed=1.0):
+        self._records = journal.read(switch, offset)
+        self._next_record = None
+        self._speed = speed
+        self._start_time = None
+        self._first_timestamp = None
+        self._events = {}
+        self.offset = offset
+
+    def _is_due(self, record):
+        if not self._speed:
+            return True
+        if self._start_time is None:
+            self._start_time = time.time()
+            self._first_timestamp = record[1]
+        delay = (record[1] - self._first_timestamp) / float(self._speed)
+        return time.time() >= self._start_time + delay
+
+    def _pump(self, url):
+        """
+        Move the events that are due into their URL bucket, stopping
+        once an event is available for the URL.
+        """
+        while url not in self._events or not self._events[url]:
+            if self._next_record is None:
+                self._next_record = next(self._records, None)
+                if self._next_record is None:
+                    return
+            if not self._is_due(self._next_record):
+                return
+            offset, timestamp, record_url, event = self._next_record
+            self._next_record = None
+            self._events.setdefault(record_url, []).append(json.loads(event))
+            self.offset = offset + 1
+
+    def is_finished(self):
+        """
+        :returns: True if every event of the journal has been played back
+        """
+        if self._next_record is None:
+            self._next_record = next(self._records, None)
+        if self._next_record is not None:
+            return False
+        return not any(self._events.values())
+
+    def has_events(self, url):
+        self._pump(url)
+        return bool(self._events.get(url))
+
+    def get_event(self, url):
+        if url not in self._events:
+            raise ValueError
+        return self._events[url].pop(0)
+
+    def refresh_subscriptions(self):
+        pass
+
+    def _resubscribe(self):
+        pass
+
+
+class ReplaySession(Session):
+    """
+    Session that plays back the events recorded in an EventJournal.
+    Toolkit classes read the events through the usual get_event API.
+    """
+    def __init__(self, journal, switch, offset=0, speed=1.0):
+        """
+        :param journal: EventJournal instance holding the events
+        :param switch: String identifying the switch to play back
+        :param offset: integer offset of the first event.  Default is 0.
+        :param speed: Playback speed relative to the recorded timing.\
+                      1.0 is the original speed, 10.0 is ten times faster\
+                      and None plays the events back as fast as possible.
+        """
+        self.ipaddr = switch
+        self.parent_cache = LruCache(PARENT_CACHE_SIZE)
+        self._subscription_enabled = True
+        self.subscription_thread = ReplaySubscriber(journal, switch,
+                                                    offset, speed)
+
+    def login(self, timeout=None):
+        pass
+
+    def subscribe(self, url):
+        return None
+
+    def unsubscribe(self, url):
+        pass
+
+    def get_offset(self):
+        """
+        :returns: integer offset of the next event to be played back
+        """
+        return self.subscription_thread.offset
+
+    def is_finished(self):
+        """
+        :returns: True if every event of the journal has been played back
+        """
+        return self.subscription_thread.is_finished()
+
+    def get(self, url):
+        logging.error('ReplaySession cannot send %s to the Switch', url)
+        raise ValueError('A ReplaySession has no Switch')
+
+    def push_to_switch(self, url, data, chunked=False):
+        logging.error('ReplaySession cannot send %s to the Switch', url)
+        raise ValueError('A ReplaySession has no Switch')
@@ -0,0 +1,469 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the LocalMit class that keeps an in-memory replica
+     of the Switch management information tree (MIT) current from event
+     subscriptions, and the MitSession class that answers the toolkit
+     queries from that replica without contacting the Switch.
+"""
+import json
+import logging
+import time
+from .nxsession import Session
+from .nxdn import Dn
+
+
+def get_parent_dn(dn):
+    """
+    Get the dn of the parent of an MO.  Slashes inside brackets such
+    as in ``sys/intf/phys-[eth1/1]`` are part of the rn.
+
+    :param dn: String containing the dn of the MO
+    :returns: String containing the parent dn, '' for a top level MO
+    """
+    return Dn(dn).parent
+
+
+class MoFilter(object):
+    """
+    Evaluates a ``query-target-filter`` expression such as
+    ``and(eq(l1PhysIf.adminSt,"up"),gt(l1PhysIf.modTs,"2016-01-01"))``
+    """
+    OPERATORS = {
+        'eq': lambda value, arg: value == arg,
+        'ne': lambda value, arg: value != arg,
+        'gt': lambda value, arg: value > arg,
+        'ge': lambda value, arg: value >= arg,
+        'lt': lambda value, arg: value < arg,
+        'le': lambda value, arg: value <= arg,
+        'wcard': lambda value, arg: arg in value,
+    }
+
+    def __init__(self, expression):
+        self._expression = expression
+        self._pos = 0
+        self._tree = self._parse()
+
+    def _parse(self):
+        expression = self._expression
+        start = self._pos
+        while expression[self._pos] != '(':
+            self._pos += 1
+        operator = expression[start:self._pos].strip()
+        self._pos += 1
+        args = []
+        while True:
+            while expression[self._pos] in ' ,':
+                self._pos += 1
+            char = expression[self._pos]
+            if char == ')':
+                self._pos += 1
+                break
+            if char == '"':
+                end = expression.index('"', self._pos + 1)
+                args.append(expression[self._pos + 1:end])
+                self._pos = end + 1
+            else:
+                start = self._pos
+                while expression[self._pos] not in ',()':
+                    self._pos += 1
+                if expression[self._pos] == '(':
+                    self._pos = start
+                    args.append(self._parse())
+                else:
+                    args.append(expression[start:self._pos].strip())
+        if operator not in ('and', 'or', 'not') and \
+                operator not in self.OPERATORS:
+            raise ValueError('Unsupported filter operator %s' % operator)
+        return (operator, args)
+
+    def _evaluate(self, tree, mo_class, attributes):
+        operator, args = tree
+        if operator == 'and':
+            return all(self._evaluate(arg, mo_class, attributes)
+                       for arg in args)
+        if operator == 'or':
+            return any(self._evaluate(arg, mo_class, attributes)
+                       for arg in args)
+        if operator == 'not':
+            return not self._evaluate(args[0], mo_class, attributes)
+        filter_class, prop = args[0].split('.')
+        if filter_class != mo_class or prop not in attributes:
+            return False
+        return self.OPERATORS[operator](attributes[prop], args[1])
+
+    def match(self, mo_class, attributes):
+        """
+        :param mo_class: String containing the class of the MO
+        :param attributes: dictionary of the MO attributes
+        :returns: True if the MO passes the filter
+        """
+        return self._evaluate(self._tree, mo_class, attributes)
+
+
+class MitResponse(object):
+    """
+    Shell of a Requests.Response object returned by the MitSession
+    """
+    def __init__(self, data):
+        self.ok = True
+        self.status_code = 200
+        self._data = {'totalCount': str(len(data)), 'imdata': data}
+        # WorkingData strips newlines from the raw content before decoding
+        self._content = ''
+
+    @property
+    def text(self):
+        return json.dumps(self._data)
+
+    def json(self):
+        """
+        Get the JSON format of the Response data
+
+        :return: dictionary with the JSON formatted data
+        """
+        return self._data
+
+
+class LocalMit(object):
+    """
+    In-memory replica of the Switch MIT indexed by dn.  The replica is
+    loaded from a single subtree query, which is also a subscription,
+    and is kept current by applying the created, modified and deleted
+    events of that subscription.
+    """
+    def __init__(self, session, root='sys', classes=None):
+        """
+        :param session: the instance of Session used for Switch communication
+        :param root: String containing the dn of the replicated subtree.\
+                     Default is 'sys'.
+        :param classes: list of the Switch class names to replicate.\
+                        Default is None which replicates every class.
+        """
+        self._session = session
+        self.root = root
+        self.classes = classes
+        self._mos = {}
+        self._children = {}
+        self._by_class = {}
+        self._url = None
+        self.bootstrap_time = None
+        self.last_sync_time = None
+        self.last_event_time = None
+        self.last_mod_ts = None
+        self.events_applied = 0
+
+    def _get_query_url(self):
+        url = '/api/mo/%s.json?query-target=subtree' % self.root
+        if self.classes:
+            url += '&target-subtree-class=' + ','.join(self.classes)
+        return url
+
+    def bootstrap(self):
+        """
+        Load the replica from the Switch and subscribe to its changes.
+
+        :returns: Response class instance from the requests library.\
+                  response.ok is True if the replica was loaded.
+        """
+        self._mos = {}
+        self._children = {}
+        self._by_class = {}
+        self._url = self._get_query_url() + '&subscription=yes'
+        resp = self._session.subscribe(self._url)
+        if resp is None:
+            # Subscriptions are disabled, so the replica can only be
+            # refreshed by calling bootstrap again
+            self._url = None
+            resp = self._session.get(self._get_query_url())
+            if not resp.ok:
+                return resp
+            for mo in resp.json()['imdata']:
+                self._apply_mo(mo)
+        elif not resp.ok:
+            return resp
+        self.bootstrap_time = time.time()
+        self.sync()
+        return resp
+
+    def _index(self, dn, mo_class):
+        # Link the MO to its ancestors, which may not be replicated when
+        # only some classes are
+        child_dn = dn
+        while child_dn:
+            parent_dn = get_parent_dn(child_dn)
+            siblings = self._children.setdefault(parent_dn, set())
+            if child_dn in siblings:
+                break
+            siblings.add(child_dn)
+            child_dn = parent_dn
+        self._by_class.setdefault(mo_class, set()).add(dn)
+
+    def _remove(self, dn):
+        for child_dn in list(self._children.pop(dn, ())):
+            self._remove(child_dn)
+        entry = self._mos.pop(dn, None)
+        if entry is not None:
+            self._by_class[entry[0]].discard(dn)
+
+    def _apply_mo(self, mo):
+        for mo_class in mo:
+            attributes = mo[mo_class]['attributes']
+            dn = attributes['dn']
+            status = attributes.get('status', '')
+            mod_ts = attributes.get('modTs')
+            if mod_ts and (self.last_mod_ts is None or
+                           mod_ts > self.last_mod_ts):
+                self.last_mod_ts = mod_ts
+            if status == 'deleted':
+                self._remove(dn)
+                self._children.get(get_parent_dn(dn), set()).discard(dn)
+                continue
+            existing = self._mos.get(dn)
+            if existing is None or existing[0] != mo_class:
+                if existing is not None:
+                    self._remove(dn)
+                    self._children.get(get_parent_dn(dn), set()).discard(dn)
+                attributes = dict(attributes)
+                attributes['status'] = ''
+                self._mos[dn] = (mo_class, attributes)
+                self._index(dn, mo_class)
+                continue
+            old_mod_ts = existing[1].get('modTs')
+            if mod_ts and old_mod_ts and mod_ts < old_mod_ts:
+                continue
+            if status == 'created':
+                existing[1].clear()
+            # modified events only carry the attributes that changed
+            existing[1].update(attributes)
+            existing[1]['status'] = ''
+
+    def apply_event(self, event):
+        """
+        Apply an event received from the Switch to the replica.
+
+        :param event: dictionary containing the event
+        """
+        for mo in event['imdata']:
+            self._apply_mo(mo)
+        self.events_applied += 1
+        self.last_event_time = time.time()
+
+    def sync(self):
+        """
+        Apply the events received since the last sync.  No request is
+        sent to the Switch.
+
+        :returns: number of events applied
+        """
+        count = 0
+        if self._url is not None:
+            while self._session.has_events(self._url):
+                self.apply_event(self._session.get_event(self._url))
+                count += 1
+        self.last_sync_time = time.time()
+        return count
+
+    def get_staleness(self):
+        """
+        Get metrics describing how current the replica is.
+
+        :returns: dictionary of staleness metrics
+        """
+        now = time.time()
+        metrics = {'objects': len(self._mos),
+                   'subscribed': self._url is not None,
+                   'events_applied': self.events_applied,
+                   'last_mod_ts': self.last_mod_ts,
+                   'bootstrap_age': None,
+                   'seconds_since_sync': None,
+                   'seconds_since_event': None,
+                   'gaps': 0}
+        if self.bootstrap_time is not None:
+            metrics['bootstrap_age'] = now - self.bootstrap_time
+        if self.last_sync_time is not None:
+            metrics['seconds_since_sync'] = now - self.last_sync_time
+        if self.last_event_time is not None:
+            metrics['seconds_since_event'] = now - self.last_event_time
+        subscriber = getattr(self._session, 'subscription_thread', None)
+        if hasattr(subscriber, 'get_gaps'):
+            metrics['gaps'] = len(subscriber.get_gaps())
+        return metrics
+
+    def get_mo(self, dn):
+        """
+        :param dn: String containing the dn of the MO
+        :returns: tuple of class name and attribute dictionary or None
+        """
+        return self._mos.get(dn)
+
+    def __len__(self):
+        return len(self._mos)
+
+    def _get_subtree_dns(self, dn):
+        result = []
+        stack = [dn]
+        while stack:
+            mo_dn = stack.pop()
+            if mo_dn in self._mos:
+                result.append(mo_dn)
+            stack.extend(sorted(self._children.get(mo_dn, ()), reverse=True))
+        return result
+
+    def _get_children_dns(self, dn):
+        result = []
+        for child_dn in sorted(self._children.get(dn, ())):
+            if child_dn in self._mos:
+                result.append(child_dn)
+            else:
+                result.extend(self._get_children_dns(child_dn))
+        return result
+
+    def _build_mo(self, dn, rsp_subtree, rsp_classes=None):
+        mo_class, attributes = self._mos[dn]
+        body = {'attributes': dict(attributes)}
+        if rsp_subtree in ('children', 'full'):
+            children = []
+            for child_dn in self._get_children_dns(dn):
+                if rsp_subtree == 'full':
+                    child = self._build_mo(child_dn, 'full', rsp_classes)
+                else:
+                    child = self._build_mo(child_dn, 'no')
+                child_class = self._mos[child_dn][0]
+                if rsp_classes and child_class not in rsp_classes and \
+                        not child[child_class].get('children'):
+                    continue
+                children.append(child)
+            if children:
+                body['children'] = children
+        return {mo_class: body}
+
+    def query(self, url):
+        """
+        Answer a Switch REST query from the replica.
+
+        :param url: URL string such as ``/api/class/l1PhysIf.json`` or\
+                    ``/api/mo/sys/intf.json?query-target=children``
+        :returns: list of MOs in the Switch imdata format
+        """
+        path, _, query = url.partition('?')
+        params = {}
+        for param in query.split('&'):
+            if '=' in param:
+                key, value = param.split('=', 1)
+                params[key] = value
+        if path.startswith('/api/node/'):
+            path = '/api/' + path[len('/api/node/'):]
+        if path.endswith('.json'):
+            path = path[:-len('.json')]
+        if path.startswith('/api/class/'):
+            mo_class = path[len('/api/class/'):]
+            dns = sorted(self._by_class.get(mo_class, ()))
+        elif path.startswith('/api/mo/'):
+            dns = [path[len('/api/mo/'):]]
+        else:
+            raise ValueError('Unsupported query %s' % url)
+
+        target = params.get('query-target', 'self')
+        if target == 'children':
+            dns = [child for dn in dns
+                   for child in self._get_children_dns(dn)]
+        elif target == 'subtree':
+            dns = [mo_dn for dn in dns
+                   for mo_dn in self._get_subtree_dns(dn)]
+        else:
+            dns = [dn for dn in dns if dn in self._mos]
+        if 'target-subtree-class' in params:
+            classes = params['target-subtree-class'].split(',')
+            dns = [dn for dn in dns if self._mos[dn][0] in classes]
+        if 'query-target-filter' in params:
+            mo_filter = MoFilter(params['query-target-filter'])
+            dns = [dn for dn in dns if mo_filter.match(*self._mos[dn])]
+        rsp_classes = None
+        if 'rsp-subtree-class' in params:
+            rsp_classes = params['rsp-subtree-class'].split(',')
+        rsp_subtree = params.get('rsp-subtree', 'no')
+        return [self._build_mo(dn, rsp_subtree, rsp_classes) for dn in dns]
+
+    def get_session(self, auto_sync=True):
+        """
+        Get a Session that answers queries from the replica.
+
+        :param auto_sync: Boolean indicating whether pending events are\
+                          applied before every query.  Default is True.
+        :returns: MitSession instance
+        """
+        return MitSession(self, auto_sync)
+
+
+class MitSession(Session):
+    """
+    Session that answers the GET requests from a LocalMit replica so
+    that the toolkit getters run without network I/O.  Requests that
+    change the Switch are sent through the live session.
+    """
+    def __init__(self, mit, auto_sync=True):
+        """
+        :param mit: LocalMit instance answering the queries
+        :param auto_sync: Boolean indicating whether pending events are\
+                          applied before every query.  Default is True.
+        """
+        self.mit = mit
+        self.auto_sync = auto_sync
+        self.live_session = mit._session
+        self.ipaddr = getattr(self.live_session, 'ipaddr', None)
+        self._subscription_enabled = False
+
+    def login(self, timeout=None):
+        pass
+
+    def get(self, url):
+        """
+        Answer a REST GET from the replica.
+
+        :param url: String containing the URL of the query
+        :returns: MitResponse instance
+        """
+        if self.auto_sync:
+            self.mit.sync()
+        logging.debug('Local MIT query %s', url)
+        return MitResponse(self.mit.query(url))
+
+    def subscribe(self, url):
+        return self.live_session.subscribe(url)
+
+    def has_events(self, url):
+        return self.live_session.has_events(url)
+
+    def get_event(self, url):
+        return self.live_session.get_event(url)
+
+    def unsubscribe(self, url):
+        return self.live_session.unsubscribe(url)
+
+    def push_to_switch(self, url, data, chunked=False):
+        return self.live_session.push_to_switch(url, data, chunked)
+
+    def delete(self, url):
+        return self.live_session.delete(url)
+
+    def post_nxapi(self, command):
+        return self.live_session.post_nxapi(command)
+
+    def cli_conf(self, commands, rollback_on_error=False):
+        return self.live_session.cli_conf(commands, rollback_on_error)
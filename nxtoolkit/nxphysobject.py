@@ -23,9 +23,12 @@ from .nxbaseobject import BaseNXObject, BaseNXPhysModule, BaseInterface
 from .nxConcreteLib import *
 from .nxsession import Session
 from .nxcounters import InterfaceStats
+from .nxcache import get_identity_map
+from .nxattributes import LazyAttribute, LazyAttributes
+from .nxtemplate import JsonTemplate
+from .nxdn import Dn
 import logging
 import re
-import copy
 from .nxSearch import Searchable
 
 
@@ -718,10 +721,8 @@ class Node(BaseNXPhysObject):
         """Parses the pod and node from a
            distinguished name of the node.
         """
-        name = dn.split('/')
-        pod = name[1].split('-')[1]
-        node = name[2].split('-')[1]
-        return pod, node
+        dn = Dn(dn)
+        return dn.pod, dn.node
 
     @classmethod
     def get(cls, session):
@@ -1565,9 +1566,100 @@ class Link(BaseNXPhysObject):
         return pod, link
 
 
+# Attributes of an Interface and the l1PhysIf attributes they are read from
+INTERFACE_MO_ATTRIBUTES = (('dist_name', 'dn'), ('porttype', 'portT'),
+                           ('adminstatus', 'adminSt'), ('speed', 'speed'),
+                           ('mtu', 'mtu'), ('id', 'id'),
+                           ('monPolDn', 'monPolDn'), ('name', 'name'),
+                           ('descr', 'descr'), ('usage', 'usage'),
+                           ('layer', 'layer'))
+
+
+def _get_mo_value(mo_name):
+    """
+    Get the function reading an attribute of an MO as a string
+    """
+    return lambda mo_attributes: str(mo_attributes[mo_name])
+
+
+def _get_interface_fields():
+    """
+    Get the functions computing the attributes of an Interface built
+    lazily from its l1PhysIf MO.  The attributes are the ones of an
+    Interface built by _from_mo_attributes from a dictionary.
+    """
+    fields = {}
+    for name, mo_name in INTERFACE_MO_ATTRIBUTES:
+        fields[name] = _get_mo_value(mo_name)
+    fields['if_name'] = fields['id']
+    fields['interface_type'] = lambda mo_attributes: 'eth'
+    fields['module'] = lambda mo_attributes: str(
+        mo_attributes['id']).replace('eth', '').split('/')[0]
+    fields['port'] = lambda mo_attributes: str(
+        mo_attributes['id']).replace('eth', '').split('/', 1)[1]
+    fields['type'] = lambda mo_attributes: 'interface'
+    return fields
+
+
+_INTERFACE_FIELDS = _get_interface_fields()
+
+
 class Interface(BaseInterface):
     """This class defines a physical interface.
     """
+    # Read from the attributes when they are first used by the Interfaces
+    # built lazily.  The other Interfaces set them when they are built.
+    id = LazyAttribute('id')
+    if_name = LazyAttribute('if_name')
+    name = LazyAttribute('name', lambda self: self.if_name)
+    if_type = LazyAttribute('if_type', lambda self: self.if_name[:3])
+    interface_type = LazyAttribute('interface_type')
+    module = LazyAttribute('module')
+    port = LazyAttribute('port')
+    porttype = LazyAttribute('porttype')
+    adminstatus = LazyAttribute('adminstatus')
+    speed = LazyAttribute('speed')
+    mtu = LazyAttribute('mtu')
+    # Defaults of the Interfaces built lazily, which only store what differs
+    _session = None
+    _parent = None
+    _deleted = False
+    descr = None
+    type = 'interface'
+    object = 'l1PhysIf'
+
+    # Defaults of the settings.  They are class attributes so that only the
+    # settings that were changed take room in each of the many instances.
+    _cdp_config = None
+    _lldp_config = None
+    _layer = None  # Layer2 or Layer3
+    _mode = 'access' # access, trunk, fex-fabric
+    _snmp_trap_st = 'default' # enable/disable/default
+    _adminstatus = None  # up or down
+    _speed = '10G'  # 100M, 1G, 10G or 40G
+    _mtu = '1500'
+    _link_log = 'default' # enable/disable/default
+    _trunk_log = 'default' #enable/disable/default
+    _duplex = 'auto' # auto/half/full
+    _access_vlan = None
+    _trunk_vlans = None
+    _native_vlan = None
+    _descr = ''
+
+    # Switch attributes of the JSON and the settings holding their values
+    _json_template = JsonTemplate([('accessVlan', '_access_vlan', False),
+                                   ('trunkVlans', '_trunk_vlans', False),
+                                   ('mtu', '_mtu', False),
+                                   ('adminSt', '_adminstatus', False),
+                                   ('speed', '_speed', False),
+                                   ('layer', '_layer', False),
+                                   ('snmpTrapSt', '_snmp_trap_st', False),
+                                   ('descr', '_descr', False),
+                                   ('duplex', '_duplex', False),
+                                   ('mode', '_mode', False),
+                                   ('linkLog', '_link_log', False),
+                                   ('trunkLog', '_trunk_log', False),
+                                   ('id', 'id', True)])
 
     def __init__(self, if_name, parent=None, session=None, attributes=None):
 
@@ -1575,7 +1667,7 @@ class Interface(BaseInterface):
         if attributes is None:
             self.attributes = {}
         else:
-            self.attributes = copy.deepcopy(attributes)
+            self.attributes = dict(attributes)
             
         if 'eth' in if_name:
             self.interface_type = 'eth'
@@ -1592,33 +1684,26 @@ class Interface(BaseInterface):
 
         super(Interface, self).__init__(if_name, None)
         self.porttype = ''
-        self._cdp_config = None
-        self._lldp_config = None
         self.type = 'interface'
         self.attributes['type'] = 'interface'
         
-        self._layer = None  # Layer2 or Layer3
-        self._mode = 'access' # access, trunk, fex-fabric
-        self._snmp_trap_st = 'default' # enable/disable/default
-        self._adminstatus = None  # up or down
-        self._speed = '10G'  # 100M, 1G, 10G or 40G
-        self._mtu = '1500'
-        self._link_log = 'default' # enable/disable/default
-        self._trunk_log = 'default' #enable/disable/default
-        self._duplex = 'auto' # auto/half/full
-        self._access_vlan = None
-        self._trunk_vlans = None
-        self._native_vlan = None
-        self._descr = ''
-        
         self.object = 'l1PhysIf'
 
         self._parent = parent
         if parent:
             self._parent.add_child(self)
 
-        self.stats = InterfaceStats(self, self.attributes.get('dist_name'))
-        
+    @property
+    def stats(self):
+        """InterfaceStats of this interface.  It is only created when first
+        used since most interfaces never read their stats.
+        """
+        stats = self.__dict__.get('_stats')
+        if stats is None:
+            stats = InterfaceStats(self, self.attributes.get('dist_name'))
+            self._stats = stats
+        return stats
+
     def set_descr(self, desc):
         self._descr = desc
     
@@ -1782,35 +1867,7 @@ class Interface(BaseInterface):
         """
         :return All the attributes of the switch to be configured
         """
-        att = {}
-        if self._access_vlan:
-            att['accessVlan'] = self._access_vlan
-        if self._trunk_vlans:
-            att['trunkVlans'] = self._trunk_vlans
-        if self._mtu:
-            att['mtu'] = self._mtu
-        if self._adminstatus:
-            att['adminSt'] = self._adminstatus
-        if self._speed:
-            att['speed'] = self._speed
-        if self._layer:        
-            att['layer'] = self._layer
-        if self._snmp_trap_st:
-            att['snmpTrapSt'] = self._snmp_trap_st
-        if self._descr:
-            att['descr'] = self._descr
-        if self._duplex:
-            att['duplex'] = self._duplex
-        if self._mode:
-            att['mode'] = self._mode
-        if self._link_log:
-            att['linkLog'] = self._link_log
-        if self._trunk_log:
-            att['trunkLog'] = self._trunk_log
-
-        att['id'] = self.id
-
-        return att
+        return self._json_template.get_attributes(self)
 
     def get_url(self, fmt='json'):
         """
@@ -1858,13 +1915,7 @@ class Interface(BaseInterface):
         sys/phys-[eth1/1]
         sys/intf/phys-[eth1/1] (For Image .551) 
         """
-        name = dn.split('/')
-        module = name[2].split('[')[1]
-        interface_type = module[:3]
-        module = module[3:]
-        port = name[3].split(']')[0]
-
-        return interface_type, module, port
+        return Dn(dn).interface
 
     @staticmethod
     def _parse_path_dn(dn):
@@ -1872,13 +1923,7 @@ class Interface(BaseInterface):
         Handles DNs that look like the following:
         sys/phys-[eth1/1]
         """
-        name = dn.split('/')
-        module = name[1].split('[')[1]
-        interface_type = module[:3]
-        module = module[3:]
-        port = name[2].split(']')[0]
-
-        return interface_type, module, port
+        return Dn(dn).interface
 
     @classmethod
     def parse_dn(cls, dn):
@@ -1889,10 +1934,7 @@ class Interface(BaseInterface):
         :param dn: String containing the interface distinguished name
         :returns: interface_type, pod, node, module, port
         """
-        if 'sys' in dn.split('/'):
-            return cls._parse_physical_dn(dn)
-        else:
-            return cls._parse_path_dn(dn)
+        return Dn(dn).interface
 
     @staticmethod
     def _get_discoveryprot_policies(session, prot):
@@ -1923,12 +1965,10 @@ class Interface(BaseInterface):
     def _get_discoveryprot_relations(session, interfaces, prot, prot_policies):
         if prot == 'cdp':
             prot_relation_class = 'l1RsCdpIfPolCons'
-            prot_relation_dn_class = '/cdpIfP-'
-            prot_relation_dn = '/rscdpIfPolCons'
+            prot_relation_dn_class = 'cdpIfP-'
         elif prot == 'lldp':
             prot_relation_class = 'l1RsLldpIfPolCons'
-            prot_relation_dn_class = '/lldpIfP-'
-            prot_relation_dn = '/rslldpIfPolCons'
+            prot_relation_dn_class = 'lldpIfP-'
         else:
             raise ValueError
 
@@ -1939,10 +1979,10 @@ class Interface(BaseInterface):
         for prot_relation in prot_data:
             if prot_relation_class in prot_relation:
                 attributes = prot_relation[prot_relation_class]['attributes']
-                policy_name = attributes['tDn'].split(prot_relation_dn_class)[1]
-                intf_dn = attributes['dn'].split(prot_relation_dn)[0]
+                policy_name = Dn(attributes['tDn']).get_value(prot_relation_dn_class)
+                intf_dn = Dn(attributes['dn']).parent
                 #TODO search_intf = Interface(*Interface._parse_physical_dn(intf_dn))
-                (if_type, module, port) = Interface._parse_physical_dn(intf_dn)
+                (if_type, module, port) = intf_dn.interface
                 if_name = if_type + module + '/' + port
                 search_intf = Interface(if_name)
                 for intf in interfaces:
@@ -1984,7 +2024,7 @@ class Interface(BaseInterface):
         return resp
 
     @classmethod
-    def get(cls, session, if_name=None):
+    def get(cls, session, if_name=None, lazy=False):
         """
         Gets all of the physical interfaces from the Switch if no parent is
         specified. If a parent of type Linecard is specified, then only
@@ -2002,6 +2042,9 @@ class Interface(BaseInterface):
         :param module: Module id string.  This specifies the module or\
                        slot of the port. (optional)
         :param port: Port number.  This is the port to read. (optional)
+        :param lazy: Boolean to build the Interfaces lazily.  Their\
+                     attributes are then only read from the MOs when they\
+                     are first used.
 
         :returns: list of Interface instances
         """
@@ -2042,44 +2085,34 @@ class Interface(BaseInterface):
         for obj in eth_data:
             eth_data_dict[obj['ethpmPhysIf']['attributes']['dn']] = obj['ethpmPhysIf']['attributes']
 
+        identity_map = get_identity_map(session)
         for interface in interface_data:
             if 'l1PhysIf' in interface:
-                attributes = {}
-                dist_name = str(interface['l1PhysIf']['attributes']['dn'])
-                attributes['dist_name'] = dist_name
-                porttype = str(interface['l1PhysIf']['attributes']['portT'])
-                attributes['porttype'] = porttype
-                adminstatus = str(interface['l1PhysIf']['attributes']['adminSt'])
-                attributes['adminstatus'] = adminstatus
-                speed = str(interface['l1PhysIf']['attributes']['speed'])
-                attributes['speed'] = speed
-                mtu = str(interface['l1PhysIf']['attributes']['mtu'])
-                attributes['mtu'] = mtu
-                identifier = str(interface['l1PhysIf']['attributes']['id'])
-                attributes['id'] = identifier
-                attributes['monPolDn'] = str(interface['l1PhysIf']['attributes']['monPolDn'])
-                attributes['name'] = str(interface['l1PhysIf']['attributes']['name'])
-                attributes['descr'] = str(interface['l1PhysIf']['attributes']['descr'])
-                attributes['usage'] = str(interface['l1PhysIf']['attributes']['usage'])
-                attributes['layer'] = str(interface['l1PhysIf']['attributes']['layer'])
-                (interface_type, module, port) = Interface.parse_dn(dist_name)
-                attributes['interface_type'] = interface_type
-                attributes['module'] = module
-                attributes['port'] = port
+                attributes = Interface._get_mo_attributes(
+                    interface['l1PhysIf']['attributes'], lazy)
+                dist_name = attributes['dist_name']
                 phys_dist_name = dist_name + '/phys'
                 if phys_dist_name in eth_data_dict.keys():
                     attributes['operSt'] = eth_data_dict[dist_name + '/phys']['operSt']
                 else:
                     attributes['operSt'] = ''
                 
-                interface_obj = Interface(identifier, parent=None, session=session,
-                                          attributes=attributes)
-                
-                
-                interface_obj.porttype = porttype
-                interface_obj.adminstatus = adminstatus
-                interface_obj.speed = speed
-                interface_obj.mtu = mtu
+                interface_obj = None
+                if identity_map is not None:
+                    interface_obj = identity_map.get(dist_name, Interface)
+                if interface_obj is None:
+                    interface_obj = Interface._from_mo_attributes(
+                        attributes, session=session)
+                    if identity_map is not None:
+                        identity_map.add(dist_name, interface_obj)
+                else:
+                    interface_obj._session = session
+                    interface_obj.attributes.update(attributes)
+                    interface_obj.porttype = attributes['porttype']
+                    interface_obj.adminstatus = attributes['adminstatus']
+                    interface_obj.speed = attributes['speed']
+                    interface_obj.mtu = attributes['mtu']
+
                 if attributes['operSt']:
                     interface_obj.operSt = attributes['operSt']
                 else:
@@ -2091,6 +2124,134 @@ class Interface(BaseInterface):
         resp = Interface._get_discoveryprot_relations(session, resp, 'lldp', lldp_policies)
         return resp
 
+    @staticmethod
+    def _get_mo_attributes(mo_attributes, lazy=False):
+        """
+        Get the attributes of an Interface from the attributes of its
+        l1PhysIf MO.
+
+        :param mo_attributes: dictionary containing the l1PhysIf attributes
+        :param lazy: Boolean to return a LazyAttributes view of the MO\
+                     attributes instead of a dictionary
+        :returns: dictionary of the Interface attributes
+        """
+        if lazy:
+            return LazyAttributes(mo_attributes, _INTERFACE_FIELDS)
+        attributes = {}
+        for name, mo_name in INTERFACE_MO_ATTRIBUTES:
+            attributes[name] = str(mo_attributes[mo_name])
+        (interface_type, module, port) = Interface.parse_dn(
+            attributes['dist_name'])
+        attributes['interface_type'] = interface_type
+        attributes['module'] = module
+        attributes['port'] = port
+        return attributes
+
+    @classmethod
+    def _decode_mo(cls, switch_class, mo_data, parent=None):
+        """
+        Create the Interface of an l1PhysIf MO returned by the Switch.
+        The operational state is taken from the ethpmPhysIf child if
+        the MO was read with its children.
+
+        :param switch_class: String containing the Switch class of the MO
+        :param mo_data: dictionary containing the attributes and children\
+                        of the MO
+        :param parent: Optional parent Linecard
+        :returns: the new Interface
+        """
+        attributes = cls._get_mo_attributes(mo_data['attributes'])
+        attributes['operSt'] = ''
+        for child in mo_data.get('children', []):
+            if 'ethpmPhysIf' in child:
+                attributes['operSt'] = str(child['ethpmPhysIf']['attributes']['operSt'])
+        interface_obj = cls._from_mo_attributes(attributes, parent=parent)
+        interface_obj.operSt = attributes['operSt'] or '-'
+        return interface_obj
+
+    @classmethod
+    def _new_prototype(cls, name):
+        """
+        Create the prototype copied by _from_mo_attributes.  The name of
+        an Interface must be an ethernet interface, and its parts are set
+        again by _set_mo_attributes for each copy.
+        """
+        return cls('eth1/1')
+
+    @classmethod
+    def from_mo(cls, attributes, parent=None):
+        """
+        Create an Interface from the attributes of an l1PhysIf MO returned
+        by the Switch.
+
+        :param attributes: dictionary containing the attributes of the MO
+        :param parent: Optional parent Linecard
+        :returns: the new Interface
+        """
+        return cls._from_mo_attributes(cls._get_mo_attributes(attributes),
+                                       parent)
+
+    @classmethod
+    def _from_mo_attributes(cls, attributes, parent=None, session=None):
+        """
+        Create an Interface from the attributes returned by
+        _get_mo_attributes.  The Interface is a copy of a prototype built
+        through __init__ and takes ownership of the attributes dictionary,
+        so the getters build the many interfaces of a switch without
+        copying and checking them again.
+
+        A LazyAttributes view returned by _get_mo_attributes builds a lazy
+        Interface: its attributes are only read from the MO when they are
+        first used, and the interface name is not checked.
+
+        :param attributes: dictionary of the Interface attributes
+        :param parent: Optional parent Linecard
+        :param session: Optional session used for Switch communication
+        :returns: the new Interface
+        """
+        if isinstance(attributes, LazyAttributes):
+            interface_obj = cls.__new__(cls)
+            interface_obj.attributes = attributes
+            if session is not None:
+                interface_obj._session = session
+            if parent is not None:
+                interface_obj._parent = parent
+        else:
+            interface_obj = cls._new_from_prototype(attributes['id'])
+            if interface_obj is None:
+                interface_obj = cls(attributes['id'])
+            interface_obj.attributes = attributes
+            interface_obj._session = session
+            interface_obj._parent = parent
+            interface_obj._set_mo_attributes(attributes)
+        if parent:
+            parent.add_child(interface_obj)
+        return interface_obj
+
+    def _set_mo_attributes(self, attributes):
+        """
+        Set the attributes of an Interface built by _from_mo_attributes
+        from a dictionary.
+        """
+        if_name = attributes['id']
+        if 'eth' not in if_name:
+            raise TypeError('ethernet interface expected')
+        self.interface_type = 'eth'
+        self.id = if_name
+        self.if_type = if_name[:3]
+        (self.module, self.port) = if_name.replace('eth', '').split('/')
+        self.if_name = if_name
+        attributes['interface_type'] = 'eth'
+        attributes['module'] = self.module
+        attributes['port'] = self.port
+        attributes['if_name'] = if_name
+        attributes['type'] = 'interface'
+        self.name = if_name
+        self.porttype = attributes['porttype']
+        self.adminstatus = attributes['adminstatus']
+        self.speed = attributes['speed']
+        self.mtu = attributes['mtu']
+
     def __str__(self):
         items = [self.if_name, '\t', self.porttype, '\t',
                  self.adminstatus, '\t', self.speed, '\t',
@@ -2107,6 +2268,10 @@ class Interface(BaseInterface):
             return True
         return False
 
+    def _get_identity_key(self):
+        return (self.attributes['interface_type'],
+                self.attributes['module'], self.attributes['port'])
+
 
 class WorkingData(object):
     """
@@ -2157,7 +2322,7 @@ class WorkingData(object):
         data = ret.json()['imdata']
 
         if data:
-            self.rawjson = ret.json()['imdata']
+            self.rawjson = data
         else:
             self.rawjson = None
 
@@ -2274,10 +2439,8 @@ class WorkingData(object):
             name = str(l2bd['l2BD']['attributes']['name'].split(':')[-1])
             if not name:
                 name = vnid
-            dname = str(l2bd['l2BD']['attributes']['dn'])
-            fields = dname.split('/')
-            context_dn = '/'.join(fields[0:-1])
-            ctx_data = self.get_object(context_dn)
+            dname = Dn(l2bd['l2BD']['attributes']['dn'])
+            ctx_data = self.get_object(dname.parent)
             if 'l3Ctx' in ctx_data:
                 context = str(ctx_data['l3Ctx']['attributes']['name'])
             elif 'l3Inst' in ctx_data:
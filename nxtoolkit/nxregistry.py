@@ -0,0 +1,164 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the ClassRegistry class that maps the Switch
+     classes to the nxtoolkit classes decoding them, and the decode
+     function turning the MOs returned by the Switch into objects.
+"""
+
+
+class ClassRegistry(object):
+    """
+    Registry of the nxtoolkit classes.  It is populated once when the
+    toolkit is imported and keeps what the classes would otherwise
+    compute again for every MO decoded: the map of each Switch class to
+    the nxtoolkit class decoding it, the child class maps and the deep
+    Switch class lists.
+    """
+    def __init__(self):
+        self._classes = {}
+        self._class_maps = {}
+        self._deep_switch_classes = {}
+
+    def register(self, toolkit_class):
+        """
+        Register an nxtoolkit class as the class decoding the first of its
+        Switch classes.  A Switch class already registered keeps its class.
+
+        :param toolkit_class: nxtoolkit class
+        :returns: True if the class was registered
+        """
+        try:
+            switch_classes = toolkit_class._get_switch_classes()
+        except NotImplementedError:
+            return False
+        if not switch_classes:
+            return False
+        self._classes.setdefault(switch_classes[0], toolkit_class)
+        return self._classes[switch_classes[0]] is toolkit_class
+
+    def register_subclasses(self, base_class):
+        """
+        Register all of the subclasses of a class, parents before children
+
+        :param base_class: class whose subclasses are registered
+        """
+        pending = list(base_class.__subclasses__())
+        while pending:
+            toolkit_class = pending.pop(0)
+            self.register(toolkit_class)
+            pending.extend(toolkit_class.__subclasses__())
+
+    def get_class(self, switch_class):
+        """
+        Get the nxtoolkit class decoding a Switch class
+
+        :param switch_class: String containing the Switch class name
+        :returns: nxtoolkit class or None
+        """
+        return self._classes.get(switch_class)
+
+    def get_switch_classes(self):
+        """
+        Get the Switch classes that can be decoded
+
+        :returns: sorted list of Switch class names
+        """
+        return sorted(self._classes)
+
+    def get_class_map(self, toolkit_class):
+        """
+        Get the map of the Switch classes of the children of an nxtoolkit
+        class to their nxtoolkit classes.  The map is built only once.
+
+        :param toolkit_class: nxtoolkit class
+        :returns: dict of Switch class names to nxtoolkit classes
+        """
+        class_map = self._class_maps.get(toolkit_class)
+        if class_map is None:
+            class_map = toolkit_class._get_toolkit_to_switch_classmap()
+            self._class_maps[toolkit_class] = class_map
+        return class_map
+
+    def get_deep_switch_classes(self, toolkit_class, include_concrete=False):
+        """
+        Get the Switch classes of an nxtoolkit class and of all of its
+        children.  The list is built only once per class.
+
+        :param toolkit_class: nxtoolkit class
+        :param include_concrete: Boolean to include the concrete children
+        :returns: tuple of Switch class names
+        """
+        key = (toolkit_class, include_concrete)
+        resp = self._deep_switch_classes.get(key)
+        if resp is None:
+            resp = []
+            child_classes = list(toolkit_class._get_children_classes())
+            if include_concrete:
+                child_classes.extend(
+                    toolkit_class._get_children_concrete_classes())
+            for switch_class in toolkit_class._get_switch_classes():
+                if switch_class not in resp:
+                    resp.append(switch_class)
+            for child_class in child_classes:
+                for switch_class in self.get_deep_switch_classes(
+                        child_class, include_concrete):
+                    if switch_class not in resp:
+                        resp.append(switch_class)
+            resp = tuple(resp)
+            self._deep_switch_classes[key] = resp
+        return resp
+
+    def decode(self, imdata, parent=None):
+        """
+        Turn the MOs returned by the Switch into nxtoolkit objects in a
+        single pass.  Each MO is decoded by the class registered for its
+        Switch class, along with its children.  The MOs of the Switch
+        classes that are not registered are skipped.
+
+        :param imdata: list of MOs such as the imdata of a query response
+        :param parent: Optional parent object of the decoded objects
+        :returns: list of nxtoolkit objects
+        """
+        resp = []
+        classes = self._classes
+        for mo in imdata:
+            for switch_class in mo:
+                toolkit_class = classes.get(switch_class)
+                if toolkit_class is None:
+                    continue
+                obj = toolkit_class._decode_mo(switch_class, mo[switch_class],
+                                               parent)
+                if obj is not None:
+                    resp.append(obj)
+        return resp
+
+
+REGISTRY = ClassRegistry()
+
+
+def decode(imdata, parent=None):
+    """
+    Turn the MOs returned by the Switch into nxtoolkit objects using the
+    registry of the toolkit classes.
+
+    :param imdata: list of MOs such as the imdata of a query response
+    :param parent: Optional parent object of the decoded objects
+    :returns: list of nxtoolkit objects
+    """
+    return REGISTRY.decode(imdata, parent)
@@ -0,0 +1,349 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the Rollout class that pushes the same change to
+     a fleet of Switches in waves: a canary wave first, then waves pushed
+     with growing concurrency, halting when the failures exceed a budget.
+"""
+import logging
+import threading
+import time
+from .nxchangeset import ChangeSet
+
+# Queue library is named "queue" in Python3
+try:
+    from Queue import Queue, Empty
+except ImportError:
+    from queue import Queue, Empty
+
+# Number of Switches of the canary wave
+CANARY_SIZE = 1
+# Factor the size of each wave is multiplied by
+GROWTH_FACTOR = 2
+# Largest number of Switches pushed at the same time
+MAX_WINDOW = 64
+
+
+def _get_percentile(values, percent):
+    """
+    Get a percentile of a sorted list of values
+    """
+    if not values:
+        return None
+    index = int(round(percent / 100.0 * (len(values) - 1)))
+    return values[index]
+
+
+class SwitchResult(object):
+    """
+    Result of pushing the change to a Switch
+    """
+    def __init__(self, session, wave, results=None, error=None,
+                 latency=None):
+        """
+        :param session: the Session of the Switch
+        :param wave: index of the wave the Switch was pushed in
+        :param results: list of ChangeResult instances of the change
+        :param error: Exception raised by the push
+        :param latency: number of seconds used by the push
+        """
+        self.session = session
+        self.wave = wave
+        self.results = results or []
+        self.error = error
+        self.latency = latency
+
+    @property
+    def ok(self):
+        """
+        True if the whole change was pushed to the Switch
+        """
+        return self.error is None and all(result.ok
+                                          for result in self.results)
+
+    @property
+    def switch(self):
+        """
+        Name of the Switch used in the logs
+        """
+        return getattr(self.session, 'ipaddr', None) or repr(self.session)
+
+
+class WaveReport(object):
+    """
+    Progress and latency metrics of a wave
+    """
+    def __init__(self, index, size, concurrency):
+        """
+        :param index: index of the wave, 0 is the canary wave
+        :param size: number of Switches of the wave
+        :param concurrency: number of Switches pushed at the same time
+        """
+        self.index = index
+        self.size = size
+        self.concurrency = concurrency
+        self.results = []
+        self.duration = None
+
+    @property
+    def succeeded(self):
+        return len([result for result in self.results if result.ok])
+
+    @property
+    def failed(self):
+        return len([result for result in self.results if not result.ok])
+
+    @property
+    def not_pushed(self):
+        """
+        Number of Switches of the wave not pushed because of a halt
+        """
+        return self.size - len(self.results)
+
+    def get_latencies(self):
+        """
+        Get the latency metrics of the pushes of the wave
+
+        :returns: dictionary of the 'min', 'mean', 'p50', 'p95' and 'max'\
+                  latencies in seconds, None when nothing was pushed
+        """
+        latencies = sorted(result.latency for result in self.results
+                           if result.latency is not None)
+        if not latencies:
+            return dict((key, None) for key in ('min', 'mean', 'p50', 'p95',
+                                                'max'))
+        return {'min': latencies[0],
+                'mean': sum(latencies) / len(latencies),
+                'p50': _get_percentile(latencies, 50),
+                'p95': _get_percentile(latencies, 95),
+                'max': latencies[-1]}
+
+    def __repr__(self):
+        return '<WaveReport %s: %s ok, %s failed, %s not pushed>' % (
+            self.index, self.succeeded, self.failed, self.not_pushed)
+
+
+class RolloutReport(object):
+    """
+    Outcome of a rollout
+    """
+    def __init__(self, size):
+        """
+        :param size: number of Switches of the rollout
+        """
+        self.size = size
+        self.waves = []
+        self.halted = False
+        self.reason = None
+
+    @property
+    def results(self):
+        """
+        List of the SwitchResult instances of the Switches pushed
+        """
+        return [result for wave in self.waves for result in wave.results]
+
+    @property
+    def succeeded(self):
+        return sum(wave.succeeded for wave in self.waves)
+
+    @property
+    def failed(self):
+        return sum(wave.failed for wave in self.waves)
+
+    @property
+    def not_pushed(self):
+        """
+        Number of Switches not pushed because of a halt
+        """
+        return self.size - len(self.results)
+
+
+class Rollout(object):
+    """
+    Pushes the same change to many Switches in waves.  The first wave is a
+    canary wave of a few Switches.  Each following wave is larger than the
+    previous one by the growth factor, and its Switches are pushed
+    concurrently, up to max_window at the same time.
+
+    The rollout halts when the number of failed Switches exceeds the
+    failure budget, or when a canary fails.  The Switches of the halted
+    wave that were not started yet and the following waves are not
+    pushed.
+    """
+    def __init__(self, change, sessions, canary_size=CANARY_SIZE,
+                 growth_factor=GROWTH_FACTOR, max_window=MAX_WINDOW,
+                 failure_budget=0, halt_on_canary_failure=True,
+                 progress=None):
+        """
+        :param change: nxtoolkit object, list of nxtoolkit objects or\
+                       function taking a Session and returning them, for\
+                       the changes that differ per Switch.  They are pushed\
+                       to each Switch with a ChangeSet.
+        :param sessions: list of the Sessions of the Switches
+        :param canary_size: number of Switches of the canary wave
+        :param growth_factor: factor the size of each wave is multiplied by
+        :param max_window: largest number of Switches pushed at the same time
+        :param failure_budget: number of failed Switches tolerated, or the\
+                               fraction of the Switches if it is a float\
+                               below 1
+        :param halt_on_canary_failure: Boolean to halt when a canary fails\
+                                       even within the failure budget
+        :param progress: Optional function called with each WaveReport\
+                         when the wave is done
+        """
+        if canary_size < 1 or max_window < 1 or growth_factor < 1:
+            raise ValueError('canary_size, growth_factor and max_window '
+                             'must be at least 1')
+        self.change = change
+        self.sessions = list(sessions)
+        self.canary_size = canary_size
+        self.growth_factor = growth_factor
+        self.max_window = max_window
+        self.failure_budget = failure_budget
+        self.halt_on_canary_failure = halt_on_canary_failure
+        self.progress = progress
+
+    def get_max_failures(self):
+        """
+        Get the number of failed Switches tolerated
+
+        :returns: integer
+        """
+        if isinstance(self.failure_budget, float) and self.failure_budget < 1:
+            return int(self.failure_budget * len(self.sessions))
+        return int(self.failure_budget)
+
+    def get_waves(self):
+        """
+        Split the Switches into waves
+
+        :returns: list of lists of Sessions
+        """
+        waves = []
+        size = self.canary_size
+        start = 0
+        while start < len(self.sessions):
+            waves.append(self.sessions[start:start + size])
+            start += size
+            size = max(size + 1, int(size * self.growth_factor))
+        return waves
+
+    def _get_objects(self, session):
+        objs = self.change(session) if callable(self.change) else self.change
+        if not isinstance(objs, (list, tuple)):
+            objs = [objs]
+        return objs
+
+    def _push(self, session, wave):
+        """
+        Push the change to a Switch
+
+        :returns: SwitchResult instance
+        """
+        start = time.time()
+        try:
+            results = ChangeSet(self._get_objects(session)).push(session)
+        except Exception as error:
+            result = SwitchResult(session, wave, error=error,
+                                  latency=time.time() - start)
+        else:
+            result = SwitchResult(session, wave, results=results,
+                                  latency=time.time() - start)
+        if result.error is not None:
+            logging.error('Rollout wave %s failed on %s: %s', wave,
+                          result.switch, result.error)
+        elif not result.ok:
+            logging.error('Rollout wave %s failed on %s: %s objects were '
+                          'rejected', wave, result.switch,
+                          len([change for change in result.results
+                               if not change.ok]))
+        return result
+
+    def _run_wave(self, report, sessions, failures, max_failures):
+        """
+        Push a wave, stopping to start Switches once the failures exceed
+        the budget
+
+        :param failures: number of failed Switches before the wave
+        :returns: True if the rollout halted
+        """
+        work_q = Queue()
+        for session in sessions:
+            work_q.put(session)
+        lock = threading.Lock()
+        state = {'failures': failures}
+
+        def worker():
+            while True:
+                with lock:
+                    if state['failures'] > max_failures:
+                        return
+                try:
+                    session = work_q.get_nowait()
+                except Empty:
+                    return
+                result = self._push(session, report.index)
+                with lock:
+                    report.results.append(result)
+                    if not result.ok:
+                        state['failures'] += 1
+
+        workers = [threading.Thread(target=worker)
+                   for _ in range(report.concurrency)]
+        for thread in workers:
+            thread.daemon = True
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return state['failures'] > max_failures
+
+    def run(self):
+        """
+        Run the rollout
+
+        :returns: RolloutReport instance
+        """
+        report = RolloutReport(len(self.sessions))
+        max_failures = self.get_max_failures()
+        for index, sessions in enumerate(self.get_waves()):
+            wave = WaveReport(index, len(sessions),
+                              min(len(sessions), self.max_window))
+            report.waves.append(wave)
+            start = time.time()
+            halted = self._run_wave(wave, sessions, report.failed,
+                                    max_failures)
+            wave.duration = time.time() - start
+            latencies = wave.get_latencies()
+            logging.info('Rollout wave %s: %s/%s Switches ok, %s failed in '
+                         '%.1fs, p95 latency %s', index, wave.succeeded,
+                         wave.size, wave.failed, wave.duration,
+                         latencies['p95'])
+            if self.progress is not None:
+                self.progress(wave)
+            if halted:
+                report.halted = True
+                report.reason = ('%s Switches failed, the failure budget '
+                                 'is %s' % (report.failed, max_failures))
+            elif index == 0 and wave.failed and self.halt_on_canary_failure:
+                report.halted = True
+                report.reason = 'the canary wave failed'
+            if report.halted:
+                logging.error('Rollout halted: %s', report.reason)
+                break
+        return report
@@ -0,0 +1,312 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the ConfigScheduler class that pushes nxtoolkit
+     objects to one or more Switches in the order of their dependencies,
+     pushing the independent objects concurrently.
+"""
+import logging
+import threading
+
+# Number of pushes run at the same time on each Switch
+MAX_CONCURRENCY = 4
+
+# Classes of the objects that must be pushed before the objects of a class
+# on the same Switch, keyed by class name.  The names are matched against
+# the classes of the objects and their base classes.
+DEPENDENCIES = {
+    'Vrrp': ('Feature',),
+    'ConfigVrrps': ('Feature',),
+    'Dhcp': ('Feature',),
+    'InterfaceBreakout': ('Feature',),
+    'Lacp': ('Feature',),
+    'PortChannel': ('Feature',),
+    'SVI': ('Feature', 'L2BD', 'ConfigBDs'),
+    'ConfigInterfaces': ('Feature', 'L2BD', 'ConfigBDs'),
+}
+
+# Attributes listing the objects that must be pushed after an object, keyed
+# by class name, such as the member Interfaces of a PortChannel
+MEMBER_ATTRIBUTES = {
+    'PortChannel': '_interfaces',
+}
+
+
+def _get_class_names(obj):
+    """
+    Get the names of the class of an object and of its base classes
+    """
+    return [klass.__name__ for klass in type(obj).__mro__]
+
+
+class PushResult(object):
+    """
+    Result of pushing an object with a ConfigScheduler
+    """
+    PUSHED = 'pushed'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+
+    def __init__(self, obj, session, status, response=None, error=None):
+        """
+        :param obj: the nxtoolkit object
+        :param session: the Session the object was pushed with
+        :param status: 'pushed', 'failed' or 'skipped' when an object it\
+                       depends on failed
+        :param response: Response of the push
+        :param error: Exception raised by the push
+        """
+        self.obj = obj
+        self.session = session
+        self.status = status
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self):
+        """
+        True if the object was pushed successfully
+        """
+        return self.status == self.PUSHED
+
+    def __repr__(self):
+        return '<PushResult %s %s>' % (type(self.obj).__name__, self.status)
+
+
+class _Task(object):
+    """
+    Object pushed by a ConfigScheduler along with its dependencies
+    """
+    __slots__ = ('index', 'obj', 'session', 'upstream', 'downstream',
+                 'waiting')
+
+    def __init__(self, index, obj, session):
+        self.index = index
+        self.obj = obj
+        self.session = session
+        self.upstream = set()
+        self.downstream = set()
+        self.waiting = 0
+
+
+class ConfigScheduler(object):
+    """
+    Pushes nxtoolkit objects in the order of their dependencies.  The
+    dependencies are derived from the classes of the objects, such as a
+    Feature before a Vrrp or an L2BD before an SVI, from their parents,
+    and from the members of the PortChannels.  They can also be given
+    explicitly when an object is added.
+
+    The objects that do not depend on each other are pushed concurrently,
+    with at most max_concurrency pushes at the same time on each Switch.
+    When a push fails, the objects depending on it are not pushed.
+    """
+    def __init__(self, max_concurrency=MAX_CONCURRENCY):
+        """
+        :param max_concurrency: Number of pushes run at the same time on\
+                                each Switch
+        """
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        self.max_concurrency = max_concurrency
+        self._tasks = []
+        self._explicit = []
+
+    def add(self, obj, session, depends_on=None):
+        """
+        Add an object to push
+
+        :param obj: nxtoolkit object with get_url and get_json methods
+        :param session: the instance of Session of the Switch
+        :param depends_on: Optional list of objects already added that\
+                           must be pushed before this object, on any Switch
+        """
+        task = _Task(len(self._tasks), obj, session)
+        self._tasks.append(task)
+        for upstream in depends_on or []:
+            self._explicit.append((upstream, obj))
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def _link(self):
+        """
+        Derive the dependencies of the tasks
+
+        :raises ValueError: if the dependencies have a cycle or an object\
+                            depends on an object that was not added
+        """
+        by_id = {}
+        for task in self._tasks:
+            task.upstream = set()
+            task.downstream = set()
+            by_id.setdefault(id(task.obj), []).append(task)
+
+        def link(upstream, downstream):
+            if upstream is not downstream:
+                upstream.downstream.add(downstream)
+                downstream.upstream.add(upstream)
+
+        by_class = {}
+        for task in self._tasks:
+            for name in _get_class_names(task.obj):
+                by_class.setdefault((id(task.session), name), []).append(task)
+        for task in self._tasks:
+            for name in _get_class_names(task.obj):
+                for required in DEPENDENCIES.get(name, ()):
+                    key = (id(task.session), required)
+                    for upstream in by_class.get(key, []):
+                        link(upstream, task)
+                attribute = MEMBER_ATTRIBUTES.get(name)
+                if attribute is not None:
+                    for member in getattr(task.obj, attribute, None) or []:
+                        for downstream in by_id.get(id(member), []):
+                            if downstream.session is task.session:
+                                link(task, downstream)
+            parent = getattr(task.obj, '_parent', None)
+            for upstream in by_id.get(id(parent), []):
+                if upstream.session is task.session:
+                    link(upstream, task)
+        for upstream_obj, obj in self._explicit:
+            if id(upstream_obj) not in by_id:
+                raise ValueError('%s depends on an object that was not '
+                                 'added' % type(obj).__name__)
+            for upstream in by_id[id(upstream_obj)]:
+                for task in by_id[id(obj)]:
+                    link(upstream, task)
+        self._check_cycles()
+
+    def _check_cycles(self):
+        """
+        Check that the tasks can be ordered
+        """
+        waiting = dict((task, len(task.upstream)) for task in self._tasks)
+        ready = [task for task in self._tasks if not waiting[task]]
+        count = 0
+        while ready:
+            task = ready.pop()
+            count += 1
+            for downstream in task.downstream:
+                waiting[downstream] -= 1
+                if not waiting[downstream]:
+                    ready.append(downstream)
+        if count != len(self._tasks):
+            raise ValueError('The dependencies of the objects have a cycle')
+
+    def get_dependencies(self, obj):
+        """
+        Get the objects that are pushed before an object
+
+        :param obj: nxtoolkit object that was added
+        :returns: list of the objects it directly depends on
+        """
+        self._link()
+        resp = []
+        for task in self._tasks:
+            if task.obj is obj:
+                for upstream in sorted(task.upstream,
+                                       key=lambda task: task.index):
+                    if upstream.obj not in resp:
+                        resp.append(upstream.obj)
+        return resp
+
+    @staticmethod
+    def _push(task):
+        """
+        Push the object of a task
+
+        :returns: PushResult instance
+        """
+        try:
+            resp = task.session.push_to_switch(task.obj.get_url(),
+                                               task.obj.get_json())
+        except Exception as error:
+            logging.error('Pushing %s failed: %s', type(task.obj).__name__,
+                          error)
+            return PushResult(task.obj, task.session, PushResult.FAILED,
+                              error=error)
+        if not resp.ok:
+            logging.error('Pushing %s failed: %s', type(task.obj).__name__,
+                          getattr(resp, 'text', ''))
+            return PushResult(task.obj, task.session, PushResult.FAILED,
+                              response=resp)
+        return PushResult(task.obj, task.session, PushResult.PUSHED,
+                          response=resp)
+
+    def run(self):
+        """
+        Push all of the objects
+
+        :returns: list of PushResult instances in the order the objects\
+                  were added
+        :raises ValueError: if the dependencies have a cycle
+        """
+        self._link()
+        results = {}
+        condition = threading.Condition()
+        running = {}
+        ready = []
+        for task in self._tasks:
+            task.waiting = len(task.upstream)
+            if not task.waiting:
+                ready.append(task)
+
+        def skip(task):
+            for downstream in task.downstream:
+                if downstream not in results:
+                    results[downstream] = PushResult(
+                        downstream.obj, downstream.session,
+                        PushResult.SKIPPED)
+                    skip(downstream)
+
+        def worker(task):
+            result = self._push(task)
+            with condition:
+                results[task] = result
+                running[id(task.session)] -= 1
+                if result.ok:
+                    for downstream in task.downstream:
+                        downstream.waiting -= 1
+                        if not downstream.waiting and \
+                                downstream not in results:
+                            ready.append(downstream)
+                else:
+                    skip(task)
+                condition.notify()
+
+        threads = []
+        with condition:
+            while len(results) < len(self._tasks):
+                started = False
+                for task in sorted(ready, key=lambda task: task.index):
+                    key = id(task.session)
+                    if task in results:
+                        ready.remove(task)
+                    elif running.get(key, 0) < self.max_concurrency:
+                        ready.remove(task)
+                        running[key] = running.get(key, 0) + 1
+                        thread = threading.Thread(target=worker, args=(task,))
+                        thread.daemon = True
+                        thread.start()
+                        threads.append(thread)
+                        started = True
+                if not started and len(results) < len(self._tasks):
+                    condition.wait()
+        for thread in threads:
+            thread.join()
+        return [results[task] for task in self._tasks]
@@ -0,0 +1,224 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the streaming JSON serializer used to push the
+     configuration of large object trees to the Switch.  It writes the
+     same JSON as json.dumps(obj.get_json(), sort_keys=True) without
+     building the JSON of the whole tree first and without recursion.
+"""
+import itertools
+import json
+from json.encoder import encode_basestring_ascii
+from operator import itemgetter
+import threading
+
+try:
+    STRING_TYPES = (str, unicode)
+except NameError:
+    STRING_TYPES = (str,)
+
+# Size of the chunks of a streamed JSON document
+CHUNK_SIZE = 65536
+
+_state = threading.local()
+_get_key = itemgetter(0)
+
+# Kinds of the containers being written
+_TOP = 0
+_DICT = 1
+_LIST = 2
+
+
+class ChildJson(object):
+    """
+    Placeholder for the JSON of a child object in the JSON of its parent.
+    The serializer gets the JSON of the child when it reaches it, so only
+    the JSON of the object being written is held at a time.
+    """
+    __slots__ = ('obj',)
+
+    def __init__(self, obj):
+        """
+        :param obj: nxtoolkit object
+        """
+        self.obj = obj
+
+    def get_json(self):
+        """
+        Get the JSON of the object.  The children of the object are also
+        returned as ChildJson placeholders.
+
+        :returns: JSON dictionary, list of JSON dictionaries or None
+        """
+        previous = getattr(_state, 'obj', None)
+        _state.obj = self.obj
+        try:
+            return self.obj.get_json()
+        finally:
+            _state.obj = previous
+
+
+def get_streamed_object():
+    """
+    Get the object whose JSON is being got by the serializer.  Its
+    get_json returns its children as ChildJson placeholders.
+
+    :returns: nxtoolkit object or None
+    """
+    return getattr(_state, 'obj', None)
+
+
+def _encode_key(key):
+    if isinstance(key, STRING_TYPES):
+        return encode_basestring_ascii(key)
+    return '"%s"' % json.dumps(key)
+
+
+def _encode_scalar(value):
+    if isinstance(value, STRING_TYPES):
+        return encode_basestring_ascii(value)
+    return json.dumps(value)
+
+
+def _encode_flat_dict(value):
+    """
+    Encode a dictionary of strings such as the attributes of an MO, or
+    return None if it holds other values.
+    """
+    for item in value.values():
+        if not isinstance(item, STRING_TYPES):
+            return None
+    return '{%s}' % ', '.join([
+        _encode_key(key) + ': ' + encode_basestring_ascii(item)
+        for key, item in sorted(value.items(), key=_get_key)])
+
+
+def _iter_pieces(data):
+    """
+    Generate the pieces of the JSON of data.  The containers being written
+    are kept on a stack instead of being written by recursive calls.
+    """
+    stack = []
+    items = iter((data,))
+    kind = _TOP
+    first = True
+    close = ''
+    while True:
+        try:
+            item = next(items)
+        except StopIteration:
+            if not stack:
+                return
+            yield close
+            items, kind, first, close = stack.pop()
+            continue
+        if kind == _DICT:
+            key, value = item
+        else:
+            value = item
+        if isinstance(value, ChildJson):
+            value = value.get_json()
+            if kind == _LIST:
+                # Same as the children added by BaseNXObject.get_json
+                if value is None:
+                    continue
+                if isinstance(value, list):
+                    items = itertools.chain(value, items)
+                    continue
+        if kind == _DICT:
+            prefix = _encode_key(key) + ': '
+            if not first:
+                prefix = ', ' + prefix
+        elif first:
+            prefix = ''
+        else:
+            prefix = ', '
+        first = False
+        if isinstance(value, dict):
+            piece = _encode_flat_dict(value)
+            if piece is not None:
+                yield prefix + piece
+                continue
+            yield prefix + '{'
+            stack.append((items, kind, first, close))
+            items = iter(sorted(value.items(), key=_get_key))
+            kind = _DICT
+            close = '}'
+        elif isinstance(value, (list, tuple)):
+            yield prefix + '['
+            stack.append((items, kind, first, close))
+            items = iter(value)
+            kind = _LIST
+            close = ']'
+        else:
+            yield prefix + _encode_scalar(value)
+            continue
+        first = True
+
+
+def _get_data(data):
+    if hasattr(data, 'get_json') and not isinstance(data, ChildJson):
+        return ChildJson(data)
+    return data
+
+
+def iter_json(data, chunk_size=CHUNK_SIZE):
+    """
+    Generate the JSON of an nxtoolkit object or of a JSON dictionary in
+    chunks, such as the body of a chunked HTTP request.
+
+    :param data: nxtoolkit object or JSON data
+    :param chunk_size: Minimum size of the chunks except the last one
+    :returns: generator of strings
+    """
+    pieces = []
+    size = 0
+    for piece in _iter_pieces(_get_data(data)):
+        pieces.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(pieces)
+            pieces = []
+            size = 0
+    if pieces:
+        yield ''.join(pieces)
+
+
+def dump(data, fp, chunk_size=CHUNK_SIZE):
+    """
+    Write the JSON of an nxtoolkit object or of a JSON dictionary to a
+    file or a buffer.
+
+    :param data: nxtoolkit object or JSON data
+    :param fp: file like object with a write method
+    :param chunk_size: Minimum size of the writes except the last one
+    """
+    for chunk in iter_json(data, chunk_size):
+        fp.write(chunk)
+
+
+def dumps(data):
+    """
+    Get the JSON of an nxtoolkit object or of a JSON dictionary.  The
+    result is the same as json.dumps(data, sort_keys=True), with the JSON
+    of an object being the one returned by its get_json.
+
+    :param data: nxtoolkit object or JSON data
+    :returns: string containing the JSON
+    """
+    return ''.join(_iter_pieces(_get_data(data)))
@@ -19,22 +19,27 @@
 """  This module contains the Session class that controls communication
      with the Switch.
 """
+import functools
 import logging
 import json
 import requests
 from requests import Timeout, ConnectionError
 import threading
 import time
+import random
+import re
 from websocket import create_connection, WebSocketException
+from .nxcache import LruCache, PARENT_CACHE_SIZE
+from . import nxserializer
 import ssl
 
 # Queue library is named "queue" in Python3
 try:
     # Python2 naming
-    from Queue import Queue
+    from Queue import Queue, Empty
 except ImportError:
     # Python3 naming
-    from queue import Queue
+    from queue import Queue, Empty
 
 try:
     import urllib3
@@ -49,6 +54,26 @@ else:
 # Time before login timer expiration to send refresh
 TIMEOUT_GRACE_SECONDS = 10
 
+# Maximum number of subscription ids sent in one refresh request
+REFRESH_BATCH_SIZE = 32
+
+# Number of threads used to refresh subscriptions one id at a time
+REFRESH_WORKERS = 4
+
+# Initial and maximum delay between websocket reconnect attempts
+RECONNECT_BACKOFF_SECONDS = 1
+RECONNECT_BACKOFF_MAX_SECONDS = 60
+
+# modTs attribute of the MOs of an event
+MOD_TS = re.compile(r'"modTs"\s*:\s*"([^"]*)"')
+
+# Maximum number of classes filtered on modTs in one resync query
+RESYNC_CLASSES_PER_QUERY = 20
+
+# Actions of the Switch when a command of a cli_conf request fails
+CLI_CONF_STOP_ON_ERROR = 'stop-on-error'
+CLI_CONF_ROLLBACK_ON_ERROR = 'rollback-on-error'
+
 
 class Login(threading.Thread):
     """
@@ -93,11 +118,14 @@ class EventHandler(threading.Thread):
         while not self._exit:
             try:
                 event = self.subscriber._ws.recv()
-            except:
+            except Exception:
+                if not self._exit:
+                    logging.warning('Websocket connection lost')
+                    self.subscriber._reconnect()
                 break
             if not len(event):
                 continue
-            self.subscriber._event_q.put(event)
+            self.subscriber._queue_event(event)
 
 
 class Subscriber(threading.Thread):
@@ -111,11 +139,32 @@ class Subscriber(threading.Thread):
         threading.Thread.__init__(self)
         self._apic = apic
         self._subscriptions = {}
+        # Id each subscription had before it was last reissued
+        self._previous_ids = {}
         self._ws = None
         self._ws_url = None
         self._refresh_time = 45
+        # Fraction of the refresh interval used to spread refreshes out
+        self._refresh_jitter = 0.2
+        self._refresh_batch_size = REFRESH_BATCH_SIZE
+        self._refresh_workers = REFRESH_WORKERS
+        # None until the switch has been seen to accept or reject a
+        # refresh carrying several subscription ids
+        self._batch_refresh = None
+        self._reconnect_backoff = RECONNECT_BACKOFF_SECONDS
+        self._reconnect_backoff_max = RECONNECT_BACKOFF_MAX_SECONDS
+        # Newest modTs seen in any event, used to resync after a reconnect
+        self._last_mod_ts = None
+        self._gaps = []
+        # Classes of the MOs seen on each subscription, used to filter the
+        # mo and subtree queries of a resync on modTs
+        self._classes = {}
+        self._journal = None
         self._event_q = Queue()
         self._events = {}
+        # Serializes the threads moving the events of the queue to the
+        # events of each subscription and the updates of _last_mod_ts
+        self._event_lock = threading.Lock()
         self._exit = False
 
     def exit(self):
@@ -124,33 +173,222 @@ class Subscriber(threading.Thread):
         """
         self._exit = True
 
-    def _send_subscription(self, url):
+    def set_journal(self, journal):
+        """
+        Record every event received in a journal.
+
+        :param journal: EventJournal instance or None to stop recording
+        """
+        self._journal = journal
+
+    def _get_event_url(self, event):
+        """
+        Find the URL of the subscription an event belongs to.
+
+        :param event: dictionary containing the event
+        :returns: URL string or None if the subscription is unknown
+        """
+        for url in list(self._subscriptions.keys()):
+            for subscription_id in event['subscriptionId']:
+                if str(self._subscriptions[url]) == str(subscription_id):
+                    return url
+        # The events queued before a resubscription carry the previous id
+        for url, previous_id in list(self._previous_ids.items()):
+            for subscription_id in event['subscriptionId']:
+                if str(previous_id) == str(subscription_id):
+                    return url
+        return None
+
+    def _loads(self, text):
+        """
+        Decode JSON received from the Switch using the intern table of
+        the session if it has one.
+        """
+        intern_table = getattr(self._apic, 'intern_table', None)
+        if intern_table is None:
+            return json.loads(text)
+        return intern_table.loads(text)
+
+    def _queue_event(self, event, url=None):
+        """
+        Queue an event received from the Switch, recording it in the
+        journal if there is one.
+
+        :param event: String containing the event
+        :param url: URL string of the subscription if already known
+        """
+        journal = self._journal
+        if journal is not None:
+            if url is None:
+                url = self._get_event_url(json.loads(event))
+            try:
+                journal.append(self._apic.ipaddr, url, event)
+            except (IOError, OSError) as e:
+                logging.error('Could not record event in journal: %s', e)
+        mod_ts = MOD_TS.findall(event)
+        if mod_ts:
+            mod_ts = max(mod_ts)
+            with self._event_lock:
+                if self._last_mod_ts is None or mod_ts > self._last_mod_ts:
+                    self._last_mod_ts = mod_ts
+        self._event_q.put(event)
+
+    def _send_subscription(self, url, replay=True):
         """
         Send the subscription for the specified URL.
 
         :param url: URL string to issue the subscription
+        :param replay: Boolean indicating whether the MOs returned by the\
+                       subscription are queued as events.  Default is True.
         """
         resp = self._apic.get(url)
         resp_data = json.loads(resp.text)
         subscription_id = resp_data['subscriptionId']
+        if url in self._subscriptions:
+            self._previous_ids[url] = self._subscriptions[url]
         self._subscriptions[url] = subscription_id
-        while int(resp_data['totalCount']):
+        self._add_classes(url, resp_data['imdata'])
+        while replay and int(resp_data['totalCount']):
             event = {"totalCount": "1",
                      "subscriptionId": [resp_data['subscriptionId']],
                      "imdata": [resp_data["imdata"][0]]}
-            self._event_q.put(json.dumps(event))
+            self._queue_event(json.dumps(event), url)
             resp_data['totalCount'] = str(int(resp_data['totalCount']) - 1)
             resp_data["imdata"].remove(resp_data["imdata"][0])
         return resp
 
-    def refresh_subscriptions(self):
+    def _add_classes(self, url, mos):
         """
-        Refresh all of the subscriptions.
+        Record the classes of MOs received on a subscription.
+
+        :param url: URL string of the subscription
+        :param mos: list of MO dictionaries
         """
-        for subscription in self._subscriptions:
-            subscription_id = self._subscriptions[subscription]
-            refresh_url = '/api/subscriptionRefresh.json?id=' + str(subscription_id)
+        classes = set()
+        for mo in mos:
+            classes.update(mo)
+        if not classes:
+            return
+        with self._event_lock:
+            self._classes.setdefault(url, set()).update(classes)
+
+    def _send_refresh(self, subscription_ids):
+        """
+        Send a single subscription refresh request.
+
+        :param subscription_ids: list of subscription id strings
+        :returns: True if the switch accepted the refresh
+        """
+        refresh_url = ('/api/subscriptionRefresh.json?id=' +
+                       ','.join(subscription_ids))
+        try:
             resp = self._apic.get(refresh_url)
+        except (Timeout, ConnectionError):
+            logging.error('Could not refresh subscription(s) %s',
+                          subscription_ids)
+            return False
+        return resp.ok
+
+    def _refresh_batched(self, subscription_ids):
+        """
+        Refresh the subscriptions several ids per request.  The ids of a
+        rejected batch are refreshed individually afterwards.  While it is
+        not known whether the switch takes a list of ids, the first
+        rejected batch stops the batching and is returned as the probe
+        telling whether the list or one of its ids was rejected.
+
+        :param subscription_ids: list of subscription id strings
+        :returns: tuple of the list of subscription id strings that still\
+                  need to be refreshed individually and of the probe\
+                  batch, or None
+        """
+        batch_size = max(1, self._refresh_batch_size)
+        leftover = []
+        for index in range(0, len(subscription_ids), batch_size):
+            batch = subscription_ids[index:index + batch_size]
+            if self._send_refresh(batch):
+                self._batch_refresh = True
+                continue
+            if self._batch_refresh is None and len(batch) > 1:
+                return leftover + subscription_ids[index:], batch
+            logging.warning('Batched subscription refresh of %s rejected, '
+                            'refreshing the ids individually', batch)
+            leftover.extend(batch)
+        return leftover, None
+
+    def _refresh_concurrently(self, subscription_ids):
+        """
+        Refresh the subscriptions one id per request, using a small
+        pool of threads.
+
+        :param subscription_ids: list of subscription id strings
+        :returns: list of the subscription id strings whose refresh failed
+        """
+        work_q = Queue()
+        for subscription_id in subscription_ids:
+            work_q.put(subscription_id)
+        failed = []
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                try:
+                    subscription_id = work_q.get_nowait()
+                except Empty:
+                    return
+                if not self._send_refresh([subscription_id]):
+                    with lock:
+                        failed.append(subscription_id)
+
+        num_workers = min(max(1, self._refresh_workers),
+                          len(subscription_ids))
+        if num_workers == 1:
+            worker()
+        else:
+            workers = [threading.Thread(target=worker)
+                       for _ in range(num_workers)]
+            for thread in workers:
+                thread.daemon = True
+                thread.start()
+            for thread in workers:
+                thread.join()
+        if failed:
+            logging.error('Could not refresh subscription(s) %s', failed)
+        return failed
+
+    def refresh_subscriptions(self):
+        """
+        Refresh all of the subscriptions.  Several subscription ids are
+        sent in each refresh request when the switch accepts it,
+        otherwise the ids are refreshed concurrently.
+        """
+        subscription_ids = [str(subscription_id) for subscription_id
+                            in list(self._subscriptions.values())]
+        if not subscription_ids:
+            return
+        probe = None
+        if self._batch_refresh is not False and len(subscription_ids) > 1:
+            subscription_ids, probe = self._refresh_batched(subscription_ids)
+        if not subscription_ids:
+            return
+        failed = self._refresh_concurrently(subscription_ids)
+        if probe is not None and not set(probe) & set(failed):
+            # Every id of the rejected batch is refreshed on its own, so
+            # the switch does not take a list of ids
+            logging.debug('Batched subscription refresh rejected, '
+                          'falling back to single refreshes')
+            self._batch_refresh = False
+
+    def _get_refresh_interval(self):
+        """
+        Get the time to wait before the next refresh.  The interval is
+        shortened by a random amount so that the refreshes of many
+        sessions do not all fire at the same instant.
+
+        :returns: interval in seconds
+        """
+        jitter = self._refresh_time * self._refresh_jitter
+        return self._refresh_time - random.uniform(0, jitter)
 
     def _open_web_socket(self, use_secure=True):
         """
@@ -171,13 +409,151 @@ class Subscriber(threading.Thread):
         kwargs = {}
         if self._ws is not None:
             if self._ws.connected:
-                self._ws.close()
                 self.event_handler_thread.exit()
+                self._ws.close()
         self._ws = create_connection(self._ws_url, sslopt=sslopt, **kwargs)
         self.event_handler_thread = EventHandler(self)
         self.event_handler_thread.daemon = True
         self.event_handler_thread.start()
 
+    def _reconnect(self):
+        """
+        Reopen the web socket after the connection was lost, backing off
+        between attempts, and then resync the events missed in the gap.
+        Called by the EventHandler.  Not meant to be called directly by
+        end user applications.
+        """
+        gap_start = time.time()
+        use_secure = self._ws_url is None or self._ws_url.startswith('wss')
+        delay = self._reconnect_backoff
+        while not self._exit:
+            time.sleep(random.uniform(delay / 2.0, delay))
+            try:
+                self._open_web_socket(use_secure)
+            except Exception as e:
+                logging.warning('Websocket reconnect failed: %s', e)
+                delay = min(delay * 2, self._reconnect_backoff_max)
+                continue
+            break
+        if self._exit:
+            return
+        gap_end = time.time()
+        logging.warning('Websocket reconnected after %.1f seconds',
+                        gap_end - gap_start)
+        self._gaps.append((gap_start, gap_end, self._last_mod_ts))
+        self._resync()
+
+    def _resync(self):
+        """
+        Recover the events missed while the web socket was down.
+        The subscriptions are reissued on the new web socket without
+        replaying their initial MOs, then only the MOs with a modTs newer
+        than the last event seen are fetched and queued as events.  If no
+        event was ever seen, the subscriptions are replayed in full.
+
+        The MOs deleted during the gap are not returned by these queries,
+        so no deleted event is queued for them.  Applications keeping a
+        copy of the MOs, such as LocalMit, can check get_gaps and load
+        their copy again after a gap.
+        """
+        replay = self._last_mod_ts is None
+        for url in list(self._subscriptions.keys()):
+            try:
+                self._send_subscription(url, replay=replay)
+            except Exception as e:
+                logging.error('Could not resubscribe to %s: %s', url, e)
+        if replay:
+            return
+        for url in list(self._subscriptions.keys()):
+            for resync_url in self._get_resync_urls(url):
+                try:
+                    resp = self._apic.get(resync_url)
+                except (Timeout, ConnectionError):
+                    logging.error('Could not resync %s', url)
+                    continue
+                if not resp.ok:
+                    logging.error('Could not resync %s', url)
+                    continue
+                for mo in json.loads(resp.text)['imdata']:
+                    self._queue_resync_mo(url, mo)
+
+    def _queue_resync_mo(self, url, mo):
+        """
+        Queue an MO fetched by a resync as an event if it changed after
+        the last event seen.
+        """
+        for mo_class in mo:
+            attributes = mo[mo_class]['attributes']
+            if attributes.get('modTs', '') <= self._last_mod_ts:
+                continue
+            if not attributes.get('status'):
+                attributes['status'] = 'modified'
+            event = {"totalCount": "1",
+                     "subscriptionId": [self._subscriptions[url]],
+                     "imdata": [mo]}
+            self._queue_event(json.dumps(event), url)
+
+    def _get_resync_urls(self, url):
+        """
+        Get the URLs used to fetch the MOs of a subscription that changed
+        after the last event seen.  The query is filtered on the modTs of
+        the class of a class query, of the target-subtree-class classes
+        of an mo query, or else of the classes seen on the subscription.
+        The classes are split over several queries when there are many.
+        An mo query without any known class is fetched in full.
+
+        :param url: URL string of the subscription
+        :returns: list of URL strings without the subscription
+        """
+        path, _, query = url.partition('?')
+        params = [param for param in query.split('&')
+                  if param and param != 'subscription=yes']
+        query_filter = None
+        classes = []
+        for param in params:
+            name, _, value = param.partition('=')
+            if name == 'query-target-filter':
+                query_filter = value
+            elif name == 'target-subtree-class':
+                classes = value.split(',')
+        if path.startswith('/api/class/'):
+            classes = [path[len('/api/class/'):].split('.')[0]]
+        elif not classes:
+            with self._event_lock:
+                classes = sorted(self._classes.get(url, ()))
+        if not classes:
+            return [self._get_url(path, params)]
+        params = [param for param in params
+                  if not param.startswith('query-target-filter=')]
+        urls = []
+        for index in range(0, len(classes), RESYNC_CLASSES_PER_QUERY):
+            terms = ['gt(%s.modTs,"%s")' % (mo_class, self._last_mod_ts)
+                     for mo_class in
+                     classes[index:index + RESYNC_CLASSES_PER_QUERY]]
+            mod_ts_filter = terms[0]
+            if len(terms) > 1:
+                mod_ts_filter = 'or(%s)' % ','.join(terms)
+            if query_filter is not None:
+                mod_ts_filter = 'and(%s,%s)' % (query_filter, mod_ts_filter)
+            urls.append(self._get_url(
+                path, params + ['query-target-filter=' + mod_ts_filter]))
+        return urls
+
+    @staticmethod
+    def _get_url(path, params):
+        if not params:
+            return path
+        return path + '?' + '&'.join(params)
+
+    def get_gaps(self):
+        """
+        Get the periods during which the web socket was disconnected.
+        The MOs deleted during these periods were not seen by the resync.
+
+        :returns: list of (start time, end time, last modTs seen) tuples
+        """
+        return list(self._gaps)
+
     def _resubscribe(self):
         """
         Reissue the subscriptions.
@@ -189,6 +565,7 @@ class Subscriber(threading.Thread):
         urls = []
         for url in self._subscriptions:
             urls.append(url)
+        self._previous_ids.update(self._subscriptions)
         self._subscriptions = {}
         for url in urls:
             self.subscribe(url)
@@ -198,22 +575,22 @@ class Subscriber(threading.Thread):
         Put the event into correct bucket based on URLs that have been
         subscribed.
         """
-        if self._event_q.empty():
-            return
-
-        while not self._event_q.empty():
-            event = self._event_q.get()
-            event = json.loads(event)
-            # Find the URL for this event
-            url = None
-            for k in self._subscriptions:
-                for id in event['subscriptionId']:
-                    if self._subscriptions[k] == str(id):
-                        url = k
-                        break
-            if url not in self._events:
-                self._events[url] = []
-            self._events[url].append(event)
+        with self._event_lock:
+            while True:
+                try:
+                    event = self._event_q.get_nowait()
+                except Empty:
+                    return
+                event = self._loads(event)
+                # Find the URL for this event
+                url = self._get_event_url(event)
+                if url is not None:
+                    classes = self._classes.setdefault(url, set())
+                    for mo in event.get('imdata', ()):
+                        classes.update(mo)
+                if url not in self._events:
+                    self._events[url] = []
+                self._events[url].append(event)
 
     def subscribe(self, url):
         """
@@ -268,21 +645,155 @@ class Subscriber(threading.Thread):
         if url not in self._subscriptions:
             return
         del self._subscriptions[url]
+        with self._event_lock:
+            self._classes.pop(url, None)
         if not self._subscriptions:
+            self.event_handler_thread.exit()
             self._ws.close()
 
     def run(self):
         while not self._exit:
             # Sleep for some interval and send subscription list
-            time.sleep(self._refresh_time)
+            time.sleep(self._get_refresh_interval())
             self.refresh_subscriptions()
 
 
+class CliResult(object):
+    """
+    Result of a configuration command sent by Session.cli_conf
+    """
+    def __init__(self, command, code=None, msg=None, clierror=None,
+                 body=None):
+        """
+        :param command: String containing the command
+        :param code: String containing the NX-API code of the command,\
+                     None if the command was not run
+        :param msg: String containing the NX-API message of the command
+        :param clierror: String containing the CLI error of the command
+        :param body: output of the command
+        """
+        self.command = command
+        self.code = code
+        self.msg = msg
+        self.clierror = clierror
+        self.body = body
+
+    @property
+    def run(self):
+        """
+        True if the Switch ran the command
+        """
+        return self.code is not None
+
+    @property
+    def ok(self):
+        """
+        True if the command succeeded
+        """
+        return self.code == '200'
+
+    def __repr__(self):
+        if not self.run:
+            return '<CliResult %r not run>' % self.command
+        return '<CliResult %r %s %s>' % (self.command, self.code, self.msg)
+
+
+class CliConfResult(object):
+    """
+    Result of a batch of configuration commands sent by Session.cli_conf.
+    The results are in the order of the commands, so that a failure is
+    mapped to the line that caused it.
+    """
+    def __init__(self, response, results, rolled_back=False):
+        """
+        :param response: Response class instance from the requests library
+        :param results: list of CliResult instances
+        :param rolled_back: True if the Switch rolled back the commands\
+                            after a failure
+        """
+        self.response = response
+        self.results = results
+        self.rolled_back = rolled_back
+
+    @property
+    def ok(self):
+        """
+        True if every command succeeded
+        """
+        return all(result.ok for result in self.results)
+
+    @property
+    def errors(self):
+        """
+        List of the CliResult instances of the failed commands
+        """
+        return [result for result in self.results
+                if result.run and not result.ok]
+
+    @property
+    def not_run(self):
+        """
+        List of the CliResult instances of the commands not run
+        """
+        return [result for result in self.results if not result.run]
+
+    def __repr__(self):
+        return '<CliConfResult %s commands %s errors>' % (len(self.results),
+                                                          len(self.errors))
+
+
+def _get_cli_commands(commands):
+    """
+    Get the list of the commands of a string of lines or of a list
+    """
+    if isinstance(commands, str) or not hasattr(commands, '__iter__'):
+        commands = commands.splitlines()
+    return [command.strip() for command in commands if command.strip()]
+
+
+def _get_cli_conf_result(commands, resp, rolled_back):
+    """
+    Map the outputs of a cli_conf response to its commands.  The Switch
+    returns one output per command it ran, stopping at the first failure.
+
+    :returns: CliConfResult instance
+    """
+    try:
+        outputs = resp.json()['ins_api']['outputs']['output']
+    except (ValueError, KeyError, TypeError):
+        outputs = []
+    if isinstance(outputs, dict):
+        outputs = [outputs]
+    results = []
+    for index, command in enumerate(commands):
+        if index >= len(outputs):
+            results.append(CliResult(command))
+            continue
+        output = outputs[index]
+        results.append(CliResult(command, str(output.get('code')),
+                                 output.get('msg'), output.get('clierror'),
+                                 output.get('body')))
+    result = CliConfResult(resp, results)
+    # Nothing was rolled back if the Switch returned no output, such as
+    # when the request itself failed
+    result.rolled_back = rolled_back and any(
+        item.run and not item.ok for item in results)
+    return result
+
+
 class Session(object):
     """
        Session class
        This class is responsible for all communication with the Switch.
     """
+    # IdentityMap shared by the getters and the events, None when disabled
+    identity_map = None
+    # InternTable used to decode the JSON received, None when disabled
+    intern_table = None
+    # LruCache of the parents of the objects built from events, None when
+    # disabled
+    parent_cache = None
+
     def __init__(self, url, uid, pwd, verify_ssl=False,
                  subscription_enabled=True):
         """
@@ -309,6 +820,7 @@ class Session(object):
         self.session = None
         self.verify_ssl = verify_ssl
         self.token = None
+        self.parent_cache = LruCache(PARENT_CACHE_SIZE)
         self.login_thread = Login(self)
         self._subscription_enabled = subscription_enabled
         if subscription_enabled:
@@ -370,6 +882,45 @@ class Session(object):
             resp = self.subscription_thread.subscribe(url)
             return resp
 
+    def set_journal(self, journal):
+        """
+        Record the events received from the Switch in a journal.
+
+        :param journal: EventJournal instance or None to stop recording
+        """
+        if self._subscription_enabled:
+            self.subscription_thread.set_journal(journal)
+
+    def set_identity_map(self, identity_map):
+        """
+        Resolve every dn read through this session to a single object.
+        Repeated gets and events then update the existing objects in place.
+
+        :param identity_map: IdentityMap instance or None to disable it
+        """
+        self.identity_map = identity_map
+
+    def set_intern_table(self, intern_table):
+        """
+        Share the strings of the JSON received from the Switch through an
+        InternTable.  It is disabled by default: it saves memory on large
+        snapshots but makes the JSON slower to decode.  Enable it with
+        session.set_intern_table(InternTable()).
+
+        :param intern_table: InternTable instance or None to disable it
+        """
+        self.intern_table = intern_table
+
+    def set_parent_cache(self, parent_cache):
+        """
+        Reuse the parents of the objects built from the events of this
+        session.  Each session has its own cache of PARENT_CACHE_SIZE
+        parents by default.
+
+        :param parent_cache: LruCache instance or None to disable it
+        """
+        self.parent_cache = parent_cache
+
     def resubscribe(self):
         """
         Resubscribe to the current subscriptions.  Used by the login thread after a re-login
@@ -410,20 +961,32 @@ class Session(object):
         if self._subscription_enabled:
             self.subscription_thread.unsubscribe(url)
 
-    def push_to_switch(self, url, data):
+    def push_to_switch(self, url, data, chunked=False):
         """
         Push the object data to the Switch
 
         :param url: String containing the URL that will be used to\
                     send the object data to the Switch.
         :param data: Dictionary containing the JSON objects to be sent\
-                     to the Switch.
+                     to the Switch, or the nxtoolkit object whose JSON\
+                     is sent.  The JSON of an object is written by the\
+                     streaming serializer without building the JSON of\
+                     its whole tree.
+        :param chunked: Boolean to send the JSON as a chunked request\
+                        body while it is written instead of writing it\
+                        all first.
         :returns: Response class instance from the requests library.\
                   response.ok is True if request is sent successfully.
         """
         post_url = self.api + url
         logging.debug('Posting url: %s data: %s', post_url, data)
-        resp = self.session.post(post_url, data=json.dumps(data, sort_keys=True))
+        if chunked:
+            body = nxserializer.iter_json(data)
+        elif isinstance(data, (dict, list)):
+            body = json.dumps(data, sort_keys=True)
+        else:
+            body = nxserializer.dumps(data)
+        resp = self.session.post(post_url, data=body)
         logging.debug('Response: %s %s', resp, resp.text)
         return resp
 
@@ -442,6 +1005,9 @@ class Session(object):
         resp = self.session.get(get_url, verify=self.verify_ssl)
         logging.debug(resp)
         logging.debug(resp.text)
+        if self.intern_table is not None:
+            resp.json = functools.partial(
+                resp.json, object_pairs_hook=self.intern_table.object_pairs_hook)
         return resp
     
     def post_nxapi(self, command):
@@ -473,6 +1039,48 @@ class Session(object):
                                 auth=(self.uid, self.pwd), verify=self.verify_ssl)
         return ret
     
+    def cli_conf(self, commands, rollback_on_error=False):
+        """
+        Send configuration commands to the Nexus switch in a single NX-API
+        cli_conf request.  The Switch runs the commands in order and stops
+        at the first failure.
+
+        :param commands: list of strings, or string of lines, containing\
+                         the configuration commands
+        :param rollback_on_error: Boolean to have the Switch roll back the\
+                                  commands already run when a command fails
+        :returns: CliConfResult instance with the result of each command.\
+                  The commands after a failure are not run.
+        """
+        commands = _get_cli_commands(commands)
+        if rollback_on_error:
+            action = CLI_CONF_ROLLBACK_ON_ERROR
+        else:
+            action = CLI_CONF_STOP_ON_ERROR
+        payload = {
+            "ins_api": {
+                "version": "1.0",
+                "type": "cli_conf",
+                "chunk": "0",
+                "sid": "1",
+                "input": " ;".join(commands),
+                "output_format": "json",
+                "rollback": action
+            }
+        }
+        post_url = self.api + '/ins'
+        logging.debug('Posting url: %s commands: %s', post_url, commands)
+        headers = {'content-type': 'application/json'}
+        resp = self.session.post(post_url, data=json.dumps(payload),
+                                 headers=headers, auth=(self.uid, self.pwd),
+                                 verify=self.verify_ssl)
+        logging.debug('Response: %s %s', resp, resp.text)
+        result = _get_cli_conf_result(commands, resp, rollback_on_error)
+        for error in result.errors:
+            logging.error('Command %r failed: %s %s', error.command,
+                          error.msg, error.clierror or '')
+        return result
+
     def delete(self, url):
         """
         Perform a REST DELETE call to the Nexus switch.
@@ -0,0 +1,136 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the JsonTemplate class holding the precompiled
+     JSON layout of an nxtoolkit class, so that the JSON of its objects is
+     generated by filling their attribute values in.
+"""
+from operator import attrgetter
+
+
+class _ClassPlan(object):
+    """
+    Plan filling the JSON attributes of the objects of one class.  The
+    settings whose defaults are class attributes are copied from a
+    skeleton holding the defaults, and only the settings stored in the
+    object are filled in.  The other attributes are read from the object,
+    through a getter for the properties and the dotted paths.
+    """
+    __slots__ = ('skeleton', 'defaults', 'fields', 'computed')
+
+    def __init__(self, slots, toolkit_class):
+        """
+        :param slots: list of (switch_attribute, object_attribute, required)\
+                      tuples
+        :param toolkit_class: class of the objects
+        """
+        self.skeleton = {}
+        defaults = []
+        fields = []
+        computed = []
+        for switch_attribute, object_attribute, required in slots:
+            for base in toolkit_class.__mro__:
+                if object_attribute in base.__dict__:
+                    value = base.__dict__[object_attribute]
+                    break
+            else:
+                value = _MISSING
+            if '.' in object_attribute or hasattr(type(value), '__set__'):
+                computed.append((switch_attribute, required,
+                                 attrgetter(object_attribute)))
+            elif value is _MISSING or hasattr(type(value), '__get__'):
+                fields.append((object_attribute, switch_attribute, required))
+            else:
+                defaults.append((object_attribute, switch_attribute,
+                                 required))
+                if value or required:
+                    self.skeleton[switch_attribute] = value
+        self.defaults = tuple(defaults)
+        self.fields = tuple(fields)
+        self.computed = tuple(computed)
+
+
+# Marks the object attributes that have no class default
+_MISSING = object()
+
+
+class JsonTemplate(object):
+    """
+    Precompiled JSON layout of an nxtoolkit class.  The template is
+    declared once per class with the Switch attribute names and the object
+    attributes holding their values, and is compiled into a plan the first
+    time an object of each class is serialized.  The JSON attributes of an
+    object are then a copy of the skeleton of its class with the settings
+    of the object filled in, instead of testing and setting every
+    attribute by hand.
+    """
+    __slots__ = ('_slots', '_plans')
+
+    def __init__(self, slots):
+        """
+        :param slots: list of (switch_attribute, object_attribute, required)\
+                      tuples in the order of the JSON attributes.  The\
+                      object attribute may be a dotted path such as\
+                      'interface.if_name'.  The optional attributes are\
+                      left out of the JSON when their value is empty.
+        """
+        self._slots = tuple(slots)
+        self._plans = {}
+
+    def _get_plan(self, toolkit_class):
+        """
+        Get the plan of a class, compiling it the first time
+
+        :param toolkit_class: class of the objects
+        :returns: _ClassPlan instance
+        """
+        plan = self._plans.get(toolkit_class)
+        if plan is None:
+            plan = _ClassPlan(self._slots, toolkit_class)
+            self._plans[toolkit_class] = plan
+        return plan
+
+    def get_attributes(self, obj):
+        """
+        Get the JSON attributes of an object
+
+        :param obj: object of the class of the template
+        :returns: dictionary of the Switch attributes
+        """
+        plan = self._plans.get(obj.__class__) or self._get_plan(obj.__class__)
+        att = plan.skeleton.copy()
+        values = obj.__dict__
+        for name, key, required in plan.defaults:
+            if name in values:
+                value = values[name]
+                if value or required:
+                    att[key] = value
+                else:
+                    att.pop(key, None)
+        for name, key, required in plan.fields:
+            if name in values:
+                value = values[name]
+            else:
+                value = getattr(obj, name)
+            if value or required:
+                att[key] = value
+        for key, required, get_value in plan.computed:
+            value = get_value(obj)
+            if value or required:
+                att[key] = value
+        return att
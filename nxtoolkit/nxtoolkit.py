@@ -23,7 +23,19 @@ import sys
 from .nxTable import Table
 from .nxphysobject import *
 from .nxbaseobject import BaseNXObject, BaseRelation, BaseInterface
-from .nxsession import Session
+from .nxsession import Session, CliConfResult, CliResult
+from .nxjournal import EventJournal, ReplaySession
+from .nxmit import LocalMit, MitSession
+from .nxwatch import Watch
+from .nxcache import IdentityMap, InternTable, get_identity_map
+from .nxregistry import REGISTRY, decode
+from .nxattributes import LazyAttributes
+from .nxtemplate import JsonTemplate
+from .nxchangeset import ChangeSet, ChangeResult, VerifyResult
+from .nxscheduler import ConfigScheduler, PushResult
+from .nxrollout import Rollout, RolloutReport
+from .nxchunk import ChunkedPush, ChunkResult
+from .nxbackup import BackupStore, BackupManifest
 from .nxtoolkitlib import Credentials
 import logging
 import json
@@ -158,7 +170,6 @@ class L3Inst(BaseNXObject):
         super(L3Inst, self).__init__(l3inst_name, parent)
         self.name = l3inst_name
         self.adminState = 'admin-up'
-        self._children = []
 
     @classmethod
     def _get_switch_classes(cls):
@@ -1932,6 +1943,15 @@ class FilterEntry(BaseNXObject):
             return False
         return True
 
+    def _get_identity_key(self):
+        """
+        The attributes compared by __eq__ are filled in by
+        _populate_from_attributes after the entry is added to its parent,
+        so the entries share a single key and are only told apart by
+        __eq__.
+        """
+        return None
+
 
 class PortChannel(BaseInterface):
     """
@@ -1967,10 +1987,15 @@ class PortChannel(BaseInterface):
         if interfaces is None:
             self._interfaces = []
         else:
-            self._interfaces = copy.deepcopy(interfaces)
+            self._interfaces = list(interfaces)
 
         self._nodes = []
 
+    def _update(self, **settings):
+        """Update the settings of a PortChannel read again from the Switch"""
+        for name, value in settings.items():
+            setattr(self, name, value)
+
     def attach(self, interface):
         """Attach an interface to this PortChannel"""
         if interface not in self._interfaces:
@@ -2087,7 +2112,8 @@ class PortChannel(BaseInterface):
             query_url = '/api/class/pcAggrIf.json?rsp-subtree=full'
 
         pc_list = []
-        
+        identity_map = get_identity_map(session)
+
         port_chs = session.get(query_url).json()['imdata']
         for pc in port_chs:
             pc_id = str(pc['pcAggrIf']['attributes']['pcId'])
@@ -2114,15 +2140,39 @@ class PortChannel(BaseInterface):
                     #module = interface.replace('eth', '').split('/')[0]
                     #port = interface.replace('eth', '').split('/')[1]
                     #interfaces.append(Interface('eth', module, port))
-                    interfaces.append(Interface(interface))
-                    
-            new_pc = PortChannel(pc_id=pc_id, admin_st=admin_st,
-                                       layer=layer, descr=desc, duplex=duplex,
-                                       delay=delay, link_log=link_log,
-                                       mtu=mtu, snmp_trap=snmp_trap,
-                                       speed=speed, session=session, mode=mode,
-                                       min_link=min_link, interfaces=interfaces,
-                                       pc_mode=pc_mode)
+                    if identity_map is None:
+                        interfaces.append(Interface(interface))
+                        continue
+                    # Share the members with the Interface.get objects
+                    member_dn = 'sys/intf/phys-[%s]' % interface
+                    member = identity_map.get(member_dn, Interface)
+                    if member is None:
+                        member = Interface(interface, session=session,
+                                           attributes={'dist_name': member_dn})
+                        identity_map.add(member_dn, member)
+                    interfaces.append(member)
+
+            new_pc = None
+            pc_dn = str(pc['pcAggrIf']['attributes'].get('dn', ''))
+            if identity_map is not None and pc_dn:
+                new_pc = identity_map.get(pc_dn, PortChannel)
+            if new_pc is None:
+                new_pc = PortChannel(pc_id=pc_id, admin_st=admin_st,
+                                     layer=layer, descr=desc, duplex=duplex,
+                                     delay=delay, link_log=link_log,
+                                     mtu=mtu, snmp_trap=snmp_trap,
+                                     speed=speed, session=session, mode=mode,
+                                     min_link=min_link, interfaces=interfaces,
+                                     pc_mode=pc_mode)
+                if identity_map is not None and pc_dn:
+                    identity_map.add(pc_dn, new_pc)
+            else:
+                new_pc._update(admin_st=admin_st, layer=layer, descr=desc,
+                               duplex=duplex, delay=delay, link_log=link_log,
+                               mtu=mtu, snmp_trap=snmp_trap, speed=speed,
+                               mode=mode, min_link=min_link, pc_mode=pc_mode)
+                new_pc._session = session
+                new_pc._interfaces = interfaces
             new_pc.set_access_vlan(access_vlan)
    
             pc_list.append(new_pc)
@@ -3173,7 +3223,7 @@ class LinkNeighbors(BaseNXObject):
         if attributes is None:
             self.attributes = {}
         else:
-            self.attributes = copy.deepcopy(attributes)
+            self.attributes = dict(attributes)
         self.disc_proto = disc_proto
 
     @classmethod
@@ -3600,7 +3650,6 @@ class Logging(BaseNXObject):
         super(Logging, self).__init__(name="logging")
         self._session = session
         self._parent = parent
-        self._children = []
         # Base syslog object
         self.object  = 'syslogSyslog'
         
@@ -3776,6 +3825,12 @@ class SVI(BaseNXObject):
     """
     This class defines SVI
     """
+    _json_template = JsonTemplate([('id', 'id', True),
+                                   ('adminSt', 'admin_st', False),
+                                   ('descr', 'descr', False),
+                                   ('mtu', 'mtu', False),
+                                   ('bw', 'bw', False)])
+
     def __init__(self, vlan=None, admin_st=None, descr=None):
 
         if not vlan:
@@ -3814,17 +3869,7 @@ class SVI(BaseNXObject):
         return '/api/mo/sys/intf/svi-[%s].json'  % (vlan)
     
     def _get_attributes(self):
-        att = {}
-        att['id'] = self.id
-        if self.admin_st:
-            att['adminSt'] = self.admin_st
-        if self.descr:
-            att['descr'] = self.descr
-        if self.mtu:
-            att['mtu'] = self.mtu
-        if self.bw:
-            att['bw'] = self.bw
-        return att
+        return self._json_template.get_attributes(self)
     
     def get_json(self):
         return super(SVI, self).get_json(self.object,
@@ -3899,7 +3944,11 @@ class VrrpID(object):
     """
     This class defines VRRP ID
     """
-    
+    _json_template = JsonTemplate([('id', 'vrrp_id', False),
+                                   ('adminSt', 'admin_st', False),
+                                   ('priCfg', 'priority', False),
+                                   ('primary', '_primary_ip', False)])
+
     def __init__(self, vrrp_id=None, secondary_ip=None, session=None,
                  parent=None):
         if not vrrp_id:
@@ -3961,16 +4010,7 @@ class VrrpID(object):
         return self.interface
     
     def _get_attributes(self):
-        att = {}
-        if self.vrrp_id:
-            att['id'] = self.vrrp_id
-        if self.admin_st:
-            att['adminSt'] = self.admin_st
-        if self.priority:
-            att['priCfg'] = self.priority
-        if self._primary_ip:
-            att['primary'] = self._primary_ip
-        return att
+        return self._json_template.get_attributes(self)
     
     def _get_child_attributes(self):
         child = []
@@ -3989,7 +4029,10 @@ class Vrrp(BaseNXObject):
     """
     This defines the VRRP Interface 
     """
-    
+    _json_template = JsonTemplate([('id', 'interface.if_name', False),
+                                   ('adminSt', 'admin_st', False),
+                                   ('descr', 'descr', False)])
+
     def __init__(self, interface=None, session=None, parent=None,
                  vrrp_id=None):
         super(Vrrp, self).__init__(name="vrrp_interface")
@@ -4031,14 +4074,7 @@ class Vrrp(BaseNXObject):
             self.vrrp_ids.append(vrrp_id)
                
     def _get_attributes(self):
-        att = {}
-        if self.interface.if_name:
-            att['id'] = self.interface.if_name
-        if self.admin_st:
-            att['adminSt'] = self.admin_st
-        if self.descr:
-            att['descr'] = self.descr
-        return att
+        return self._json_template.get_attributes(self)
         
     def get_json(self):
         """
@@ -4203,6 +4239,10 @@ class IPV6Interface(BaseNXObject):
     """
     This class defines ipv6s of an interface. 
     """
+    _json_template = JsonTemplate([('adminSt', 'admin_st', False),
+                                   ('descr', 'descr', False),
+                                   ('id', 'if_name', True)])
+
     def __init__(self, if_name, session=None, parent=None):
         """
         :param if_name: String representing interface i.e. eth1/2
@@ -4240,13 +4280,7 @@ class IPV6Interface(BaseNXObject):
         return self._addresses
 
     def _get_attributes(self):
-        att = {}
-        if self.admin_st:
-            att['adminSt'] = self.admin_st
-        if self.descr:
-            att['descr'] = self.descr
-        att['id'] = self.if_name
-        return att
+        return self._json_template.get_attributes(self)
     
     def _get_json(self, class_obj, att=None):
         if not att:
@@ -5385,3 +5419,7 @@ class ICMP(BaseNXObject):
             
         return icmps
 
+
+
+# Populate the class registry once all of the toolkit classes are defined
+REGISTRY.register_subclasses(BaseNXObject)
@@ -0,0 +1,243 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""  This module contains the Watch class used by the show samples to keep
+     a table on the terminal current from event subscriptions.
+"""
+import logging
+import os
+import struct
+import sys
+import time
+
+# The terminal size can't be read on every platform
+try:
+    import fcntl
+    import termios
+except ImportError:
+    fcntl = None
+
+CLEAR_SCREEN = '\x1b[H\x1b[2J'
+MOVE_TO_LINE = '\x1b[%d;1H'
+CLEAR_LINE = '\x1b[2K'
+
+
+def get_terminal_height(out):
+    """
+    Get the number of lines of the terminal a file object writes to.
+
+    :param out: File object
+    :returns: integer or None if out is not a terminal
+    """
+    try:
+        if not out.isatty():
+            return None
+    except (AttributeError, ValueError):
+        return None
+    if fcntl is not None:
+        try:
+            data = fcntl.ioctl(out.fileno(), termios.TIOCGWINSZ, b'\0' * 4)
+            height = struct.unpack('hh', data)[0]
+            if height > 0:
+                return height
+        except (AttributeError, IOError, OSError, ValueError):
+            pass
+    try:
+        return int(os.environ['LINES'])
+    except (KeyError, ValueError):
+        return None
+
+
+class Watch(object):
+    """
+    Keeps a table of rows, keyed by dn, current on the terminal.  Rows are
+    updated by the handlers of the event subscriptions and of the periodic
+    polls, which are only needed for classes that do not send events such
+    as the stats.  Only the rows whose text changed are redrawn, and the
+    table is redrawn at most max_rate times per second.  The rows that don't
+    fit on the terminal are left out and counted on its last line.
+    """
+    def __init__(self, session, header=None, max_rate=2.0, out=None,
+                 height=None):
+        """
+        :param session: the instance of Session used for Switch communication
+        :param header: list of strings printed above the rows
+        :param max_rate: Maximum number of redraws per second.  Default is 2.
+        :param out: File object to draw on.  Default is sys.stdout.
+        :param height: Number of lines of the terminal.  Default is None\
+                       which reads it from the terminal before each redraw.
+        """
+        self._session = session
+        self._header = header or []
+        self._min_interval = 1.0 / max_rate
+        self._out = out or sys.stdout
+        self._height = height
+        self._drawn_height = None
+        self._rows = {}
+        self._order = []
+        self._dirty = set()
+        self._layout_changed = True
+        self._subscriptions = []
+        self._polls = []
+        self._last_draw = None
+        self.redraws = 0
+        self.rows_drawn = 0
+
+    def set_row(self, key, text):
+        """
+        Set the text of a row.  The row is only redrawn if the text changed.
+
+        :param key: String identifying the row, usually a dn
+        :param text: String containing the text of the row
+        """
+        if key not in self._rows:
+            self._layout_changed = True
+        elif self._rows[key] == text:
+            return
+        self._rows[key] = text
+        self._dirty.add(key)
+
+    def remove_row(self, key):
+        """
+        Remove a row from the table
+
+        :param key: String identifying the row
+        """
+        if key in self._rows:
+            del self._rows[key]
+            self._dirty.discard(key)
+            self._layout_changed = True
+
+    def has_row(self, key):
+        return key in self._rows
+
+    def subscribe(self, switch_class, handler):
+        """
+        Subscribe to the events of a Switch class.
+
+        :param switch_class: String containing the Switch class name
+        :param handler: function called as handler(switch_class, attributes)\
+                        for every MO received in an event
+        :returns: Response class instance from the requests library
+        """
+        url = '/api/class/%s.json?subscription=yes' % switch_class
+        resp = self._session.subscribe(url)
+        if resp is not None and not resp.ok:
+            logging.error('Could not subscribe to %s', switch_class)
+        self._subscriptions.append((url, handler))
+        return resp
+
+    def poll(self, interval, handler):
+        """
+        Call a function periodically, for data that does not send events.
+
+        :param interval: Number of seconds between calls
+        :param handler: function called without arguments
+        """
+        self._polls.append([interval, handler, time.time() + interval])
+
+    def process(self):
+        """
+        Dispatch the pending events and run the polls that are due.
+
+        :returns: number of events dispatched
+        """
+        count = 0
+        for url, handler in self._subscriptions:
+            while self._session.has_events(url):
+                event = self._session.get_event(url)
+                for mo in event['imdata']:
+                    for switch_class in mo:
+                        handler(switch_class, mo[switch_class]['attributes'])
+                count += 1
+        now = time.time()
+        for poll in self._polls:
+            if now >= poll[2]:
+                poll[1]()
+                poll[2] = now + poll[0]
+        return count
+
+    def draw(self, force=False):
+        """
+        Redraw the changed rows if the maximum redraw rate allows it.
+
+        :param force: Boolean to redraw regardless of the redraw rate
+        :returns: True if anything was drawn
+        """
+        now = time.time()
+        if not force and self._last_draw is not None and \
+                now - self._last_draw < self._min_interval:
+            return False
+        height = self._height or get_terminal_height(self._out)
+        if height != self._drawn_height:
+            # The terminal was resized
+            self._drawn_height = height
+            self._layout_changed = True
+        if not self._dirty and not self._layout_changed:
+            return False
+        output = []
+        if self._layout_changed:
+            self._order = sorted(self._rows)
+        shown = len(self._order)
+        if height is not None:
+            # Keep the last line for the count of the rows left out, so
+            # that the terminal never scrolls
+            shown = min(shown, max(height - len(self._header) - 1, 0))
+        first_line = len(self._header) + 1
+        if self._layout_changed:
+            output.append(CLEAR_SCREEN)
+            output.extend(line + '\n' for line in self._header)
+            output.extend(self._rows[key] + '\n'
+                          for key in self._order[:shown])
+            if shown < len(self._order):
+                output.append('... %d more rows' % (len(self._order) - shown))
+            self.rows_drawn += shown
+        else:
+            for index, key in enumerate(self._order[:shown]):
+                if key in self._dirty:
+                    output.append(MOVE_TO_LINE % (first_line + index))
+                    output.append(CLEAR_LINE + self._rows[key])
+                    self.rows_drawn += 1
+            output.append(MOVE_TO_LINE % (first_line + shown))
+        self._out.write(''.join(output))
+        self._out.flush()
+        self._dirty = set()
+        self._layout_changed = False
+        self._last_draw = now
+        self.redraws += 1
+        return True
+
+    def run(self, duration=None, idle_time=0.1):
+        """
+        Keep the table current until interrupted.
+
+        :param duration: Number of seconds to run.  Default is None which\
+                         runs until Ctrl-C is pressed.
+        :param idle_time: Number of seconds to sleep when there is nothing\
+                          to do.  Default is 0.1.
+        """
+        end = None if duration is None else time.time() + duration
+        self.draw(force=True)
+        try:
+            while end is None or time.time() < end:
+                self.process()
+                if not self.draw():
+                    time.sleep(idle_time)
+        except KeyboardInterrupt:
+            pass
+        self.draw(force=True)
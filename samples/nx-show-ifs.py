@@ -24,7 +24,60 @@ fabric.
 """
 import sys
 from nxtoolkit.nxtoolkit import (Session, Credentials,
-                                 Interface, ExternalSwitch)
+                                 Interface, ExternalSwitch, Watch)
+
+
+def watch_interfaces(args, session):
+    """
+    Keep a table of the Interfaces current from events until Ctrl-C is
+    pressed.  Only the rows of the Interfaces that changed are redrawn.
+
+    :param args: command line arguments
+    :param session: Session to use when accessing the Switch
+    :return: None
+    """
+    template = "{0:12} {1:8} {2:8} {3:8} {4:8}"
+    header = [template.format("Interface", "Admin", "Oper", "Speed", "MTU"),
+              template.format("---------", "-----", "----", "-----", "---")]
+    watch = Watch(session, header, max_rate=args.rate)
+    states = {}
+
+    def render(dn):
+        state = states[dn]
+        watch.set_row(dn, template.format(*[str(state.get(key)) for key in
+                                            ('id', 'adminSt', 'operSt',
+                                             'speed', 'mtu')]))
+
+    def on_event(switch_class, attributes):
+        # ethpmPhysIf is the phys child of the l1PhysIf
+        dn = attributes['dn']
+        if switch_class == 'ethpmPhysIf':
+            dn = dn[:-len('/phys')]
+        if attributes.get('status') == 'deleted':
+            if switch_class == 'l1PhysIf':
+                states.pop(dn, None)
+                watch.remove_row(dn)
+            return
+        if dn not in states:
+            if switch_class != 'l1PhysIf':
+                return
+            states[dn] = {}
+        states[dn].update((key, attributes[key]) for key in
+                          ('id', 'adminSt', 'operSt', 'speed', 'mtu')
+                          if key in attributes)
+        render(dn)
+
+    watch.subscribe('l1PhysIf', on_event)
+    watch.subscribe('ethpmPhysIf', on_event)
+    for interface in Interface.get(session):
+        dn = interface.attributes['dist_name']
+        states[dn] = {'id': interface.if_name,
+                      'adminSt': interface.get_admin_status(),
+                      'operSt': interface.operSt,
+                      'speed': interface.get_speed(),
+                      'mtu': interface.get_mtu()}
+        render(dn)
+    watch.run()
 
 
 def main():
@@ -39,6 +92,11 @@ def main():
                     'displays all of the physical nodes; both belonging'
                     ' to and connected to the fabric.')
     creds = Credentials('switch', description)
+    creds.add_argument('-w', '--watch', action='store_true',
+                       help='''Keep a table of the Interfaces current until
+                       Ctrl-C is pressed''')
+    creds.add_argument('--rate', type=float, default=2.0,
+                       help='Maximum screen refreshes per second in watch mode')
     args = creds.get()
 
     # Login to Switch
@@ -48,6 +106,10 @@ def main():
         print('%% Could not login to Switch')
         sys.exit(0)
 
+    if args.watch:
+        watch_interfaces(args, session)
+        return
+
     # List of classes to get and print
     phy_classes = (Interface, ExternalSwitch)
 
@@ -60,6 +60,64 @@ def show_stats_short(args, interfaces):
             print(template.format(interface.name, interface.operSt, *rec))
 
 
+def watch_stats_short(args, session, interfaces):
+    """
+    watch stats short routine.  The interface status is kept current from
+    events and the stats, which do not send events, are polled for all the
+    interfaces with a single query every interval.
+
+    :param args: command line arguments
+    :param session: Session to use when accessing the Switch
+    :param interfaces: list of interfaces
+    :return: None
+    """
+    template = "{0:16} {1:16} {2:16} {3:16} {4:16} {5:16}"
+    header = [template.format("   INTERFACE  ", "Status", "RX PKTs/Sec",
+                              "TX PKTs/Sec", "RX BYTES/Sec", "TX BYTES/Sec"),
+              template.format("--------------", "------------ ",
+                              "------------ ", "---------------",
+                              "---------------", "---------------")]
+    template = "{0:16} {1:16} {2:16,.2f} {3:16,.2f} {4:16,.2f} {5:16,.2f}"
+    watch = NX.Watch(session, header, max_rate=args.rate)
+    by_dn = dict((interface.attributes['dist_name'], interface)
+                 for interface in interfaces)
+    oper_st = dict((dn, by_dn[dn].operSt) for dn in by_dn)
+    stats = {}
+
+    def render(dn):
+        rec = [stats.get(dn, {}).get(counter_family, {}).get(count_name, 0)
+               for (counter_family, count_name) in [('rmonIfIn', 'octetRate'),
+                                                    ('rmonIfOut', 'octetRate'),
+                                                    ('rmonIfIn', 'packetRate'),
+                                                    ('rmonIfOut', 'packetRate')]]
+        if args.nonzero and not any(rec):
+            watch.remove_row(dn)
+        else:
+            watch.set_row(dn, template.format(by_dn[dn].name,
+                                              str(oper_st[dn]), *rec))
+
+    def on_event(switch_class, attributes):
+        # ethpmPhysIf is the phys child of the l1PhysIf
+        dn = attributes['dn']
+        if dn.endswith('/phys'):
+            dn = dn[:-len('/phys')]
+        if dn not in by_dn:
+            return
+        if 'operSt' in attributes:
+            oper_st[dn] = attributes['operSt']
+        render(dn)
+
+    def poll_stats():
+        stats.update(NX.InterfaceStats.get_all_by_dn(session))
+        for dn in by_dn:
+            render(dn)
+
+    watch.subscribe('ethpmPhysIf', on_event)
+    poll_stats()
+    watch.poll(args.interval, poll_stats)
+    watch.run()
+
+
 def show_stats_long(args, interfaces):
     """
     show stats long routine
@@ -97,7 +155,17 @@ def main():
     creds.add_argument('-n', '--nonzero', action='store_true',
                        help='''Show only interfaces where the counters are not zero.
                         - only available if interface is NOT specified''')
+    creds.add_argument('-w', '--watch', action='store_true',
+                       help='''Keep the display current until Ctrl-C is
+                       pressed - not available with full statistics''')
+    creds.add_argument('--interval', type=float, default=10.0,
+                       help='Seconds between stats refreshes in watch mode')
+    creds.add_argument('--rate', type=float, default=2.0,
+                       help='Maximum screen refreshes per second in watch mode')
     args = creds.get()
+    if args.watch and args.full:
+        print('%% Watch mode is not available with full statistics')
+        sys.exit(1)
 
     # Login to switch
     session = NX.Session(args.url, args.login, args.password)
@@ -119,7 +187,9 @@ def main():
     else:
         interfaces = NX.Interface.get(session)
 
-    if not args.full or not args.interface:
+    if args.watch:
+        watch_stats_short(args, session, interfaces)
+    elif not args.full or not args.interface:
         show_stats_short(args, interfaces)
     else:
         show_stats_long(args, interfaces)
@@ -24,6 +24,65 @@ import sys
 import nxtoolkit.nxtoolkit as NX
 import time
 
+
+def watch_port_channels(args, session, template, header, port_channels):
+    """
+    Keep the table of port channels current from events until Ctrl-C is
+    pressed.  Membership changes are seen as pcRsMbrIfs events.
+
+    :param args: command line arguments
+    :param session: Session to use when accessing the Switch
+    :param template: format string of a row
+    :param header: list of header lines
+    :param port_channels: list of PortChannel
+    :return: None
+    """
+    watch = NX.Watch(session, header, max_rate=args.rate)
+    states = {}
+
+    def render(dn):
+        state = states[dn]
+        watch.set_row(dn, template.format(state['pcId'], 'po' + state['pcId'],
+                                          state['layer'], state['pcMode'],
+                                          sorted(state['members'])))
+
+    def on_member_event(switch_class, attributes):
+        # sys/intf/aggr-[po10]/rsmbrIfs-[sys/intf/phys-[eth1/1]]
+        pc_dn, member_dn = attributes['dn'].split('/rsmbrIfs-[', 1)
+        if pc_dn not in states:
+            return
+        member = member_dn.split('phys-[')[-1].rstrip(']')
+        if attributes.get('status') == 'deleted':
+            states[pc_dn]['members'].discard(member)
+        else:
+            states[pc_dn]['members'].add(member)
+        render(pc_dn)
+
+    def on_pc_event(switch_class, attributes):
+        dn = attributes['dn']
+        if attributes.get('status') == 'deleted':
+            states.pop(dn, None)
+            watch.remove_row(dn)
+            return
+        state = states.setdefault(dn, {'pcId': '', 'layer': '',
+                                       'pcMode': '', 'members': set()})
+        state.update((key, str(attributes[key])) for key in
+                     ('pcId', 'layer', 'pcMode') if key in attributes)
+        if state['pcId']:
+            render(dn)
+
+    watch.subscribe('pcAggrIf', on_pc_event)
+    watch.subscribe('pcRsMbrIfs', on_member_event)
+    for pc in port_channels:
+        dn = 'sys/intf/aggr-[%s]' % pc.if_name
+        states[dn] = {'pcId': pc.pc_id, 'layer': pc.layer,
+                      'pcMode': pc.pc_mode,
+                      'members': set(str(iface.if_name)
+                                     for iface in pc._interfaces)}
+        render(dn)
+    watch.run()
+
+
 def main():
     """
     Main execution routine
@@ -35,6 +94,11 @@ def main():
     description = '''Simple application that logs on to the Switch
                 and show port channels'''
     creds = NX.Credentials('switch', description)
+    creds.add_argument('-w', '--watch', action='store_true',
+                       help='''Keep the display current until Ctrl-C is
+                       pressed''')
+    creds.add_argument('--rate', type=float, default=2.0,
+                       help='Maximum screen refreshes per second in watch mode')
     args = creds.get()
 
     # Login to Switch
@@ -47,10 +111,15 @@ def main():
     pc_list = []
     port_channels = NX.PortChannel.get(session)
     template = "{0:16} {1:15} {2:16} {3:16} {4:16}"
-    print(template.format(" Group   ", " Port channel ", " Layer ",
-                          "Port channel Mode", " Members "))
-    print(template.format("---------", " ------------ ", " ----- ",
-                          "-----------------", " --------"))
+    header = [template.format(" Group   ", " Port channel ", " Layer ",
+                              "Port channel Mode", " Members "),
+              template.format("---------", " ------------ ", " ----- ",
+                              "-----------------", " --------")]
+    if args.watch:
+        watch_port_channels(args, session, template, header, port_channels)
+        return
+    for line in header:
+        print(line)
     for pc in port_channels:
         pc_list.append((pc.pc_id, pc.name, pc.layer, pc.pc_mode,
                         [str(iface.if_name) for iface in pc._interfaces]))
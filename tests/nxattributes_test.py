@@ -0,0 +1,97 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxattributes.py Test module
+"""
+from nxtoolkit.nxattributes import LazyAttribute, LazyAttributes
+import unittest
+
+
+class TestLazyAttributes(unittest.TestCase):
+    """
+    Test the LazyAttributes class
+    """
+    def get_attributes(self, reads):
+        """
+        Get a view computing 'speed' and 'admin' and recording the reads
+        """
+        def read(key):
+            def compute(mo_attributes):
+                reads.append(key)
+                return mo_attributes[key].upper()
+            return compute
+
+        fields = {'speed': read('speed'), 'admin': read('adminSt')}
+        return LazyAttributes({'speed': '10g', 'adminSt': 'up'}, fields)
+
+    def test_computed_once(self):
+        """
+        Test that a value is only computed when and the first time it is read
+        """
+        reads = []
+        attributes = self.get_attributes(reads)
+        self.assertEqual(reads, [])
+        self.assertEqual(attributes['speed'], '10G')
+        self.assertEqual(attributes.get('speed'), '10G')
+        self.assertEqual(reads, ['speed'])
+        self.assertRaises(KeyError, attributes.__getitem__, 'mtu')
+        self.assertIsNone(attributes.get('mtu'))
+
+    def test_dictionary(self):
+        """
+        Test that the view behaves as the dictionary of its values
+        """
+        attributes = self.get_attributes([])
+        attributes['mtu'] = '1500'
+        attributes['speed'] = '40G'
+        self.assertEqual(attributes, {'speed': '40G', 'admin': 'UP',
+                                      'mtu': '1500'})
+        self.assertEqual(dict(attributes), attributes.copy())
+        self.assertEqual(len(attributes), 3)
+        del attributes['admin']
+        self.assertNotIn('admin', attributes)
+        self.assertEqual(sorted(attributes.keys()), ['mtu', 'speed'])
+        self.assertEqual(attributes.pop('mtu'), '1500')
+        attributes.update({'admin': 'down'})
+        self.assertEqual(attributes.copy(), {'speed': '40G', 'admin': 'down'})
+
+    def test_lazy_attribute(self):
+        """
+        Test that a LazyAttribute reads its value once from the attributes
+        """
+        class Port(object):
+            speed = LazyAttribute('speed')
+            name = LazyAttribute('name', lambda self: 'port ' + self.speed)
+
+            def __init__(self, attributes):
+                self.attributes = attributes
+
+        reads = []
+        port = Port(self.get_attributes(reads))
+        self.assertEqual(port.name, 'port 10G')
+        self.assertEqual(port.speed, '10G')
+        self.assertEqual(reads, ['speed'])
+        self.assertFalse(hasattr(port, 'mtu'))
+        self.assertRaises(AttributeError, getattr, Port({}), 'speed')
+
+
+if __name__ == '__main__':
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestLazyAttributes))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,172 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxbackup.py Test module
+"""
+from nxtoolkit.nxbackup import BACKUP_URL, BackupStore
+import copy
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+
+def get_config(switch_id, interfaces=48):
+    """
+    Get the configuration of a Switch with its own hostname
+    """
+    physifs = [{'l1PhysIf': {'attributes': {
+        'dn': 'sys/intf/phys-[eth1/%d]' % port, 'id': 'eth1/%d' % port,
+        'adminSt': 'up', 'layer': 'Layer2', 'mode': 'trunk',
+        'descr': 'server port %d' % port, 'mtu': '9216'}}}
+        for port in range(1, interfaces + 1)]
+    bds = [{'l2BD': {'attributes': {
+        'dn': 'sys/bd/bd-[vlan-%d]' % vlan, 'fabEncap': 'vlan-%d' % vlan,
+        'name': 'vlan-%d' % vlan, 'adminSt': 'active'}}}
+        for vlan in range(100, 150)]
+    return {'topSystem': {'attributes': {'dn': 'sys',
+                                         'name': 'switch%s' % switch_id},
+                          'children': [
+        {'interfaceEntity': {'attributes': {'dn': 'sys/intf'},
+                             'children': physifs}},
+        {'bdEntity': {'attributes': {'dn': 'sys/bd'}, 'children': bds}}]}}
+
+
+class FakeResponse(object):
+    def __init__(self, ok, imdata=None):
+        self.ok = ok
+        self._imdata = imdata
+
+    def json(self):
+        return {'imdata': self._imdata}
+
+
+class FakeSession(object):
+    def __init__(self, ipaddr, config):
+        self.ipaddr = ipaddr
+        self.config = config
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+        return FakeResponse(self.config is not None, [self.config])
+
+
+class TestBackupStore(unittest.TestCase):
+    """
+    Test the BackupStore class
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = BackupStore(self.directory, min_chunk_size=256)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_restore(self):
+        """
+        Test that a backup is restored as it was taken
+        """
+        config = get_config(1)
+        manifest = self.store.add('10.0.0.1', copy.deepcopy(config),
+                                  name='first')
+        self.assertTrue(len(manifest.chunks) > 1)
+        self.assertEqual(manifest.new_chunks, len(manifest.chunks))
+        self.assertEqual(self.store.restore('10.0.0.1', 'first'), config)
+        self.assertEqual(self.store.restore('10.0.0.1'), config)
+        self.assertEqual(self.store.restore('10.0.0.1', 'missing'), None)
+        self.assertEqual(self.store.restore('10.0.0.2'), None)
+
+    def test_dedup(self):
+        """
+        Test that the chunks shared by switches and by backups are stored
+        once
+        """
+        first = self.store.add('10.0.0.1', get_config(1), name='first')
+        again = self.store.add('10.0.0.1', get_config(1), name='again')
+        self.assertEqual(again.new_chunks, 0)
+        self.assertEqual(again.chunks, first.chunks)
+        config = get_config(2)
+        physif = config['topSystem']['children'][0]['interfaceEntity'][
+            'children'][5]['l1PhysIf']['attributes']
+        physif['adminSt'] = 'down'
+        other = self.store.add('10.0.0.2', copy.deepcopy(config))
+        # The root with the hostname, the interfaceEntity and the group of
+        # children holding the changed interface
+        self.assertEqual(other.new_chunks, 3)
+        self.assertTrue(other.new_bytes < first.new_bytes / 4)
+        self.assertEqual(self.store.restore('10.0.0.2'), config)
+        self.assertEqual(self.store.get_switches(), ['10.0.0.1', '10.0.0.2'])
+
+    def test_backup(self):
+        """
+        Test the backups read from the Switch
+        """
+        session = FakeSession('10.0.0.3', get_config(3))
+        self.store.backup(session, name='a')
+        manifest = self.store.backup(session, name='b')
+        self.assertEqual(session.urls, [BACKUP_URL, BACKUP_URL])
+        self.assertEqual(self.store.get_backups('10.0.0.3'), ['a', 'b'])
+        self.assertEqual(self.store.get_manifest('10.0.0.3').name, 'b')
+        self.assertEqual(manifest.switch, '10.0.0.3')
+        self.assertEqual(self.store.backup(FakeSession('10.0.0.4', None)),
+                         None)
+
+    def test_collect_garbage(self):
+        """
+        Test that only the chunks no backup uses are removed
+        """
+        first = self.store.add('10.0.0.1', get_config(1), name='first')
+        second = self.store.add('10.0.0.1', get_config(1, interfaces=40),
+                                name='second')
+        self.assertEqual(self.store.collect_garbage(), 0)
+        self.store.delete('10.0.0.1', 'first')
+        self.assertEqual(self.store.collect_garbage(),
+                         len(set(first.chunks) - set(second.chunks)))
+        self.assertEqual(self.store.restore('10.0.0.1'),
+                         get_config(1, interfaces=40))
+
+
+    def test_concurrent_add(self):
+        """
+        Test that backups of the same configuration added at the same time
+        store each chunk once and leave no temporary file
+        """
+        threads = [threading.Thread(target=self.store.add,
+                                    args=('10.0.0.1', get_config(1)),
+                                    kwargs={'name': 'backup%d' % index})
+                   for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for index in range(4):
+            self.assertEqual(self.store.restore('10.0.0.1',
+                                                'backup%d' % index),
+                             get_config(1))
+        for directory, _, file_names in os.walk(self.directory):
+            self.assertEqual([name for name in file_names
+                              if name.endswith('.tmp')], [])
+
+
+if __name__ == '__main__':
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestBackupStore))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,348 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxcache.py Test module
+"""
+from nxtoolkit.nxtoolkit import (BaseNXObject, IdentityMap, L2BD, PortChannel,
+                                 Session)
+from nxtoolkit.nxcache import InternTable, LruCache, PARENT_CACHE_SIZE
+from nxtoolkit.nxsession import Subscriber
+import json
+from nxtoolkit.nxphysobject import Interface
+import unittest
+
+
+def get_mo(mo_class, dn, **attributes):
+    """
+    Build an MO as returned by the switch
+    """
+    attributes['dn'] = dn
+    attributes.setdefault('status', '')
+    return {mo_class: {'attributes': attributes}}
+
+
+def get_phys_if(if_name, admin_st='up'):
+    """
+    Build an l1PhysIf MO
+    """
+    return get_mo('l1PhysIf', 'sys/intf/phys-[%s]' % if_name, id=if_name,
+                  portT='leaf', adminSt=admin_st, speed='10G', mtu='1500',
+                  monPolDn='', name='', descr='', usage='discovery',
+                  layer='Layer2')
+
+
+class FakeResponse(object):
+    """
+    Response returned by the FakeSession
+    """
+    def __init__(self, data):
+        self.ok = True
+        self._data = {'imdata': data}
+
+    def json(self):
+        return self._data
+
+
+class FakeSession(Session):
+    """
+    Session answering the class queries from a list of MOs
+    """
+    def __init__(self, mos):
+        self.mos = mos
+        self.events = []
+        self.parent_cache = LruCache(PARENT_CACHE_SIZE)
+
+    def get(self, url):
+        switch_class = url.split('/class/')[-1].split('.json')[0]
+        if 'target-subtree-class' in url:
+            return FakeResponse([])
+        return FakeResponse([mo for mo in self.mos
+                             if list(mo.keys())[0] == switch_class])
+
+    def has_events(self, url):
+        return len(self.events) > 0
+
+    def get_event(self, url):
+        return self.events.pop(0)
+
+
+class Vrf(BaseNXObject):
+    """
+    Minimal object receiving the l3Inst events
+    """
+    @classmethod
+    def _get_switch_classes(cls):
+        return ['l3Inst']
+
+    @staticmethod
+    def _get_parent_class():
+        return None
+
+    @staticmethod
+    def _get_parent_dn(dn):
+        return dn.split('/inst-')[0]
+
+    @staticmethod
+    def _get_name_from_dn(dn):
+        return dn.split('/inst-')[1]
+
+    def _populate_from_attributes(self, attributes):
+        self.descr = attributes.get('descr')
+
+
+class Route(BaseNXObject):
+    """
+    Minimal object receiving the ipv4Route events of a Vrf
+    """
+    @classmethod
+    def _get_switch_classes(cls):
+        return ['ipv4Route']
+
+    @staticmethod
+    def _get_parent_class():
+        return Vrf
+
+    @staticmethod
+    def _get_parent_dn(dn):
+        return dn.split('/rt-')[0]
+
+    @staticmethod
+    def _get_name_from_dn(dn):
+        return dn.split('/rt-[')[1].split(']')[0]
+
+    def _populate_from_attributes(self, attributes):
+        pass
+
+
+def get_port_channel():
+    """
+    Build a pcAggrIf MO with eth1/1 as member
+    """
+    mo = get_mo('pcAggrIf', 'sys/intf/aggr-[po10]', pcId='10',
+                layer='Layer2', adminSt='up', descr='', duplex='auto',
+                linkLog='default', mtu='1500', snmpTrapSt='enable',
+                speed='auto', mode='access', minLinks='1', pcMode='active',
+                accessVlan='vlan-1', trunkVlans='1-4094')
+    member = get_mo('pcRsMbrIfs',
+                    'sys/intf/aggr-[po10]/rsmbrIfs-[sys/intf/phys-[eth1/1]]',
+                    tSKey='eth1/1', tDn='sys/intf/phys-[eth1/1]')
+    mo['pcAggrIf']['children'] = [member]
+    return mo
+
+
+class TestIdentityMap(unittest.TestCase):
+    """
+    Test the IdentityMap class
+    """
+    def _get_session(self, identity_map=None):
+        session = FakeSession([get_phys_if('eth1/1'), get_phys_if('eth1/2'),
+                               get_port_channel()])
+        session.set_identity_map(identity_map)
+        return session
+
+    def test_map(self):
+        """
+        Test adding, getting and removing objects
+        """
+        identity_map = IdentityMap()
+        intf = Interface('eth1/1')
+        identity_map.add('sys/intf/phys-[eth1/1]', intf)
+        self.assertTrue(identity_map.get('sys/intf/phys-[eth1/1]') is intf)
+        self.assertEqual(identity_map.get('sys/intf/phys-[eth1/1]', L2BD),
+                         None)
+        self.assertEqual((identity_map.hits, identity_map.misses), (1, 1))
+        identity_map.remove('sys/intf/phys-[eth1/1]')
+        self.assertFalse('sys/intf/phys-[eth1/1]' in identity_map)
+        identity_map.add('sys/intf/phys-[eth1/2]', Interface('eth1/2'))
+        self.assertEqual(len(identity_map), 0)
+
+    def test_disabled(self):
+        """
+        Test that every get builds new objects without an identity map
+        """
+        session = self._get_session()
+        first = Interface.get(session)
+        second = Interface.get(session)
+        self.assertEqual(first, second)
+        self.assertFalse(first[0] is second[0])
+
+    def test_repeated_gets(self):
+        """
+        Test that repeated gets update the same objects in place
+        """
+        identity_map = IdentityMap()
+        session = self._get_session(identity_map)
+        interfaces = Interface.get(session)
+        session.mos[0] = get_phys_if('eth1/1', admin_st='down')
+        again = Interface.get(session)
+        self.assertTrue(all(old is new
+                            for old, new in zip(interfaces, again)))
+        self.assertEqual(interfaces[0].adminstatus, 'down')
+        self.assertEqual(len(identity_map), 2)
+
+    def test_port_channel_members(self):
+        """
+        Test that the port channel members are the Interface.get objects
+        """
+        session = self._get_session(IdentityMap())
+        interfaces = Interface.get(session)
+        port_channels = PortChannel.get(session)
+        self.assertTrue(port_channels[0]._interfaces[0] is interfaces[0])
+        self.assertTrue(PortChannel.get(session)[0] is port_channels[0])
+
+    def test_events(self):
+        """
+        Test that events update the mapped object and drop deleted ones
+        """
+        identity_map = IdentityMap()
+        session = self._get_session(identity_map)
+        dn = 'sys/inst-red'
+        session.events.append({'imdata': [get_mo('l3Inst', dn, name='red',
+                                                 status='created')]})
+        vrf = Vrf.get_event(session)
+        self.assertTrue(identity_map.get(dn) is vrf)
+        session.events.append({'imdata': [get_mo('l3Inst', dn, name='red',
+                                                 descr='blue',
+                                                 status='modified')]})
+        self.assertTrue(Vrf.get_event(session) is vrf)
+        self.assertEqual(vrf.descr, 'blue')
+        session.events.append({'imdata': [get_mo('l3Inst', dn,
+                                                 status='deleted')]})
+        self.assertTrue(Vrf.get_event(session) is vrf)
+        self.assertTrue(vrf.is_deleted())
+        self.assertFalse(dn in identity_map)
+
+class TestLruCache(unittest.TestCase):
+    """
+    Test the LruCache class
+    """
+    def test_eviction(self):
+        """
+        Test that the least recently used item is dropped
+        """
+        cache = LruCache(2)
+        cache.add('a', 1)
+        cache.add('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.add('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertFalse('b' in cache)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_event_parents(self):
+        """
+        Test that the objects built from events share their parents,
+        which don't keep them as children
+        """
+        session = FakeSession([])
+        for prefix in ('10.0.0.0/8', '10.1.0.0/16'):
+            session.events.append({'imdata': [get_mo(
+                'ipv4Route', 'sys/inst-red/rt-[%s]' % prefix,
+                status='modified')]})
+        first = Route.get_event(session)
+        second = Route.get_event(session)
+        self.assertEqual(second.name, '10.1.0.0/16')
+        self.assertTrue(first.get_parent() is second.get_parent())
+        self.assertEqual(first.get_parent().name, 'red')
+        self.assertEqual(first.get_parent().get_children(), [])
+
+    def test_event_parents_per_session(self):
+        """
+        Test that the sessions do not share the parents of their events
+        """
+        sessions = [FakeSession([]), FakeSession([])]
+        for session, prefix in zip(sessions, ('10.0.0.0/8', '10.1.0.0/16')):
+            session.events.append({'imdata': [get_mo(
+                'ipv4Route', 'sys/inst-red/rt-[%s]' % prefix,
+                status='modified')]})
+        first = Route.get_event(sessions[0])
+        second = Route.get_event(sessions[1])
+        self.assertFalse(first.get_parent() is second.get_parent())
+        self.assertTrue(sessions[0].parent_cache.get(
+            (Vrf, 'sys/inst-red')) is first.get_parent())
+        self.assertTrue(sessions[1].parent_cache.get(
+            (Vrf, 'sys/inst-red')) is second.get_parent())
+
+
+class TestInternTable(unittest.TestCase):
+    """
+    Test the InternTable class
+    """
+    def _get_text(self):
+        return json.dumps({'imdata': [
+            get_phys_if('eth1/1'), get_phys_if('eth1/2', admin_st='down'),
+            get_phys_if('eth1/3')]})
+
+    def test_shared_strings(self):
+        """
+        Test that the decoded MOs share their strings
+        """
+        data = InternTable().loads(self._get_text())
+        self.assertEqual(data, json.loads(self._get_text()))
+        first = data['imdata'][0]['l1PhysIf']['attributes']
+        third = data['imdata'][2]['l1PhysIf']['attributes']
+        self.assertTrue(first['adminSt'] is third['adminSt'])
+        self.assertTrue(list(first.keys())[0] in third)
+        self.assertTrue(isinstance(first['adminSt'], str))
+        self.assertTrue(isinstance(first['dn'], str))
+
+    def test_bounded(self):
+        """
+        Test that the table is emptied when it is full
+        """
+        intern_table = InternTable(max_size=8, max_length=4)
+        intern_table.loads(self._get_text())
+        self.assertTrue(len(intern_table) <= 8)
+        data = intern_table.loads(json.dumps({'name': 'a long name'}))
+        self.assertEqual(data, {'name': 'a long name'})
+
+    def test_subscriber(self):
+        """
+        Test that the events are decoded with the table of the session
+        """
+        class FakeApic(object):
+            intern_table = InternTable()
+
+        subscriber = Subscriber(FakeApic())
+        event = subscriber._loads(json.dumps({'imdata': [
+            get_phys_if('eth1/1')]}))
+        self.assertTrue('l1PhysIf' in FakeApic.intern_table._strings)
+        self.assertEqual(event['imdata'][0]['l1PhysIf']['attributes']['id'],
+                         'eth1/1')
+
+    def test_disabled_by_default(self):
+        """
+        Test that the sessions only intern the strings when enabled
+        """
+        session = FakeSession([])
+        self.assertTrue(session.intern_table is None)
+        intern_table = InternTable()
+        session.set_intern_table(intern_table)
+        self.assertTrue(session.intern_table is intern_table)
+        self.assertTrue(FakeSession([]).intern_table is None)
+
+
+if __name__ == '__main__':
+
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestIdentityMap))
+    offline.addTest(unittest.makeSuite(TestLruCache))
+    offline.addTest(unittest.makeSuite(TestInternTable))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,363 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxchangeset.py Test module
+"""
+from nxtoolkit.nxchangeset import ChangeSet, _diff
+from nxtoolkit.nxtoolkit import (ConfigBDs, ConfigVrrps, Dhcp, Interface,
+                                 L2BD, SVI, Vrrp, VrrpID)
+import json
+import unittest
+
+
+class FakeResponse(object):
+    def __init__(self, ok, imdata=None):
+        self.ok = ok
+        self._imdata = imdata
+
+    def json(self):
+        return {'imdata': self._imdata}
+
+
+class FakeSession(object):
+    """
+    Records the pushes and fails the pushes of the failing URLs.  The
+    queries return the MOs of the configuration starting with their URL.
+    """
+    def __init__(self, failing_urls=(), config=None):
+        self.pushes = []
+        self.queries = []
+        self.failing_urls = failing_urls
+        self.config = config or {}
+
+    def push_to_switch(self, url, data, chunked=False):
+        self.pushes.append((url, data))
+        return FakeResponse(url not in self.failing_urls)
+
+    def get(self, url):
+        self.queries.append(url)
+        for prefix, imdata in self.config.items():
+            if url.startswith(prefix):
+                return FakeResponse(True, imdata)
+        return FakeResponse(True, [])
+
+
+class TestChangeSet(unittest.TestCase):
+    """
+    Test the ChangeSet class
+    """
+    def get_objects(self):
+        """
+        Get a VLAN, an SVI, a VRRP and a DHCP change
+        """
+        bds = ConfigBDs()
+        bds.add_l2bds(L2BD('vlan-10'))
+        svi = SVI('vlan10', admin_st='up')
+        vrrp = Vrrp(Interface('eth2/1'))
+        vrrp.add_vrrp_id(VrrpID('50'))
+        dhcp = Dhcp()
+        dhcp.set_v4relay_st('yes')
+        return [bds, svi, vrrp, dhcp]
+
+    def test_merge(self):
+        """
+        Test that the objects are merged into one body rooted at sys
+        """
+        bds, svi, vrrp, dhcp = self.get_objects()
+        requests = ChangeSet([bds, svi, vrrp, dhcp]).get_requests()
+        self.assertEqual(len(requests), 1)
+        url, data, objs = requests[0]
+        self.assertEqual(url, '/api/mo/sys.json')
+        self.assertEqual(objs, [bds, svi, vrrp, dhcp])
+        children = data['topSystem']['children']
+        self.assertEqual(children[0], bds.get_json())
+        intf, vrrp_entity, dhcp_entity = children[1:]
+        self.assertEqual(intf['interfaceEntity']['children'],
+                         [svi.get_json()])
+        vrrp_inst = vrrp_entity['vrrpEntity']['children'][0]['vrrpInst']
+        self.assertEqual(vrrp_inst['children'], [vrrp.get_json()])
+        dhcp_inst = dhcp_entity['dhcpEntity']['children'][0]
+        self.assertEqual(dhcp_inst, dhcp.get_json())
+
+    def test_common_ancestor(self):
+        """
+        Test that the body is rooted at the deepest common container and
+        that the objects with the same dn are merged
+        """
+        svis = [SVI('vlan%d' % index) for index in range(1, 4)]
+        svis[1].set_mtu('9216')
+        same = SVI('vlan2', admin_st='down')
+        requests = ChangeSet(svis + [same]).get_requests()
+        self.assertEqual(len(requests), 1)
+        url, data, objs = requests[0]
+        self.assertEqual(url, '/api/mo/sys/intf.json')
+        children = data['interfaceEntity']['children']
+        self.assertEqual(len(children), 3)
+        self.assertEqual(children[1]['sviIf']['attributes'],
+                         {'id': 'vlan2', 'mtu': '9216', 'adminSt': 'down'})
+
+    def test_single_object(self):
+        """
+        Test that a single object is pushed to its own URL
+        """
+        svi = SVI('vlan10')
+        requests = ChangeSet([svi]).get_requests()
+        self.assertEqual(requests, [(svi.get_url(), svi.get_json(), [svi])])
+
+    def test_not_mergeable(self):
+        """
+        Test that the objects outside of the known containers are pushed
+        with their own URL
+        """
+        bd = L2BD('vlan-10')
+        svi = SVI('vlan10')
+        requests = ChangeSet([bd, svi]).get_requests()
+        self.assertEqual(requests[0], (bd.get_url(), bd.get_json(), [bd]))
+        self.assertEqual(requests[1][2], [svi])
+
+    def test_max_size(self):
+        """
+        Test that the objects are split into bodies below the size limit
+        """
+        svis = [SVI('vlan%d' % index) for index in range(100, 200)]
+        size = len(json.dumps(svis[0].get_json()))
+        requests = ChangeSet(svis, max_size=size * 30).get_requests()
+        self.assertEqual(sum(len(objs) for _, _, objs in requests), 100)
+        self.assertEqual(len(requests), 4)
+        for url, data, _ in requests:
+            self.assertEqual(url, '/api/mo/sys/intf.json')
+            self.assertTrue(len(json.dumps(data)) <= size * 30)
+        requests = ChangeSet(svis[:2], max_size=size).get_requests()
+        self.assertEqual([objs for _, _, objs in requests],
+                         [[svis[0]], [svis[1]]])
+
+    def test_push(self):
+        """
+        Test that each object gets the result of its request
+        """
+        objs = self.get_objects()
+        session = FakeSession()
+        results = ChangeSet(objs).push(session)
+        self.assertEqual(len(session.pushes), 1)
+        self.assertEqual([result.obj for result in results], objs)
+        self.assertTrue(all(result.ok for result in results))
+
+    def test_retry(self):
+        """
+        Test that the objects of a failed request are pushed one by one
+        """
+        bds, svi, vrrp, dhcp = self.get_objects()
+        session = FakeSession(['/api/mo/sys.json', svi.get_url()])
+        results = ChangeSet([bds, svi, vrrp, dhcp]).push(session)
+        self.assertEqual(len(session.pushes), 5)
+        self.assertEqual([result.ok for result in results],
+                         [True, False, True, True])
+        self.assertEqual(results[1].url, svi.get_url())
+        results = ChangeSet([bds, svi]).push(session, retry=False)
+        self.assertEqual([result.ok for result in results], [False, False])
+
+
+class TestReconcile(unittest.TestCase):
+    """
+    Test pushing a ChangeSet in reconcile mode
+    """
+    @staticmethod
+    def get_config(interfaces):
+        """
+        Get the configuration of the Switch holding the interfaces
+        """
+        imdata = []
+        for interface in interfaces:
+            mo = interface.get_json()['l1PhysIf']
+            attributes = dict(mo['attributes'])
+            attributes['dn'] = interface._get_path()
+            attributes['usage'] = 'discovery'
+            imdata.append({'l1PhysIf': {'attributes': attributes}})
+        return {'/api/mo/sys/intf.json?query-target=children'
+                '&target-subtree-class=l1PhysIf': imdata}
+
+    def get_interfaces(self):
+        interfaces = [Interface('eth1/%d' % port) for port in range(1, 5)]
+        for interface in interfaces:
+            interface.set_layer('Layer2')
+        return interfaces
+
+    def test_unchanged(self):
+        """
+        Test that nothing is pushed when the Switch has the configuration
+        """
+        interfaces = self.get_interfaces()
+        session = FakeSession(config=self.get_config(interfaces))
+        results = ChangeSet(interfaces).push(session, reconcile=True)
+        self.assertEqual(len(session.queries), 1)
+        self.assertEqual(session.pushes, [])
+        self.assertTrue(all(result.ok and result.response is None
+                            for result in results))
+
+    def test_changed(self):
+        """
+        Test that only the changed attributes and the new objects are
+        pushed
+        """
+        interfaces = self.get_interfaces()
+        config = self.get_config(interfaces)
+        interfaces[2].set_mtu('9216')
+        svi = SVI('vlan10', admin_st='up')
+        session = FakeSession(config=config)
+        results = ChangeSet(interfaces + [svi]).push(session, reconcile=True)
+        self.assertEqual(len(session.queries), 2)
+        self.assertEqual(len(session.pushes), 1)
+        url, data = session.pushes[0]
+        self.assertEqual(url, '/api/mo/sys/intf.json')
+        self.assertEqual(data['interfaceEntity']['children'], [
+            {'l1PhysIf': {'attributes': {'id': 'eth1/3', 'mtu': '9216'},
+                          'children': []}},
+            svi.get_json()])
+        self.assertEqual([result.response is None for result in results],
+                         [True, True, False, True, False])
+
+    def test_children(self):
+        """
+        Test the difference of the children of an MO
+        """
+        desired = {'vrrpInterface': {'attributes': {'id': 'eth2/1'},
+                                     'children': [
+            {'vrrpId': {'attributes': {'id': '50', 'primary': '10.0.0.1'}}},
+            {'vrrpId': {'attributes': {'id': '60', 'status': 'deleted'}}},
+            {'vrrpId': {'attributes': {'id': '70', 'status': 'deleted'}}},
+            {'vrrpId': {'attributes': {'id': '80'}}}]}}
+        current = {'attributes': {'id': 'eth2/1', 'adminSt': 'up'},
+                   'children': [
+            {'vrrpId': {'attributes': {'id': '50', 'primary': '10.0.0.1'}}},
+            {'vrrpId': {'attributes': {'id': '60'}}},
+            {'vrrpId': {'attributes': {'id': '90'}}}]}
+        self.assertEqual(_diff(desired, current), {'vrrpInterface': {
+            'attributes': {'id': 'eth2/1'},
+            'children': [desired['vrrpInterface']['children'][1],
+                         desired['vrrpInterface']['children'][3]]}})
+        self.assertEqual(_diff(desired, {'attributes': {'id': 'eth2/1'},
+                                         'children': current['children'][:1]}),
+                         {'vrrpInterface': {
+                             'attributes': {'id': 'eth2/1'},
+                             'children': [
+                                 desired['vrrpInterface']['children'][3]]}})
+
+
+class TestVerify(unittest.TestCase):
+    """
+    Test reading back the MOs pushed by a ChangeSet
+    """
+    @staticmethod
+    def get_mo(obj_class, attributes, dn):
+        attributes = dict(attributes)
+        attributes['dn'] = dn
+        return {obj_class: {'attributes': attributes, 'children': []}}
+
+    def get_interfaces(self):
+        interfaces = [Interface('eth1/%d' % port) for port in range(1, 5)]
+        for interface in interfaces:
+            interface.set_layer('Layer2')
+        return interfaces
+
+    def get_config(self, interfaces):
+        return {'/api/class/l1PhysIf.json': [
+            self.get_mo('l1PhysIf',
+                        interface.get_json()['l1PhysIf']['attributes'],
+                        interface._get_path())
+            for interface in interfaces]}
+
+    def test_by_dn(self):
+        """
+        Test that the MOs are read by dn with a single query
+        """
+        interfaces = self.get_interfaces()
+        session = FakeSession(config=self.get_config(interfaces))
+        interfaces[1].set_mtu('9216')
+        results = ChangeSet(interfaces).verify(session)
+        self.assertEqual(session.queries, [
+            '/api/class/l1PhysIf.json?query-target-filter=or('
+            'eq(l1PhysIf.dn,"sys/intf/phys-[eth1/1]"),'
+            'eq(l1PhysIf.dn,"sys/intf/phys-[eth1/2]"),'
+            'eq(l1PhysIf.dn,"sys/intf/phys-[eth1/3]"),'
+            'eq(l1PhysIf.dn,"sys/intf/phys-[eth1/4]"))'
+            '&rsp-subtree=full&rsp-prop-include=config-only'])
+        self.assertEqual([result.ok for result in results],
+                         [True, False, True, True])
+        self.assertEqual(results[1].differences, [
+            {'l1PhysIf': {'attributes': {'id': 'eth1/2', 'mtu': '9216'},
+                          'children': []}}])
+
+    def test_chunks(self):
+        """
+        Test that the MOs are read in chunks and that the MOs missing from
+        the Switch are reported
+        """
+        interfaces = self.get_interfaces()
+        session = FakeSession(config=self.get_config(interfaces[:3]))
+        results = ChangeSet(interfaces).verify(session, chunk_size=3)
+        self.assertEqual(len(session.queries), 2)
+        self.assertEqual([result.ok for result in results],
+                         [True, True, True, False])
+        self.assertEqual(results[3].differences, [interfaces[3].get_json()])
+
+    def test_posted(self):
+        """
+        Test that the MOs posted to a container are read by their naming
+        attribute and that the deleted MOs must be missing
+        """
+        bds = ConfigBDs()
+        bds.add_l2bds(L2BD('vlan-10'))
+        deleted = L2BD('vlan-20')
+        deleted.mark_as_deleted()
+        bds.add_l2bds(deleted)
+        vrrp = Vrrp(Interface('eth2/1'))
+        vrrp.add_vrrp_id(VrrpID('50'))
+        bd = bds.get_json()['bdEntity']['children'][0]['l2BD']
+        vrrp_dn = 'sys/vrrp/inst/if-[eth2/1]'
+        config = {
+            '/api/mo/sys/bd.json': [self.get_mo(
+                'l2BD', bd['attributes'], 'sys/bd/bd-[vlan-10]')],
+            '/api/mo/sys/vrrp/inst.json': [self.get_mo(
+                'vrrpInterface', {'id': 'eth2/1'}, vrrp_dn)]}
+        session = FakeSession(config=config)
+        results = ChangeSet([bds, vrrp, L2BD('vlan-30')]).verify(session)
+        self.assertEqual(sorted(session.queries), [
+            '/api/mo/sys/bd.json?query-target=children'
+            '&target-subtree-class=l2BD&rsp-subtree=full'
+            '&rsp-prop-include=config-only'
+            '&query-target-filter=or(eq(l2BD.id,"10"),eq(l2BD.id,"20"))',
+            '/api/mo/sys/vrrp/inst.json?query-target=children'
+            '&target-subtree-class=vrrpInterface&rsp-subtree=full'
+            '&rsp-prop-include=config-only'
+            '&query-target-filter=eq(vrrpInterface.id,"eth2/1")'])
+        self.assertTrue(results[0].ok)
+        self.assertFalse(results[1].ok)
+        self.assertEqual(results[1].differences, [{'vrrpInterface': {
+            'attributes': {'id': 'eth2/1'},
+            'children': [{'vrrpId': {'attributes': {'id': '50'},
+                                     'children': []}}]}}])
+        self.assertFalse(results[2].verified)
+
+
+if __name__ == '__main__':
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestChangeSet))
+    offline.addTest(unittest.makeSuite(TestReconcile))
+    offline.addTest(unittest.makeSuite(TestVerify))
+
+    unittest.main(defaultTest='offline')
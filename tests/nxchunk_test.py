@@ -0,0 +1,131 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxchunk.py Test module
+"""
+from nxtoolkit.nxchunk import ChunkedPush
+from nxtoolkit.nxtoolkit import ConfigBDs, L2BD
+import json
+import threading
+import unittest
+
+
+class FakeResponse(object):
+    def __init__(self, ok):
+        self.ok = ok
+
+
+class FakeSession(object):
+    """
+    Records the pushes and fails the pushes of the failing chunks, given
+    by the name of their first L2BD
+    """
+    def __init__(self, failing=()):
+        self.pushes = []
+        self.failing = set(failing)
+        self.lock = threading.Lock()
+
+    def push_to_switch(self, url, data, chunked=False):
+        children = data['bdEntity']['children']
+        first = children[0]['l2BD']['attributes']['name']
+        with self.lock:
+            self.pushes.append((url, data))
+        return FakeResponse(first not in self.failing)
+
+
+class TestChunkedPush(unittest.TestCase):
+    """
+    Test the ChunkedPush class
+    """
+    @staticmethod
+    def get_bds(count):
+        bds = ConfigBDs()
+        for vlan in range(100, 100 + count):
+            bds.add_l2bds(L2BD('vlan-%d' % vlan))
+        return bds
+
+    def test_count(self):
+        """
+        Test that the chunks hold at most max_count children in order
+        """
+        bds = self.get_bds(25)
+        chunks = ChunkedPush(bds, max_count=10).get_chunks()
+        self.assertEqual([len(chunk.get_children()) for chunk in chunks],
+                         [10, 10, 5])
+        children = [child for chunk in chunks
+                    for child in chunk.get_children()]
+        self.assertEqual(children, list(bds.get_children()))
+        self.assertEqual(chunks[0].get_url(), bds.get_url())
+        self.assertEqual(len(bds.get_children()), 25)
+
+    def test_size(self):
+        """
+        Test that the chunks are smaller than max_size
+        """
+        bds = self.get_bds(25)
+        size = len(json.dumps(bds.get_json()))
+        chunks = ChunkedPush(bds, max_size=size // 4).get_chunks()
+        self.assertTrue(len(chunks) >= 4)
+        for chunk in chunks:
+            self.assertTrue(len(json.dumps(chunk.get_json())) <= size // 4)
+        self.assertEqual(len(ChunkedPush(bds, max_size=10).get_chunks()), 25)
+
+    def test_run(self):
+        """
+        Test that every chunk is pushed once
+        """
+        bulk = ChunkedPush(self.get_bds(25), max_count=5, max_concurrency=3)
+        session = FakeSession()
+        results = bulk.run(session)
+        self.assertEqual(len(session.pushes), 5)
+        self.assertEqual([result.index for result in results],
+                         list(range(5)))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertTrue(bulk.done)
+        self.assertEqual(bulk.run(session), [])
+        self.assertEqual(len(session.pushes), 5)
+
+    def test_resume(self):
+        """
+        Test that a failed run stops and that the next run pushes the
+        chunks not pushed yet
+        """
+        bulk = ChunkedPush(self.get_bds(25), max_count=5, max_concurrency=1)
+        session = FakeSession(failing=['vlan-110'])
+        results = bulk.run(session)
+        self.assertEqual([result.ok for result in results],
+                         [True, True, False])
+        self.assertFalse(bulk.done)
+        self.assertEqual(bulk.next_chunk, 2)
+        session.failing.clear()
+        results = bulk.run(session)
+        self.assertEqual([result.index for result in results], [2, 3, 4])
+        self.assertTrue(bulk.done)
+        resumed = ChunkedPush(self.get_bds(25), max_count=5,
+                              completed=[0, 1, 2])
+        self.assertEqual(resumed.next_chunk, 3)
+        session = FakeSession()
+        resumed.run(session)
+        self.assertEqual(len(session.pushes), 2)
+
+
+if __name__ == '__main__':
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestChunkedPush))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,101 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxdn.py Test module
+"""
+from nxtoolkit.nxtoolkit import Interface
+from nxtoolkit.nxcounters import InterfaceStats
+from nxtoolkit.nxdn import Dn
+import copy
+import unittest
+
+
+class TestDn(unittest.TestCase):
+    """
+    Test the Dn class
+    """
+    def test_interned(self):
+        """
+        Test that equal dns are the same object and behave as strings
+        """
+        dn = Dn('sys/intf/phys-[eth1/1]')
+        self.assertTrue(Dn('sys/intf/phys-[eth1/1]') is dn)
+        self.assertTrue(Dn(dn) is dn)
+        self.assertTrue(Dn(u'sys/intf/phys-[eth1/1]') is dn)
+        self.assertEqual(dn, 'sys/intf/phys-[eth1/1]')
+        self.assertEqual({'sys/intf/phys-[eth1/1]': 1}[dn], 1)
+        self.assertTrue(copy.deepcopy(dn) is dn)
+
+    def test_rns(self):
+        """
+        Test splitting a dn with brackets into rns
+        """
+        dn = Dn('sys/intf/aggr-[po10]/rsmbrIfs-[sys/intf/phys-[eth1/1]]')
+        self.assertEqual(dn.rns, ('sys', 'intf', 'aggr-[po10]',
+                                  'rsmbrIfs-[sys/intf/phys-[eth1/1]]'))
+        self.assertEqual(dn.rn, 'rsmbrIfs-[sys/intf/phys-[eth1/1]]')
+        self.assertEqual(dn.parent, 'sys/intf/aggr-[po10]')
+        self.assertTrue(isinstance(dn.parent, Dn))
+        self.assertEqual(Dn('sys').parent, '')
+        self.assertEqual(Dn('').rns, ())
+        self.assertEqual(dn.get_value('rsmbrIfs-'), 'sys/intf/phys-[eth1/1]')
+        self.assertEqual(dn.get_value('bogus-'), None)
+
+    def test_prefix_of(self):
+        """
+        Test checking that an object is below a dn
+        """
+        dn = Dn('sys/intf/phys-[eth1/1]')
+        self.assertTrue(dn.prefix_of('sys/intf/phys-[eth1/1]'))
+        self.assertTrue(dn.prefix_of('sys/intf/phys-[eth1/1]/phys'))
+        self.assertFalse(dn.prefix_of('sys/intf/phys-[eth1/10]'))
+        self.assertTrue(Dn('sys').prefix_of(dn))
+
+    def test_accessors(self):
+        """
+        Test the pod, node, slot and interface accessors
+        """
+        dn = Dn('topology/pod-1/node-103/sys/phys-[eth1/12]')
+        self.assertEqual((dn.pod, dn.node), ('1', '103'))
+        self.assertEqual(dn.interface, ('eth', '1', '12'))
+        self.assertEqual((dn.interface_type, dn.module, dn.port),
+                         ('eth', '1', '12'))
+        self.assertEqual(Dn('sys/ch/lcslot-2/lc').slot, '2')
+        self.assertEqual(Dn('sys/intf/phys-[eth1/1/2]/phys').interface,
+                         ('eth', '1', '1/2'))
+        self.assertEqual(Dn('sys/intf').interface, None)
+        self.assertEqual(Dn('sys/intf').port, None)
+
+    def test_parsers(self):
+        """
+        Test the toolkit parsers using the Dn class
+        """
+        self.assertEqual(Interface.parse_dn('sys/intf/phys-[eth1/5]'),
+                         ('eth', '1', '5'))
+        self.assertEqual(Interface.parse_dn('sys/phys-[eth2/7]'),
+                         ('eth', '2', '7'))
+        self.assertEqual(InterfaceStats._parseDn2PortId(
+            'topology/pod-1/node-103/sys/phys-[eth1/12]'), '1/103/1/12')
+
+
+if __name__ == '__main__':
+
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestDn))
+
+    unittest.main(defaultTest='offline')
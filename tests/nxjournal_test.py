@@ -0,0 +1,165 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxjournal.py Test module
+"""
+from nxtoolkit.nxjournal import EventJournal, ReplaySession
+from nxtoolkit.nxsession import Subscriber
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+SWITCH = '1.2.3.4'
+URL = '/api/class/l1PhysIf.json?subscription=yes'
+
+
+def get_event(index):
+    """
+    Build an event as sent by the Switch
+    """
+    dn = 'sys/intf/phys-[eth1/%s]' % index
+    mo = {'l1PhysIf': {'attributes': {'dn': dn, 'status': 'modified'}}}
+    return json.dumps({'totalCount': '1', 'subscriptionId': ['1'],
+                       'imdata': [mo]})
+
+
+class TestEventJournal(unittest.TestCase):
+    """
+    Test the EventJournal class
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _get_journal(self):
+        return EventJournal(self.directory, max_segment_bytes=512,
+                            index_interval=3)
+
+    def test_append_read(self):
+        """
+        Test reading back the events from every offset
+        """
+        journal = self._get_journal()
+        for index in range(50):
+            self.assertEqual(journal.append(SWITCH, URL, get_event(index),
+                                            timestamp=index), index)
+        self.assertTrue(len([name for name in
+                             os.listdir(os.path.join(self.directory, SWITCH))
+                             if name.endswith('.seg')]) > 1)
+        self.assertEqual(journal.get_offsets(SWITCH), (0, 50))
+        for offset in (0, 1, 2, 3, 17, 49):
+            records = list(journal.read(SWITCH, offset))
+            self.assertEqual(len(records), 50 - offset)
+            self.assertEqual(records[0],
+                             (offset, offset, URL, get_event(offset)))
+        self.assertEqual(list(journal.read(SWITCH, 50)), [])
+
+    def test_reopen(self):
+        """
+        Test that a reopened journal continues at the next offset
+        """
+        journal = self._get_journal()
+        for index in range(10):
+            journal.append(SWITCH, URL, get_event(index))
+        journal.close()
+        journal = self._get_journal()
+        self.assertEqual(journal.get_offsets(SWITCH), (0, 10))
+        self.assertEqual(journal.append(SWITCH, URL, get_event(10)), 10)
+        self.assertEqual([record[0] for record in journal.read(SWITCH, 8)],
+                         [8, 9, 10])
+        self.assertEqual(journal.get_switches(), [SWITCH])
+
+    def test_commit(self):
+        """
+        Test the consumer offsets
+        """
+        journal = self._get_journal()
+        self.assertEqual(journal.get_committed(SWITCH, 'collector'), 0)
+        journal.commit(SWITCH, 'collector', 42)
+        journal = self._get_journal()
+        self.assertEqual(journal.get_committed(SWITCH, 'collector'), 42)
+
+    def test_subscriber_journal(self):
+        """
+        Test that the Subscriber records the events it queues
+        """
+        class FakeApic(object):
+            ipaddr = SWITCH
+
+        journal = self._get_journal()
+        subscriber = Subscriber(FakeApic())
+        subscriber._subscriptions[URL] = '1'
+        subscriber.set_journal(journal)
+        subscriber._queue_event(get_event(1))
+        records = list(journal.read(SWITCH))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0][2], URL)
+        self.assertEqual(records[0][3], get_event(1))
+        self.assertTrue(subscriber.has_events(URL))
+
+
+class TestReplaySession(unittest.TestCase):
+    """
+    Test the ReplaySession class
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.journal = EventJournal(self.directory)
+        for index in range(5):
+            self.journal.append(SWITCH, URL, get_event(index),
+                                timestamp=1000 + 100 * index)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_replay_fast(self):
+        """
+        Test playing the events back as fast as possible
+        """
+        session = ReplaySession(self.journal, SWITCH, offset=2, speed=None)
+        events = []
+        while session.has_events(URL):
+            events.append(session.get_event(URL))
+        self.assertEqual(events, [json.loads(get_event(index))
+                                  for index in range(2, 5)])
+        self.assertEqual(session.get_offset(), 5)
+        self.assertTrue(session.is_finished())
+
+    def test_replay_timing(self):
+        """
+        Test that the recorded timing is respected
+        """
+        session = ReplaySession(self.journal, SWITCH, speed=1.0)
+        self.assertTrue(session.has_events(URL))
+        session.get_event(URL)
+        self.assertFalse(session.has_events(URL))
+        self.assertFalse(session.is_finished())
+        self.assertEqual(session.get_offset(), 1)
+
+
+if __name__ == '__main__':
+
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestEventJournal))
+    offline.addTest(unittest.makeSuite(TestReplaySession))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,236 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxmit.py Test module
+"""
+from nxtoolkit.nxtoolkit import L2BD, PortChannel
+from nxtoolkit.nxphysobject import Interface
+from nxtoolkit.nxmit import LocalMit, MoFilter, get_parent_dn
+import unittest
+
+
+def get_mo(mo_class, dn, **attributes):
+    """
+    Build an MO as returned by the switch
+    """
+    attributes['dn'] = dn
+    attributes.setdefault('status', '')
+    return {mo_class: {'attributes': attributes}}
+
+
+def get_phys_if(if_name, admin_st='up'):
+    """
+    Build an l1PhysIf MO
+    """
+    return get_mo('l1PhysIf', 'sys/intf/phys-[%s]' % if_name, id=if_name,
+                  portT='leaf', adminSt=admin_st, speed='10G', mtu='1500',
+                  monPolDn='', name='', descr='', usage='discovery',
+                  layer='Layer2', modTs='2016-01-01T00:00:00.000+00:00')
+
+
+def get_event(mo):
+    """
+    Build an event holding a single MO
+    """
+    return {'totalCount': '1', 'subscriptionId': ['1'], 'imdata': [mo]}
+
+
+class FakeResponse(object):
+    """
+    Response returned by the FakeLiveSession
+    """
+    def __init__(self, data):
+        self.ok = True
+        self._data = {'imdata': data}
+
+    def json(self):
+        return self._data
+
+
+class FakeLiveSession(object):
+    """
+    Switch session with subscriptions disabled or enabled
+    """
+    def __init__(self, mos, subscription_enabled=False):
+        self.mos = mos
+        self.subscription_enabled = subscription_enabled
+        self.urls = []
+        self.events = []
+
+    def _get_mos(self, url):
+        if 'target-subtree-class=' not in url:
+            return self.mos
+        classes = url.split('target-subtree-class=')[1].split('&')[0]
+        return [mo for mo in self.mos
+                if list(mo.keys())[0] in classes.split(',')]
+
+    def subscribe(self, url):
+        self.urls.append(url)
+        if not self.subscription_enabled:
+            return None
+        self.events.extend(get_event(mo) for mo in self._get_mos(url))
+        return FakeResponse(self._get_mos(url))
+
+    def get(self, url):
+        self.urls.append(url)
+        return FakeResponse(self._get_mos(url))
+
+    def has_events(self, url):
+        return len(self.events) > 0
+
+    def get_event(self, url):
+        return self.events.pop(0)
+
+
+MOS = [
+    get_mo('topSystem', 'sys', name='switch1'),
+    get_mo('interfaceEntity', 'sys/intf'),
+    get_phys_if('eth1/1'),
+    get_phys_if('eth1/2', admin_st='down'),
+    get_mo('ethpmPhysIf', 'sys/intf/phys-[eth1/1]/phys', operSt='up'),
+    get_mo('ethpmPhysIf', 'sys/intf/phys-[eth1/2]/phys', operSt='down'),
+    get_mo('pcAggrIf', 'sys/intf/aggr-[po10]', pcId='10', layer='Layer2',
+           adminSt='up', descr='', duplex='auto', linkLog='default',
+           mtu='1500', snmpTrapSt='enable', speed='auto', mode='access',
+           minLinks='1', pcMode='active', accessVlan='vlan-1',
+           trunkVlans='1-4094'),
+    get_mo('pcRsMbrIfs', 'sys/intf/aggr-[po10]/rsmbrIfs-[sys/intf/phys-[eth1/1]]',
+           tSKey='eth1/1', tDn='sys/intf/phys-[eth1/1]'),
+    get_mo('bdEntity', 'sys/bd'),
+    get_mo('l2BD', 'sys/bd/bd-[vlan-10]', name='vlan10', id='10',
+           adminSt='active', operSt='up', fabEncap='vlan-10'),
+]
+
+
+class TestLocalMit(unittest.TestCase):
+    """
+    Test the LocalMit class
+    """
+    def _get_mit(self, subscription_enabled=False, classes=None):
+        live = FakeLiveSession(list(MOS), subscription_enabled)
+        mit = LocalMit(live, classes=classes)
+        self.assertTrue(mit.bootstrap().ok)
+        return live, mit
+
+    def test_parent_dn(self):
+        """
+        Test the bracket aware parent dn
+        """
+        self.assertEqual(get_parent_dn('sys/intf/phys-[eth1/1]'), 'sys/intf')
+        self.assertEqual(get_parent_dn('sys/intf/aggr-[po10]/rsmbrIfs-'
+                                       '[sys/intf/phys-[eth1/1]]'),
+                         'sys/intf/aggr-[po10]')
+        self.assertEqual(get_parent_dn('sys'), '')
+
+    def test_bootstrap(self):
+        """
+        Test loading the replica with a single query
+        """
+        live, mit = self._get_mit()
+        self.assertEqual(len(mit), len(MOS))
+        self.assertEqual(live.urls, ['/api/mo/sys.json?query-target=subtree'
+                                     '&subscription=yes',
+                                     '/api/mo/sys.json?query-target=subtree'])
+        self.assertFalse(mit.get_staleness()['subscribed'])
+
+    def test_queries(self):
+        """
+        Test answering queries from the replica
+        """
+        live, mit = self._get_mit()
+        resp = mit.query('/api/node/class/l1PhysIf.json?query-target=self')
+        self.assertEqual(len(resp), 2)
+        resp = mit.query('/api/mo/sys/intf.json?query-target=children')
+        self.assertEqual([list(mo.keys())[0] for mo in resp],
+                         ['pcAggrIf', 'l1PhysIf', 'l1PhysIf'])
+        resp = mit.query('/api/class/pcAggrIf.json?rsp-subtree=full')
+        self.assertEqual(len(resp[0]['pcAggrIf']['children']), 1)
+        resp = mit.query('/api/mo/sys.json?query-target=subtree&'
+                         'target-subtree-class=l2BD')
+        self.assertEqual(resp[0]['l2BD']['attributes']['id'], '10')
+        resp = mit.query('/api/class/l1PhysIf.json?query-target-filter='
+                         'and(eq(l1PhysIf.adminSt,"down"),'
+                         'wcard(l1PhysIf.id,"eth1"))')
+        self.assertEqual(len(resp), 1)
+        self.assertEqual(mit.query('/api/mo/sys/bogus.json'), [])
+
+    def test_filter(self):
+        """
+        Test the query-target-filter evaluation
+        """
+        mo_filter = MoFilter('or(eq(l2BD.id,"10"),not(eq(l2BD.id,"20")))')
+        self.assertTrue(mo_filter.match('l2BD', {'id': '10'}))
+        self.assertFalse(mo_filter.match('l2BD', {'id': '20'}))
+        self.assertRaises(ValueError, MoFilter, 'bogus(l2BD.id,"10")')
+
+    def test_getters(self):
+        """
+        Test running the toolkit getters against the replica
+        """
+        live, mit = self._get_mit()
+        live.urls = []
+        session = mit.get_session()
+        interfaces = Interface.get(session)
+        self.assertEqual(sorted(intf.if_name for intf in interfaces),
+                         ['eth1/1', 'eth1/2'])
+        self.assertEqual(sorted(intf.operSt for intf in interfaces),
+                         ['down', 'up'])
+        port_channels = PortChannel.get(session)
+        self.assertEqual(len(port_channels), 1)
+        self.assertEqual(port_channels[0]._interfaces[0].if_name, 'eth1/1')
+        bds = L2BD.get(session)
+        self.assertEqual(len(bds), 1)
+        self.assertEqual(bds[0].name, 'vlan10')
+        self.assertEqual(live.urls, [])
+
+    def test_events(self):
+        """
+        Test keeping the replica current from events
+        """
+        live, mit = self._get_mit(subscription_enabled=True,
+                                  classes=['l1PhysIf', 'l2BD'])
+        self.assertEqual(len(mit), 3)
+        self.assertTrue(mit.get_staleness()['subscribed'])
+        live.events.append(get_event(get_mo('l1PhysIf',
+                                            'sys/intf/phys-[eth1/1]',
+                                            adminSt='down',
+                                            status='modified')))
+        live.events.append(get_event(get_mo('l2BD', 'sys/bd/bd-[vlan-10]',
+                                            status='deleted')))
+        live.events.append(get_event(get_phys_if('eth1/3')))
+        self.assertEqual(mit.sync(), 3)
+        self.assertEqual(mit.get_mo('sys/intf/phys-[eth1/1]')[1]['adminSt'],
+                         'down')
+        self.assertEqual(mit.get_mo('sys/intf/phys-[eth1/1]')[1]['mtu'],
+                         '1500')
+        self.assertEqual(mit.get_mo('sys/bd/bd-[vlan-10]'), None)
+        resp = mit.query('/api/mo/sys.json?query-target=subtree&'
+                         'target-subtree-class=l1PhysIf')
+        self.assertEqual(len(resp), 3)
+        metrics = mit.get_staleness()
+        self.assertEqual(metrics['objects'], 3)
+        self.assertEqual(metrics['events_applied'], 6)
+        self.assertTrue(metrics['seconds_since_event'] >= 0)
+
+
+if __name__ == '__main__':
+
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestLocalMit))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,100 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxregistry.py Test module
+"""
+from nxtoolkit.nxtoolkit import (REGISTRY, Interface, L2BD, Linecard, Node,
+                                 decode)
+import unittest
+
+
+def get_mo(mo_class, dn, children=None, **attributes):
+    """
+    Build an MO as returned by the switch
+    """
+    attributes['dn'] = dn
+    mo = {mo_class: {'attributes': attributes}}
+    if children is not None:
+        mo[mo_class]['children'] = children
+    return mo
+
+
+IMDATA = [
+    get_mo('l2BD', 'sys/bd/bd-[vlan-10]', name='vlan10', id='10',
+           fabEncap='vlan-10', adminSt='active', operSt='up',
+           children=[get_mo('tagInst', 'sys/bd/bd-[vlan-10]/tag-blue',
+                            name='blue')]),
+    get_mo('l1PhysIf', 'sys/intf/phys-[eth1/1]', id='eth1/1', portT='leaf',
+           adminSt='up', speed='10G', mtu='9216', monPolDn='', name='',
+           descr='', usage='discovery', layer='Layer2',
+           children=[get_mo('ethpmPhysIf', 'sys/intf/phys-[eth1/1]/phys',
+                            operSt='up')]),
+    get_mo('eqptLC', 'sys/ch/lcslot-1/lc', ser='ABC123', model='N9K-X9636PQ',
+           descr='36p 40G', numP='36', hwVer='1.0', rev='A0',
+           type='linecard', operSt='online', modTs='2016-01-01T00:00:00'),
+    get_mo('fabricNode', 'topology/pod-1/node-101', role='leaf'),
+    get_mo('bogusClass', 'sys/bogus'),
+]
+
+
+class TestClassRegistry(unittest.TestCase):
+    """
+    Test the ClassRegistry class
+    """
+    def test_classes(self):
+        """
+        Test the map of the Switch classes to the toolkit classes
+        """
+        self.assertTrue(REGISTRY.get_class('l2BD') is L2BD)
+        self.assertTrue(REGISTRY.get_class('l1PhysIf') is Interface)
+        self.assertTrue(REGISTRY.get_class('fabricNode') is Node)
+        self.assertEqual(REGISTRY.get_class('ethpmPhysIf'), None)
+        self.assertTrue('eqptLC' in REGISTRY.get_switch_classes())
+
+    def test_memoized(self):
+        """
+        Test that the class maps and deep class lists are built once
+        """
+        self.assertTrue(REGISTRY.get_class_map(L2BD) is
+                        REGISTRY.get_class_map(L2BD))
+        deep = Linecard.get_deep_switch_classes()
+        self.assertEqual(deep[:2], ['eqptLC', 'l1PhysIf'])
+        self.assertEqual(len(deep), len(set(deep)))
+        deep.append('bogus')
+        self.assertFalse('bogus' in Linecard.get_deep_switch_classes())
+
+    def test_decode(self):
+        """
+        Test decoding MOs of several classes in one pass
+        """
+        objs = decode(IMDATA)
+        self.assertEqual([type(obj) for obj in objs],
+                         [L2BD, Interface, Linecard])
+        self.assertEqual(objs[0].name, 'vlan10')
+        self.assertTrue(objs[0].has_tag('blue'))
+        self.assertEqual(objs[1].if_name, 'eth1/1')
+        self.assertEqual((objs[1].mtu, objs[1].operSt), ('9216', 'up'))
+        self.assertEqual(objs[2].serial, 'ABC123')
+
+
+if __name__ == '__main__':
+
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestClassRegistry))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,141 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxrollout.py Test module
+"""
+from nxtoolkit.nxrollout import Rollout
+from nxtoolkit.nxtoolkit import SVI
+import threading
+import time
+import unittest
+
+
+class FakeResponse(object):
+    def __init__(self, ok):
+        self.ok = ok
+
+
+class FakeSession(object):
+    """
+    Session of a Switch recording its pushes
+    """
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def __init__(self, ipaddr, ok=True, delay=0.005):
+        self.ipaddr = ipaddr
+        self.ok = ok
+        self.delay = delay
+        self.pushes = []
+
+    def push_to_switch(self, url, data, chunked=False):
+        cls = FakeSession
+        with cls.lock:
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+        time.sleep(self.delay)
+        with cls.lock:
+            cls.running -= 1
+        self.pushes.append((url, data))
+        return FakeResponse(self.ok)
+
+
+class TestRollout(unittest.TestCase):
+    """
+    Test the Rollout class
+    """
+    def setUp(self):
+        FakeSession.max_running = 0
+
+    def get_sessions(self, count, failing=()):
+        return [FakeSession('10.0.0.%d' % index, ok=index not in failing)
+                for index in range(count)]
+
+    def test_waves(self):
+        """
+        Test the sizes of the waves
+        """
+        rollout = Rollout(SVI('vlan10'), self.get_sessions(20),
+                          canary_size=2, max_window=4)
+        self.assertEqual([len(wave) for wave in rollout.get_waves()],
+                         [2, 4, 8, 6])
+
+    def test_run(self):
+        """
+        Test that every Switch gets the change with growing concurrency
+        """
+        sessions = self.get_sessions(30)
+        waves = []
+        rollout = Rollout(SVI('vlan10'), sessions, max_window=8,
+                          progress=waves.append)
+        report = rollout.run()
+        self.assertFalse(report.halted)
+        self.assertEqual(report.succeeded, 30)
+        self.assertEqual([wave.concurrency for wave in waves],
+                         [1, 2, 4, 8, 8])
+        self.assertTrue(1 < FakeSession.max_running <= 8)
+        for session in sessions:
+            self.assertEqual(len(session.pushes), 1)
+        latencies = waves[-1].get_latencies()
+        self.assertTrue(0 < latencies['min'] <= latencies['p50'] <=
+                        latencies['p95'] <= latencies['max'])
+
+    def test_canary_failure(self):
+        """
+        Test that a failed canary halts the rollout
+        """
+        sessions = self.get_sessions(10, failing=[0])
+        report = Rollout(SVI('vlan10'), sessions, failure_budget=3).run()
+        self.assertTrue(report.halted)
+        self.assertEqual(len(report.waves), 1)
+        self.assertEqual(report.not_pushed, 9)
+        self.assertEqual(sessions[1].pushes, [])
+
+    def test_failure_budget(self):
+        """
+        Test that the rollout halts when the failures exceed the budget
+        """
+        sessions = self.get_sessions(40, failing=[3, 4, 10, 11, 12])
+        report = Rollout(SVI('vlan10'), sessions, failure_budget=0.05).run()
+        self.assertTrue(report.halted)
+        self.assertTrue(report.failed > 2)
+        self.assertTrue(report.not_pushed > 0)
+        self.assertEqual(report.succeeded + report.failed +
+                         report.not_pushed, 40)
+        report = Rollout(SVI('vlan10'), sessions, failure_budget=5).run()
+        self.assertFalse(report.halted)
+        self.assertEqual(report.failed, 5)
+
+    def test_change_per_switch(self):
+        """
+        Test a change built for each Switch
+        """
+        sessions = self.get_sessions(3)
+        Rollout(lambda session: [SVI('vlan10'), SVI('vlan20')],
+                sessions).run()
+        url, data = sessions[2].pushes[0]
+        self.assertEqual(url, '/api/mo/sys/intf.json')
+        self.assertEqual(len(data['interfaceEntity']['children']), 2)
+
+
+if __name__ == '__main__':
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestRollout))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,166 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxscheduler.py Test module
+"""
+from nxtoolkit.nxscheduler import ConfigScheduler, PushResult
+from nxtoolkit.nxtoolkit import (ConfigBDs, Dhcp, Feature, Interface, L2BD,
+                                 PortChannel, SVI, Vrrp)
+import threading
+import time
+import unittest
+
+
+class FakeResponse(object):
+    def __init__(self, ok):
+        self.ok = ok
+        self.text = ''
+
+
+class FakeSession(object):
+    """
+    Records the order of the pushes and the number of concurrent pushes
+    """
+    def __init__(self, failing_urls=(), delay=0.01):
+        self.pushed = []
+        self.failing_urls = failing_urls
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def push_to_switch(self, url, data, chunked=False):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+            self.pushed.append(url)
+        return FakeResponse(url not in self.failing_urls)
+
+
+class TestConfigScheduler(unittest.TestCase):
+    """
+    Test the ConfigScheduler class
+    """
+    def get_objects(self):
+        feature = Feature()
+        feature.enable('vrrp')
+        bds = ConfigBDs()
+        bds.add_l2bds(L2BD('vlan-10'))
+        svi = SVI('vlan10')
+        vrrp = Vrrp(Interface('eth2/1'))
+        return feature, bds, svi, vrrp
+
+    def test_dependencies(self):
+        """
+        Test the dependencies derived from the classes and the members
+        """
+        feature, bds, svi, vrrp = self.get_objects()
+        member = Interface('eth1/1')
+        pc = PortChannel('10', interfaces=[member])
+        dhcp = Dhcp()
+        session = FakeSession()
+        scheduler = ConfigScheduler()
+        for obj in (svi, vrrp, member, pc, dhcp, bds, feature):
+            scheduler.add(obj, session)
+        self.assertEqual(scheduler.get_dependencies(svi), [bds, feature])
+        self.assertEqual(scheduler.get_dependencies(vrrp), [feature])
+        self.assertEqual(scheduler.get_dependencies(dhcp), [feature])
+        self.assertEqual(scheduler.get_dependencies(member), [pc])
+        self.assertEqual(scheduler.get_dependencies(pc), [feature])
+        self.assertEqual(scheduler.get_dependencies(feature), [])
+
+    def test_order(self):
+        """
+        Test that the objects are pushed after their dependencies
+        """
+        feature, bds, svi, vrrp = self.get_objects()
+        session = FakeSession()
+        scheduler = ConfigScheduler()
+        for obj in (svi, vrrp, bds, feature):
+            scheduler.add(obj, session)
+        results = scheduler.run()
+        self.assertTrue(all(result.ok for result in results))
+        order = session.pushed
+        for before, after in ((feature, svi), (feature, vrrp), (bds, svi)):
+            self.assertTrue(order.index(before.get_url()) <
+                            order.index(after.get_url()))
+
+    def test_concurrency(self):
+        """
+        Test that the independent objects are pushed concurrently within
+        the limit of each Switch
+        """
+        sessions = [FakeSession(), FakeSession()]
+        scheduler = ConfigScheduler(max_concurrency=3)
+        for session in sessions:
+            for index in range(10):
+                scheduler.add(SVI('vlan%d' % (index + 1)), session)
+        start = time.time()
+        results = scheduler.run()
+        self.assertTrue(time.time() - start < 10 * 0.01 * 2)
+        self.assertEqual(len(results), 20)
+        for session in sessions:
+            self.assertEqual(len(session.pushed), 10)
+            self.assertTrue(1 < session.max_running <= 3)
+
+    def test_failure(self):
+        """
+        Test that the objects depending on a failed push are skipped
+        """
+        feature, bds, svi, vrrp = self.get_objects()
+        other = SVI('vlan20')
+        session = FakeSession(failing_urls=[bds.get_url()])
+        other_session = FakeSession()
+        scheduler = ConfigScheduler()
+        scheduler.add(feature, session)
+        scheduler.add(bds, session)
+        scheduler.add(svi, session)
+        scheduler.add(vrrp, session)
+        scheduler.add(other, other_session)
+        results = scheduler.run()
+        self.assertEqual([result.status for result in results],
+                         [PushResult.PUSHED, PushResult.FAILED,
+                          PushResult.SKIPPED, PushResult.PUSHED,
+                          PushResult.PUSHED])
+        self.assertNotIn(svi.get_url(), session.pushed)
+
+    def test_explicit(self):
+        """
+        Test explicit dependencies across Switches and cycles
+        """
+        first, second = SVI('vlan1'), SVI('vlan2')
+        sessions = [FakeSession(), FakeSession(failing_urls=[
+            first.get_url()])]
+        scheduler = ConfigScheduler()
+        scheduler.add(first, sessions[1])
+        scheduler.add(second, sessions[0], depends_on=[first])
+        results = scheduler.run()
+        self.assertEqual([result.status for result in results],
+                         [PushResult.FAILED, PushResult.SKIPPED])
+        scheduler.add(first, sessions[0], depends_on=[second])
+        self.assertRaises(ValueError, scheduler.run)
+
+
+if __name__ == '__main__':
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestConfigScheduler))
+
+    unittest.main(defaultTest='offline')
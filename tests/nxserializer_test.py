@@ -0,0 +1,148 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxserializer.py Test module
+"""
+from nxtoolkit.nxbaseobject import BaseNXObject
+from nxtoolkit.nxsession import Session
+from nxtoolkit.nxtoolkit import (ConfigBDs, ConfigInterfaces, Interface, L2BD,
+                                 PortChannel)
+from nxtoolkit import nxserializer
+import json
+import sys
+import unittest
+
+
+class FakeRequests(object):
+    """
+    Records the bodies posted by a Session
+    """
+    def __init__(self):
+        self.bodies = []
+
+    def post(self, url, data=None):
+        if not isinstance(data, str):
+            data = list(data)
+        self.bodies.append(data)
+        return FakeResponse()
+
+
+class FakeResponse(object):
+    ok = True
+    text = ''
+
+
+class Node(BaseNXObject):
+    """
+    Object with children and a get_json returning a list for odd names
+    """
+    def get_json(self):
+        resp = super(Node, self).get_json('node', attributes={
+            'name': self.name, 'count': len(self.name), 'up': True})
+        if len(self.name) % 2:
+            return [resp, {'extra': {'attributes': {'ratio': 0.5}}}]
+        return resp
+
+
+class TestSerializer(unittest.TestCase):
+    """
+    Test the streaming serializer
+    """
+    def assertSameJson(self, obj):
+        self.assertEqual(nxserializer.dumps(obj),
+                         json.dumps(obj.get_json(), sort_keys=True))
+
+    def test_data(self):
+        """
+        Test that JSON data is written as json.dumps writes it
+        """
+        data = {'b': [1, 2.5, None, True, False, (3, 4), [], {}],
+                'a': {u'caf\xe9': u'\u2603', 'quote': 'a"b\\c\n'},
+                'c': [{'z': 'x', 'y': 'w'}, {'n': {'m': [[]]}}], 1: 'one'}
+        self.assertEqual(nxserializer.dumps(data),
+                         json.dumps(data, sort_keys=True))
+
+    def test_objects(self):
+        """
+        Test that the JSON of objects is the one of their get_json
+        """
+        bds = ConfigBDs()
+        for index in range(1, 50):
+            bds.add_l2bds(L2BD('vlan-%d' % index))
+        self.assertSameJson(bds)
+        interfaces = ConfigInterfaces()
+        for index in range(1, 20):
+            interfaces.add_interface(Interface('eth1/%d' % index))
+        pc = PortChannel('444')
+        pc.attach(Interface('eth1/30'))
+        pc.attach(Interface('eth1/31'))
+        interfaces.add_port_channel(pc)
+        self.assertSameJson(interfaces)
+        root = Node('root')
+        for name in ('a', 'bb', 'ccc'):
+            Node(name, Node(name + name, root))
+        root.mark_as_deleted()
+        self.assertSameJson(root)
+
+    def test_deep_tree(self):
+        """
+        Test that a tree deeper than the recursion limit is written
+        """
+        root = parent = Node('root')
+        for _ in range(sys.getrecursionlimit() + 100):
+            parent = Node('nn', parent)
+        text = nxserializer.dumps(root)
+        self.assertEqual(text.count('"node"'), sys.getrecursionlimit() + 101)
+        self.assertRaises(RuntimeError, root.get_json)
+
+    def test_chunks(self):
+        """
+        Test that the JSON is written in chunks of at least chunk_size
+        """
+        bds = ConfigBDs()
+        for index in range(1, 50):
+            bds.add_l2bds(L2BD('vlan-%d' % index))
+        chunks = list(nxserializer.iter_json(bds, chunk_size=100))
+        self.assertEqual(''.join(chunks), nxserializer.dumps(bds))
+        for chunk in chunks[:-1]:
+            self.assertTrue(len(chunk) >= 100)
+
+    def test_push_to_switch(self):
+        """
+        Test that a Session pushes the same body for an object, its JSON
+        and as a chunked body
+        """
+        session = Session('http://1.2.3.4', 'admin', 'password',
+                          subscription_enabled=False)
+        session.session = FakeRequests()
+        bds = ConfigBDs()
+        for index in range(1, 5):
+            bds.add_l2bds(L2BD('vlan-%d' % index))
+        session.push_to_switch(bds.get_url(), bds.get_json())
+        session.push_to_switch(bds.get_url(), bds)
+        session.push_to_switch(bds.get_url(), bds, chunked=True)
+        json_body, object_body, chunks = session.session.bodies
+        self.assertEqual(object_body, json_body)
+        self.assertEqual(''.join(chunks), json_body)
+
+
+if __name__ == '__main__':
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestSerializer))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,420 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxsession.py Test module
+"""
+from nxtoolkit.nxsession import Session, Subscriber
+import json
+import threading
+import unittest
+
+
+class FakeRefreshResponse(object):
+    """
+    Response returned by the FakeApic
+    """
+    def __init__(self, ok, data=None):
+        self.ok = ok
+        self.text = json.dumps(data)
+
+
+class FakeApic(object):
+    """
+    Records the URLs requested by the Subscriber
+    """
+    def __init__(self, accept_batch=True, expired=()):
+        self.accept_batch = accept_batch
+        self.expired = set(expired)
+        self.urls = []
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            self.urls.append(url)
+        if not self.accept_batch and ',' in url:
+            return FakeRefreshResponse(False)
+        if 'id=' in url and self.expired & set(url.split('id=')[1].split(',')):
+            return FakeRefreshResponse(False)
+        return FakeRefreshResponse(True)
+
+
+class TestSubscriptionRefresh(unittest.TestCase):
+    """
+    Test the subscription refresh done by the Subscriber
+    """
+    def _get_subscriber(self, apic, num_subscriptions):
+        subscriber = Subscriber(apic)
+        for index in range(num_subscriptions):
+            url = '/api/class/class%s.json?subscription=yes' % index
+            subscriber._subscriptions[url] = str(1000 + index)
+        return subscriber
+
+    def _get_refreshed_ids(self, apic):
+        ids = []
+        for url in apic.urls:
+            ids.extend(url.split('id=')[1].split(','))
+        return sorted(ids)
+
+    def test_refresh_batched(self):
+        """
+        Test that the ids are sent in batches
+        """
+        apic = FakeApic()
+        subscriber = self._get_subscriber(apic, 5)
+        subscriber._refresh_batch_size = 2
+        subscriber.refresh_subscriptions()
+        self.assertEqual(len(apic.urls), 3)
+        self.assertEqual(self._get_refreshed_ids(apic),
+                         [str(1000 + index) for index in range(5)])
+        self.assertTrue(subscriber._batch_refresh)
+
+    def test_refresh_batch_rejected(self):
+        """
+        Test the fallback to single id refreshes
+        """
+        apic = FakeApic(accept_batch=False)
+        subscriber = self._get_subscriber(apic, 5)
+        subscriber.refresh_subscriptions()
+        self.assertFalse(subscriber._batch_refresh)
+        self.assertEqual(len(apic.urls), 6)
+        apic.urls = []
+        subscriber.refresh_subscriptions()
+        self.assertEqual(len(apic.urls), 5)
+        self.assertEqual(self._get_refreshed_ids(apic),
+                         [str(1000 + index) for index in range(5)])
+
+    def test_refresh_expired_id(self):
+        """
+        Test that an expired id does not turn the batching off and that
+        the other ids of its batch are refreshed individually
+        """
+        apic = FakeApic(expired=['1001'])
+        subscriber = self._get_subscriber(apic, 5)
+        subscriber._refresh_batch_size = 2
+        subscriber.refresh_subscriptions()
+        self.assertEqual(subscriber._batch_refresh, None)
+        # The probe batch, then its ids and the remaining ids one by one
+        self.assertEqual(len(apic.urls), 6)
+        subscriber._batch_refresh = True
+        apic.urls = []
+        subscriber.refresh_subscriptions()
+        self.assertTrue(subscriber._batch_refresh)
+        self.assertEqual(apic.urls[:3], [
+            '/api/subscriptionRefresh.json?id=1000,1001',
+            '/api/subscriptionRefresh.json?id=1002,1003',
+            '/api/subscriptionRefresh.json?id=1004'])
+        self.assertEqual(sorted(apic.urls[3:]), [
+            '/api/subscriptionRefresh.json?id=1000',
+            '/api/subscriptionRefresh.json?id=1001'])
+
+    def test_refresh_no_subscriptions(self):
+        """
+        Test refresh with no subscriptions
+        """
+        apic = FakeApic()
+        subscriber = self._get_subscriber(apic, 0)
+        subscriber.refresh_subscriptions()
+        self.assertEqual(apic.urls, [])
+
+    def test_refresh_interval(self):
+        """
+        Test that the refresh interval is jittered but never late
+        """
+        subscriber = self._get_subscriber(FakeApic(), 0)
+        for _ in range(100):
+            interval = subscriber._get_refresh_interval()
+            self.assertTrue(interval <= subscriber._refresh_time)
+            self.assertTrue(interval >= subscriber._refresh_time *
+                            (1 - subscriber._refresh_jitter))
+
+
+def get_mo(dn, mod_ts):
+    """
+    Build an l1PhysIf MO as returned by the switch
+    """
+    return {'l1PhysIf': {'attributes': {'dn': dn, 'modTs': mod_ts,
+                                        'status': ''}}}
+
+
+class FakeResyncApic(FakeApic):
+    """
+    Answers the subscription and resync queries of the Subscriber
+    """
+    def __init__(self, mos):
+        super(FakeResyncApic, self).__init__()
+        self.mos = mos
+        self.next_id = 100
+
+    def get(self, url):
+        with self._lock:
+            self.urls.append(url)
+        data = {'totalCount': str(len(self.mos)), 'imdata': list(self.mos)}
+        if 'subscription=yes' in url:
+            self.next_id += 1
+            data['subscriptionId'] = str(self.next_id)
+        return FakeRefreshResponse(True, data)
+
+
+class TestReconnect(unittest.TestCase):
+    """
+    Test the web socket reconnect and gap resync done by the Subscriber
+    """
+    url = '/api/class/l1PhysIf.json?subscription=yes'
+
+    def _get_subscriber(self, apic):
+        subscriber = Subscriber(apic)
+        subscriber._reconnect_backoff = 0
+        subscriber._subscriptions[self.url] = '1'
+        subscriber._ws_url = 'wss://1.2.3.4/socket1234'
+        self.attempts = 0
+
+        def open_web_socket(use_secure):
+            self.attempts += 1
+            if self.attempts < 3:
+                raise IOError('Connection refused')
+        subscriber._open_web_socket = open_web_socket
+        return subscriber
+
+    def test_resync_url(self):
+        """
+        Test the resync URL
+        """
+        subscriber = Subscriber(FakeApic())
+        subscriber._last_mod_ts = '2016-01-01T00:00:00.000+00:00'
+        self.assertEqual(subscriber._get_resync_urls(self.url),
+                         ['/api/class/l1PhysIf.json?query-target-filter='
+                          'gt(l1PhysIf.modTs,'
+                          '"2016-01-01T00:00:00.000+00:00")'])
+        url = '/api/mo/sys/intf/phys-[eth1/1].json?subscription=yes'
+        self.assertEqual(subscriber._get_resync_urls(url),
+                         ['/api/mo/sys/intf/phys-[eth1/1].json'])
+
+    def test_resync_subtree_url(self):
+        """
+        Test the resync URLs of subtree queries
+        """
+        subscriber = Subscriber(FakeApic())
+        subscriber._last_mod_ts = 'ts'
+        url = ('/api/mo/sys.json?query-target=subtree&'
+               'target-subtree-class=l1PhysIf,l2BD&subscription=yes')
+        self.assertEqual(subscriber._get_resync_urls(url),
+                         ['/api/mo/sys.json?query-target=subtree&'
+                          'target-subtree-class=l1PhysIf,l2BD&'
+                          'query-target-filter=or(gt(l1PhysIf.modTs,"ts"),'
+                          'gt(l2BD.modTs,"ts"))'])
+
+        # Without a class list, the classes seen on the subscription
+        url = '/api/mo/sys.json?query-target=subtree&subscription=yes'
+        subscriber._add_classes(url, [get_mo('sys/intf/phys-[eth1/1]', 'ts')])
+        subscriber._add_classes(url, [{'class%02d' % index: {}}
+                                      for index in range(20)])
+        urls = subscriber._get_resync_urls(url)
+        self.assertEqual(len(urls), 2)
+        self.assertTrue('gt(class00.modTs,"ts")' in urls[0])
+        self.assertEqual(urls[1], '/api/mo/sys.json?query-target=subtree&'
+                                  'query-target-filter='
+                                  'gt(l1PhysIf.modTs,"ts")')
+
+    def test_reconnect_resync(self):
+        """
+        Test that only the MOs changed during the gap are queued
+        """
+        old = get_mo('sys/intf/phys-[eth1/1]', '2016-01-01T00:00:00.000+00:00')
+        new = get_mo('sys/intf/phys-[eth1/2]', '2016-01-01T00:05:00.000+00:00')
+        apic = FakeResyncApic([old, new])
+        subscriber = self._get_subscriber(apic)
+        event = {'totalCount': '1', 'subscriptionId': ['1'], 'imdata': [old]}
+        subscriber._queue_event(json.dumps(event))
+        subscriber._reconnect()
+        # The queue is left to the thread reading the events
+        self.assertEqual(subscriber._events, {})
+
+        self.assertEqual(self.attempts, 3)
+        self.assertEqual(len(subscriber.get_gaps()), 1)
+        self.assertEqual(subscriber.get_gaps()[0][2],
+                         '2016-01-01T00:00:00.000+00:00')
+        self.assertEqual(subscriber._subscriptions[self.url], '101')
+        self.assertTrue(subscriber.has_events(self.url))
+        self.assertEqual(subscriber.get_event(self.url)['imdata'], [old])
+        event = subscriber.get_event(self.url)
+        attributes = event['imdata'][0]['l1PhysIf']['attributes']
+        self.assertEqual(attributes['dn'], 'sys/intf/phys-[eth1/2]')
+        self.assertEqual(attributes['status'], 'modified')
+        self.assertFalse(subscriber.has_events(self.url))
+
+    def test_reconnect_without_events(self):
+        """
+        Test that the subscriptions are replayed when no event was seen
+        """
+        mo = get_mo('sys/intf/phys-[eth1/1]', '2016-01-01T00:00:00.000+00:00')
+        apic = FakeResyncApic([mo])
+        subscriber = self._get_subscriber(apic)
+        subscriber._reconnect()
+        self.assertEqual(apic.urls, [self.url])
+        self.assertTrue(subscriber.has_events(self.url))
+        self.assertEqual(subscriber.get_event(self.url)['imdata'], [mo])
+
+
+class TestEventQueue(unittest.TestCase):
+    """
+    Test the events moved from the queue by several threads
+    """
+    def test_concurrent_drain(self):
+        """
+        Test that threads draining the queue at the same time neither
+        block nor lose events
+        """
+        subscriber = Subscriber(FakeApic())
+        url = '/api/class/l1PhysIf.json?subscription=yes'
+        subscriber._subscriptions[url] = '1'
+        for index in range(1000):
+            mo = get_mo('sys/intf/phys-[eth1/%d]' % index,
+                        '2016-01-01T00:00:%02d.000+00:00' % (index % 60))
+            subscriber._queue_event(json.dumps(
+                {'totalCount': '1', 'subscriptionId': ['1'], 'imdata': [mo]}))
+        self.assertEqual(subscriber._last_mod_ts,
+                         '2016-01-01T00:00:59.000+00:00')
+        threads = [threading.Thread(target=subscriber._process_event_q)
+                   for _ in range(4)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(len(subscriber._events[url]), 1000)
+
+
+class FakeNxapiResponse(object):
+    """
+    Response of the FakeNxapi
+    """
+    def __init__(self, ok, data):
+        self.ok = ok
+        self.text = json.dumps(data)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeNxapi(object):
+    """
+    Runs the cli_conf commands until the first failing command and records
+    the payloads posted
+    """
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.payloads = []
+
+    def post(self, url, data=None, headers=None, auth=None, verify=None):
+        payload = json.loads(data)
+        self.payloads.append(payload)
+        outputs = []
+        for command in payload['ins_api']['input'].split(' ;'):
+            if command in self.failing:
+                outputs.append({'code': '400', 'msg': 'CLI execution error',
+                                'clierror': '% Invalid command\n'})
+                break
+            outputs.append({'code': '200', 'msg': 'Success', 'body': {}})
+        if len(outputs) == 1:
+            outputs = outputs[0]
+        ok = not any(command in self.failing
+                     for command in payload['ins_api']['input'].split(' ;'))
+        return FakeNxapiResponse(ok, {'ins_api': {'outputs': {
+            'output': outputs}}})
+
+
+class TestCliConf(unittest.TestCase):
+    """
+    Test the configuration commands sent by Session.cli_conf
+    """
+    def _get_session(self, nxapi):
+        session = Session('http://1.2.3.4', 'admin', 'password',
+                          subscription_enabled=False)
+        session.session = nxapi
+        return session
+
+    def test_batch(self):
+        """
+        Test that the commands are sent in one request
+        """
+        nxapi = FakeNxapi()
+        session = self._get_session(nxapi)
+        result = session.cli_conf('interface eth1/1\n  no shutdown\n\n'
+                                  'interface eth1/2\n  no shutdown\n')
+        self.assertEqual(len(nxapi.payloads), 1)
+        ins_api = nxapi.payloads[0]['ins_api']
+        self.assertEqual(ins_api['type'], 'cli_conf')
+        self.assertEqual(ins_api['rollback'], 'stop-on-error')
+        self.assertEqual(ins_api['input'],
+                         'interface eth1/1 ;no shutdown ;'
+                         'interface eth1/2 ;no shutdown')
+        self.assertTrue(result.ok)
+        self.assertEqual(len(result.results), 4)
+        self.assertFalse(result.rolled_back)
+
+    def test_errors(self):
+        """
+        Test that a failure is mapped to its command and that the
+        following commands are reported as not run
+        """
+        nxapi = FakeNxapi(failing=['speed 1'])
+        session = self._get_session(nxapi)
+        commands = ['interface eth1/1', 'speed 1', 'no shutdown']
+        result = session.cli_conf(commands, rollback_on_error=True)
+        self.assertEqual(nxapi.payloads[0]['ins_api']['rollback'],
+                         'rollback-on-error')
+        self.assertFalse(result.ok)
+        self.assertTrue(result.rolled_back)
+        self.assertEqual([error.command for error in result.errors],
+                         ['speed 1'])
+        self.assertEqual(result.errors[0].clierror, '% Invalid command\n')
+        self.assertEqual([item.command for item in result.not_run],
+                         ['no shutdown'])
+        result = session.cli_conf(['speed 1'])
+        self.assertEqual(result.errors[0].command, 'speed 1')
+        self.assertFalse(result.rolled_back)
+
+    def test_request_error(self):
+        """
+        Test that nothing is reported as rolled back when the Switch
+        returned no outputs
+        """
+        class ErrorNxapi(FakeNxapi):
+            def post(self, url, data=None, headers=None, auth=None,
+                     verify=None):
+                self.payloads.append(json.loads(data))
+                return FakeNxapiResponse(False, {'error': 'Unauthorized'})
+
+        session = self._get_session(ErrorNxapi())
+        result = session.cli_conf(['interface eth1/1', 'no shutdown'],
+                                  rollback_on_error=True)
+        self.assertFalse(result.ok)
+        self.assertFalse(result.rolled_back)
+        self.assertEqual(len(result.not_run), 2)
+
+
+if __name__ == '__main__':
+
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestSubscriptionRefresh))
+    offline.addTest(unittest.makeSuite(TestReconnect))
+    offline.addTest(unittest.makeSuite(TestEventQueue))
+    offline.addTest(unittest.makeSuite(TestCliConf))
+
+    unittest.main(defaultTest='offline')
@@ -0,0 +1,102 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxtemplate.py Test module
+"""
+from nxtoolkit.nxtemplate import JsonTemplate
+from nxtoolkit.nxtoolkit import L2BD, SVI, IPV6Interface, Vrrp, VrrpID
+from nxtoolkit.nxphysobject import Interface
+import unittest
+
+
+class TestJsonTemplate(unittest.TestCase):
+    """
+    Test the JsonTemplate class
+    """
+    def test_attributes(self):
+        """
+        Test that the optional attributes are only set when they have a
+        value and that the required ones are always set
+        """
+        template = JsonTemplate([('adminSt', 'admin_st', False),
+                                 ('descr', 'descr', False),
+                                 ('id', 'if_name', True)])
+        iface = IPV6Interface('eth1/1')
+        self.assertEqual(template.get_attributes(iface), {'id': 'eth1/1'})
+        iface.set_admin_st('up')
+        iface.set_descr('uplink')
+        self.assertEqual(template.get_attributes(iface),
+                         {'adminSt': 'up', 'descr': 'uplink', 'id': 'eth1/1'})
+
+    def test_single_slot(self):
+        """
+        Test a template of a single attribute
+        """
+        template = JsonTemplate([('id', 'vrrp_id', True)])
+        self.assertEqual(template.get_attributes(VrrpID('5')), {'id': '5'})
+
+    def test_path(self):
+        """
+        Test an attribute read through a dotted path
+        """
+        vrrp = Vrrp(Interface('eth2/1'))
+        vrrp.set_admin_st('up')
+        self.assertEqual(vrrp._get_attributes(),
+                         {'id': 'eth2/1', 'adminSt': 'up'})
+
+    def test_lazy_interface(self):
+        """
+        Test the JSON of an Interface reading its id from the MO
+        """
+        mo_attributes = {'dn': 'sys/intf/phys-[eth1/5]', 'id': 'eth1/5',
+                         'adminSt': 'up', 'speed': '10G', 'mtu': '9216'}
+        lazy = Interface._from_mo_attributes(
+            Interface._get_mo_attributes(mo_attributes, lazy=True))
+        self.assertNotIn('id', lazy.__dict__)
+        self.assertEqual(lazy.get_json(), Interface('eth1/5').get_json())
+
+    def test_svi(self):
+        """
+        Test the JSON of an SVI built from its template
+        """
+        svi = SVI('vlan10', admin_st='up')
+        svi.set_mtu('9216')
+        self.assertEqual(svi.get_json(),
+                         {'sviIf': {'attributes': {'id': 'vlan10',
+                                                   'adminSt': 'up',
+                                                   'mtu': '9216'},
+                                    'children': []}})
+
+    def test_tags_and_deleted(self):
+        """
+        Test that the JSON of the objects with tags or deleted is complete
+        """
+        bd = L2BD('vlan-10')
+        bd.add_tag('blue')
+        bd.mark_as_deleted()
+        resp = bd.get_json()['l2BD']
+        self.assertEqual(resp['attributes']['status'], 'deleted')
+        self.assertEqual(resp['children'],
+                         [{'tagInst': {'attributes': {'name': 'blue'}}}])
+
+
+if __name__ == '__main__':
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestJsonTemplate))
+
+    unittest.main(defaultTest='offline')
@@ -27,9 +27,10 @@ from nxtoolkit.nxtoolkit import (
     SVI, ConfigInterfaces, ConfigVrrps, Vrrp, VrrpID, Lacp, IPV6, IPV6Route,
     Feature, FeatureAttributes, Dhcp, DhcpRelay, BootNxos, Copy, 
     RunningToStartUp, DNS, DnsProfile, DnsHost, DnsDomExt, DnsDom, 
-    DnsProvider, DnsVrf, ICMP, ConfigBDs)
+    DnsProvider, DnsVrf, ICMP, ConfigBDs, FilterEntry)
 
 from nxtoolkit.nxphysobject import (Interface)
+from nxtoolkit.nxConcreteLib import ConcreteEp
 import unittest
 import string
 import random
@@ -70,6 +71,136 @@ def random_size_string():
     return random_string(random.randint(1, MAX_RANDOM_STRING_SIZE))
 
 
+class TestBaseNXObject(unittest.TestCase):
+    """
+    This class defines off line testing of the base object storage
+    """
+    def test_lazy_lists(self):
+        """
+        Test that the children, relations, attachments and tags lists are
+        only allocated when they are first modified
+        """
+        parent = BaseNXObject('parent')
+        for name in ('_children', '_relations', '_attachments', '_tags'):
+            self.assertEqual(getattr(parent, name), [])
+            self.assertFalse(name in parent.__dict__)
+        children = parent.get_children()
+        child = BaseNXObject('child', parent)
+        children.append(BaseNXObject('other'))
+        self.assertEqual([obj.name for obj in parent.get_children()],
+                         ['child', 'other'])
+        self.assertFalse('_children' in child.__dict__)
+        parent.add_tag('tag')
+        self.assertTrue(parent.has_tag('tag'))
+        parent.attach(child)
+        self.assertTrue(parent.is_attached(child))
+        self.assertTrue(child.has_attachment(parent))
+        self.assertFalse('_relations' in child.__dict__)
+
+    def test_decoded_filter_entry(self):
+        """
+        Test that a FilterEntry decoded into its parent can be found and
+        removed
+        """
+        parent = BaseNXObject('parent')
+        attributes = {'name': 'http', 'applyToFrag': 'no', 'arpOpc': '0',
+                      'dFromPort': '80', 'dToPort': '80', 'etherT': 'ip',
+                      'prot': '6', 'sFromPort': '0', 'sToPort': '0',
+                      'tcpRules': '0'}
+        entry = FilterEntry.from_mo(attributes, parent)
+        self.assertTrue(parent.has_child(entry))
+        same = FilterEntry('http', None, applyToFrag='no', dFromPort='80',
+                           dToPort='80', etherT='ip', prot='6')
+        self.assertTrue(parent.has_child(same))
+        self.assertTrue(parent.get_child(FilterEntry, 'http') is entry)
+        parent.remove_child(same)
+        self.assertFalse(parent.has_child(entry))
+        self.assertEqual(parent.get_children(), [])
+
+    def test_child_index(self):
+        """
+        Test the indexed child storage
+        """
+        parent = BaseNXObject('parent')
+        children = [BaseNXObject('child%s' % index, parent)
+                    for index in range(100)]
+        interfaces = [Interface('eth1/%s' % index, parent)
+                      for index in range(1, 11)]
+        self.assertEqual(len(parent.get_children()), 110)
+        self.assertEqual(parent.get_children(Interface), interfaces)
+        self.assertEqual(parent.get_children(BaseNXObject),
+                         children + interfaces)
+        self.assertTrue(parent.has_child(BaseNXObject('child50', parent)))
+        self.assertFalse(parent.has_child(BaseNXObject('child50')))
+        self.assertTrue(parent.get_child(Interface, 'eth1/3') is
+                        interfaces[2])
+        self.assertTrue(parent.get_child(BaseNXObject, 'child7') is
+                        children[7])
+        self.assertEqual(parent.get_child(Interface, 'child7'), None)
+
+        # Re-creating a child replaces the existing one
+        BaseNXObject('child0', parent)
+        self.assertEqual(len(parent.get_children()), 110)
+        self.assertEqual(parent.get_children()[-1].name, 'child0')
+        for child in children[1:80]:
+            parent.remove_child(child)
+        self.assertEqual([child.name for child in parent.get_children()][:3],
+                         ['child80', 'child81', 'child82'])
+        self.assertEqual(parent.get_children()[20].name, 'eth1/1')
+        self.assertRaises(ValueError, parent.remove_child, children[1])
+
+    def test_relation_index(self):
+        """
+        Test the indexed relations and attachments
+        """
+        obj = BaseNXObject('obj')
+        interfaces = [Interface('eth1/%s' % index) for index in range(1, 51)]
+        others = [BaseNXObject('other%s' % index) for index in range(5)]
+        for interface in interfaces:
+            obj.attach(interface)
+        for other in others:
+            obj._add_relation(other, 'peer')
+        self.assertEqual(obj.get_interfaces(), interfaces)
+        self.assertEqual(obj.get_all_attached(Interface), interfaces)
+        self.assertTrue(obj._has_any_relation(Interface))
+        self.assertTrue(obj._has_relation(others[2], 'peer'))
+        self.assertFalse(obj._has_relation(others[2]))
+        self.assertEqual(obj._get_any_relation(BaseNXObject, 'peer'),
+                         others[0])
+        self.assertEqual(interfaces[9].get_all_attachments(BaseNXObject),
+                         [obj])
+
+        obj.detach(interfaces[9])
+        self.assertFalse(obj.is_attached(interfaces[9]))
+        self.assertTrue(obj.is_detached(interfaces[9]))
+        self.assertEqual(obj.get_interfaces('detached'), [interfaces[9]])
+        self.assertEqual(len(obj.get_interfaces()), 49)
+        self.assertTrue(interfaces[9].has_detachment(obj))
+
+        # Changing the status of a relation moves it in the index
+        obj._remove_relation(others[1], 'peer')
+        self.assertEqual(obj._get_all_detached_relation(BaseNXObject, 'peer'),
+                         [others[1]])
+        obj._remove_all_relation(BaseNXObject, 'peer')
+        self.assertEqual(obj._get_all_relation(BaseNXObject, 'peer'), [])
+        self.assertEqual(len(obj._get_all_detached_relation(BaseNXObject,
+                                                            'peer')), 5)
+        self.assertEqual(len(obj._relations), 55)
+
+    def test_interface_stats(self):
+        """
+        Test that the interface stats are created on first use
+        """
+        interface = Interface('eth1/1', attributes={'dist_name':
+                                                    'sys/intf/phys-[eth1/1]'})
+        self.assertFalse('_stats' in interface.__dict__)
+        self.assertTrue(interface.stats is interface.stats)
+        self.assertEqual(interface.stats._interfaceDn,
+                         'sys/intf/phys-[eth1/1]')
+        self.assertFalse(hasattr(BaseRelation(interface, 'attached'),
+                                 '__dict__'))
+
+
 class TestPortChannel(unittest.TestCase):
     """
     This class defines off line testing of port channel
@@ -379,11 +510,11 @@ class TestInterface(unittest.TestCase):
         iface = self.create_interfcae()
         resp = iface.get_json()
         expected_json = ("{'l1PhysIf': {'attributes': {'layer': 'Layer2', "
-                         "'duplex': 'auto', 'trunkLog': 'default', 'mtu': "
-                         "'1500', 'linkLog': 'default', 'mode': 'trunk', '"
-                         "snmpTrapSt': 'default', 'accessVlan': 'vlan-1', "
-                         "'adminSt': 'up', 'speed': '10G', 'id': 'eth1/5'}"
-                         ", 'children': []}}")
+                         "'adminSt': 'up', 'snmpTrapSt': 'default', 'speed'"
+                         ": '10G', 'id': 'eth1/5', 'duplex': 'auto', 'trunk"
+                         "Log': 'default', 'mtu': '1500', 'linkLog': 'defau"
+                         "lt', 'mode': 'trunk', 'accessVlan': 'vlan-1'}, 'c"
+                         "hildren': []}}")
         self.assertEqual(str(resp), expected_json)
 
     def test_config_interface_multiple(self):
@@ -393,15 +524,15 @@ class TestInterface(unittest.TestCase):
         config = self.create_interface_mulitple()
         resp = config.get_json()
         expected_json = ("{'interfaceEntity': {'attributes': {}, 'children'"
-                         ": [{'l1PhysIf': {'attributes': {'layer': 'Layer2'"
-                         ", 'duplex': 'auto', 'trunkLog': 'default', 'mtu':"
-                         " '1500', 'linkLog': 'default', 'mode': 'access', "
-                         "'snmpTrapSt': 'default', 'speed': '10G', 'id': 'e"
-                         "th1/5'}, 'children': []}}, {'l1PhysIf': {'attribu"
-                         "tes': {'layer': 'Layer3', 'duplex': 'auto', 'trun"
-                         "kLog': 'default', 'mtu': '1500', 'linkLog': 'defa"
-                         "ult', 'mode': 'access', 'snmpTrapSt': 'default', "
-                         "'speed': '10G', 'id': 'eth1/8'}, 'children': []}}"
+                         ": [{'l1PhysIf': {'attributes': {'linkLog': 'defau"
+                         "lt', 'layer': 'Layer2', 'mode': 'access', 'snmpTr"
+                         "apSt': 'default', 'duplex': 'auto', 'speed': '10G"
+                         "', 'trunkLog': 'default', 'id': 'eth1/5', 'mtu': "
+                         "'1500'}, 'children': []}}, {'l1PhysIf': {'attribu"
+                         "tes': {'linkLog': 'default', 'layer': 'Layer3', '"
+                         "mode': 'access', 'snmpTrapSt': 'default', 'duplex"
+                         "': 'auto', 'speed': '10G', 'trunkLog': 'default',"
+                         " 'id': 'eth1/8', 'mtu': '1500'}, 'children': []}}"
                          "]}}")
         self.assertEqual(str(resp), expected_json)
         
@@ -807,6 +938,122 @@ class TestIcmp(unittest.TestCase):
         self.assertEqual(str(resp), expected_resp)        
 
 
+class TestFromMo(unittest.TestCase):
+    """
+    Test building objects from the attributes of MOs with from_mo
+    """
+    def test_l2bd(self):
+        """
+        Test that from_mo builds the same L2BD as __init__
+        """
+        attributes = {'name': 'vlan-10', 'adminSt': 'active', 'id': '10',
+                      'operSt': 'up', 'dn': 'sys/bd/bd-[vlan-10]'}
+        bd = L2BD.from_mo(attributes)
+        expected = L2BD('vlan-10')
+        expected._populate_from_attributes(attributes)
+        self.assertEqual(bd.__dict__, expected.__dict__)
+        self.assertEqual(bd.fabEncap, 'vlan-10')
+
+    def test_parent(self):
+        """
+        Test that from_mo adds the object to its parent
+        """
+        parent = BaseNXObject('parent')
+        child = BaseNXObject.from_mo({'name': 'child'}, parent)
+        self.assertTrue(parent.has_child(child))
+        self.assertIs(child.get_parent(), parent)
+
+    def test_derived_name(self):
+        """
+        Test that a class deriving a value from the name is built with
+        __init__
+        """
+        class Derived(BaseNXObject):
+            def __init__(self, name, parent=None):
+                super(Derived, self).__init__(name, parent)
+                self.upper_name = name.upper()
+
+        obj = Derived.from_mo({'name': 'abc'})
+        self.assertEqual(obj.upper_name, 'ABC')
+
+    def test_interface(self):
+        """
+        Test that from_mo builds the same Interface as __init__
+        """
+        attributes = Interface._get_mo_attributes({
+            'dn': 'sys/intf/phys-[eth1/5]', 'portT': 'leaf',
+            'adminSt': 'up', 'speed': '10G', 'mtu': '9216', 'id': 'eth1/5',
+            'monPolDn': '', 'name': '', 'descr': '', 'usage': 'discovery',
+            'layer': 'Layer2'})
+        interface = Interface('eth1/5', attributes=attributes)
+        interface.porttype = 'leaf'
+        interface.adminstatus = 'up'
+        interface.speed = '10G'
+        interface.mtu = '9216'
+        self.assertEqual(Interface._from_mo_attributes(attributes).__dict__,
+                         interface.__dict__)
+
+    def test_interface_mo(self):
+        """
+        Test that from_mo builds an Interface from the attributes of an
+        l1PhysIf MO like the other classes
+        """
+        mo_attributes = {
+            'dn': 'sys/intf/phys-[eth1/5]', 'portT': 'leaf',
+            'adminSt': 'up', 'speed': '10G', 'mtu': '9216', 'id': 'eth1/5',
+            'monPolDn': '', 'name': '', 'descr': '', 'usage': 'discovery',
+            'layer': 'Layer2'}
+        parent = BaseNXObject('parent')
+        interface = Interface.from_mo(mo_attributes, parent)
+        expected = Interface._from_mo_attributes(
+            Interface._get_mo_attributes(mo_attributes))
+        self.assertEqual(interface.name, 'eth1/5')
+        self.assertEqual(interface.porttype, 'leaf')
+        self.assertEqual(interface.attributes, expected.attributes)
+        self.assertTrue(interface.get_parent() is parent)
+        self.assertTrue(parent.has_child(interface))
+
+    def test_lazy_interface(self):
+        """
+        Test that a lazy Interface only reads the attributes that are used
+        and has the same attributes as an Interface built from a dictionary
+        """
+        mo_attributes = {
+            'dn': 'sys/intf/phys-[eth1/5]', 'portT': 'leaf',
+            'adminSt': 'up', 'speed': '10G', 'mtu': '9216', 'id': 'eth1/5',
+            'monPolDn': '', 'name': '', 'descr': '', 'usage': 'discovery',
+            'layer': 'Layer2'}
+        interface = Interface._from_mo_attributes(
+            Interface._get_mo_attributes(mo_attributes, lazy=True))
+        self.assertEqual(interface.adminstatus, 'up')
+        self.assertNotIn('speed', interface.__dict__)
+        expected = Interface.from_mo(mo_attributes)
+        self.assertEqual(interface, expected)
+        self.assertEqual(interface.attributes, expected.attributes)
+        for name in ('if_name', 'name', 'id', 'module', 'port', 'if_type',
+                     'porttype', 'speed', 'mtu', 'type', 'descr'):
+            self.assertEqual(getattr(interface, name),
+                             getattr(expected, name))
+        self.assertEqual(interface._get_path(), expected._get_path())
+
+    def test_concrete(self):
+        """
+        Test that the concrete objects built by from_mo don't share their
+        attributes
+        """
+        attributes = {'addr': '10.0.0.1', 'name': '', 'flags': '',
+                      'ifId': 'eth1/1', 'createTs': '',
+                      'dn': 'sys/ctx-[vxlan-1]/db-ep/ip-[10.0.0.1]'}
+        first = ConcreteEp.from_mo(attributes)
+        second = ConcreteEp.from_mo(dict(attributes, addr='10.0.0.2'))
+        expected = ConcreteEp()
+        expected._populate_from_attributes(attributes)
+        self.assertEqual(first.__dict__, expected.__dict__)
+        self.assertEqual(first.attr['address'], '10.0.0.1')
+        self.assertEqual(second.attr['address'], '10.0.0.2')
+        self.assertIsNone(ConcreteEp().attr['ip'])
+
+
 class TestLiveSwitch(unittest.TestCase):
     """
     Test with a live Switch
@@ -1109,6 +1356,7 @@ class TestLiveIcmp(TestLiveSwitch):
 if __name__ == '__main__':
     
     offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestBaseNXObject))
     offline.addTest(unittest.makeSuite(TestPortChannel))
     offline.addTest(unittest.makeSuite(TestLogging))
     offline.addTest(unittest.makeSuite(TestL2BD))
@@ -1126,6 +1374,7 @@ if __name__ == '__main__':
     offline.addTest(unittest.makeSuite(TestDns))
     offline.addTest(unittest.makeSuite(TestDnsVrf))
     offline.addTest(unittest.makeSuite(TestIcmp))
+    offline.addTest(unittest.makeSuite(TestFromMo))
     
     live = unittest.TestSuite()
     live.addTest(unittest.makeSuite(TestLivePortChannel))
@@ -0,0 +1,139 @@
+################################################################################
+#                                                                              #
+# Copyright (c) 2015 Cisco Systems                                             #
+# All Rights Reserved.                                                         #
+#                                                                              #
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may   #
+#    not use this file except in compliance with the License. You may obtain   #
+#    a copy of the License at                                                  #
+#                                                                              #
+#         http://www.apache.org/licenses/LICENSE-2.0                           #
+#                                                                              #
+#    Unless required by applicable law or agreed to in writing, software       #
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT #
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the  #
+#    License for the specific language governing permissions and limitations   #
+#    under the License.                                                        #
+#                                                                              #
+################################################################################
+"""nxwatch.py Test module
+"""
+from nxtoolkit.nxwatch import Watch
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+import unittest
+
+
+class FakeSession(object):
+    """
+    Switch session holding the events to deliver
+    """
+    def __init__(self):
+        self.urls = []
+        self.events = {}
+
+    def subscribe(self, url):
+        self.urls.append(url)
+        self.events[url] = []
+
+    def has_events(self, url):
+        return len(self.events[url]) > 0
+
+    def get_event(self, url):
+        return self.events[url].pop(0)
+
+
+class TestWatch(unittest.TestCase):
+    """
+    Test the Watch class
+    """
+    def _get_watch(self):
+        out = StringIO()
+        watch = Watch(FakeSession(), header=['Interface'], max_rate=1000.0,
+                      out=out)
+        watch.set_row('sys/intf/phys-[eth1/1]', 'eth1/1 up')
+        watch.set_row('sys/intf/phys-[eth1/2]', 'eth1/2 up')
+        self.assertTrue(watch.draw())
+        return watch, out
+
+    def test_redraw_changed_rows(self):
+        """
+        Test that only the changed rows are redrawn
+        """
+        watch, out = self._get_watch()
+        self.assertEqual(watch.rows_drawn, 2)
+        watch.set_row('sys/intf/phys-[eth1/1]', 'eth1/1 up')
+        self.assertFalse(watch.draw(force=True))
+        out.truncate(0)
+        out.seek(0)
+        watch.set_row('sys/intf/phys-[eth1/2]', 'eth1/2 down')
+        self.assertTrue(watch.draw(force=True))
+        self.assertEqual(watch.rows_drawn, 3)
+        self.assertTrue('\x1b[3;1H\x1b[2Keth1/2 down' in out.getvalue())
+        self.assertFalse('eth1/1' in out.getvalue())
+        watch.remove_row('sys/intf/phys-[eth1/1]')
+        self.assertTrue(watch.draw(force=True))
+        self.assertEqual(watch.rows_drawn, 4)
+
+    def test_max_rate(self):
+        """
+        Test that the redraws are limited to the maximum rate
+        """
+        watch = Watch(FakeSession(), max_rate=0.01, out=StringIO())
+        watch.set_row('a', 'a')
+        self.assertTrue(watch.draw())
+        watch.set_row('a', 'b')
+        self.assertFalse(watch.draw())
+        self.assertTrue(watch.draw(force=True))
+        self.assertEqual(watch.redraws, 2)
+
+    def test_height(self):
+        """
+        Test that the rows that don't fit on the terminal are left out
+        """
+        out = StringIO()
+        watch = Watch(FakeSession(), header=['Interface'], max_rate=1000.0,
+                      out=out, height=4)
+        for index in range(1, 6):
+            watch.set_row('eth1/%d' % index, 'eth1/%d up' % index)
+        self.assertTrue(watch.draw())
+        self.assertEqual(out.getvalue().split('\n')[1:],
+                         ['eth1/1 up', 'eth1/2 up', '... 3 more rows'])
+        self.assertEqual(watch.rows_drawn, 2)
+        out.truncate(0)
+        out.seek(0)
+        watch.set_row('eth1/2', 'eth1/2 down')
+        watch.set_row('eth1/4', 'eth1/4 down')
+        self.assertTrue(watch.draw(force=True))
+        self.assertEqual(out.getvalue(),
+                         '\x1b[3;1H\x1b[2Keth1/2 down\x1b[4;1H')
+        self.assertEqual(watch.rows_drawn, 3)
+
+    def test_process(self):
+        """
+        Test dispatching the events and running the polls
+        """
+        watch, out = self._get_watch()
+        received = []
+        polls = []
+        watch.subscribe('ethpmPhysIf',
+                        lambda cls, attributes: received.append(attributes))
+        watch.poll(0, lambda: polls.append(1))
+        url = '/api/class/ethpmPhysIf.json?subscription=yes'
+        self.assertEqual(watch._session.urls, [url])
+        mo = {'ethpmPhysIf': {'attributes': {'dn': 'sys/intf/phys-[eth1/1]'
+                                             '/phys', 'operSt': 'down'}}}
+        watch._session.events[url].append({'imdata': [mo]})
+        self.assertEqual(watch.process(), 1)
+        self.assertEqual(received[0]['operSt'], 'down')
+        self.assertEqual(polls, [1])
+
+
+if __name__ == '__main__':
+
+    offline = unittest.TestSuite()
+    offline.addTest(unittest.makeSuite(TestWatch))
+
+    unittest.main(defaultTest='offline')